@@ -4,6 +4,7 @@ Advanced website asset scraper using multiple approaches
 Handles JavaScript-heavy sites and missing assets more effectively
 """
 
+import logging
 import os
 import re
 import requests
@@ -15,6 +16,11 @@ from bs4 import BeautifulSoup
 import json
 import mimetypes
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 class AdvancedAssetScraper:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -28,6 +34,7 @@ class AdvancedAssetScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
+        configure_session(self.session)
         self.downloaded_assets = set()
         self.failed_downloads = []
         
@@ -38,7 +45,7 @@ class AdvancedAssetScraper:
             
         for attempt in range(retries):
             try:
-                print(f"Downloading ({attempt+1}/{retries}): {url}")
+                log.info(f"Downloading ({attempt+1}/{retries}): {url}")
                 response = self.session.get(url, timeout=60, stream=True)
                 response.raise_for_status()
                 
@@ -52,12 +59,12 @@ class AdvancedAssetScraper:
                             f.write(chunk)
                 
                 self.downloaded_assets.add(url)
-                print(f"✓ Saved: {local_path}")
+                log.info(f"✓ Saved: {local_path}")
                 time.sleep(0.3)  # Be nice to the server
                 return True
                 
             except Exception as e:
-                print(f"✗ Attempt {attempt+1} failed for {url}: {e}")
+                log.warning(f"✗ Attempt {attempt+1} failed for {url}: {e}")
                 if attempt < retries - 1:
                     time.sleep(2 ** attempt)  # Exponential backoff
                 else:
@@ -126,7 +133,7 @@ class AdvancedAssetScraper:
                             if value.startswith(('http', '/', '_next')):
                                 all_assets.add(('data', value))
                 
-                print(f"Found {len(all_assets)} total assets in {html_file}")
+                log.info(f"Found {len(all_assets)} total assets in {html_file}")
                 
             except Exception as e:
                 print(f"Error extracting assets from {html_file}: {e}")
@@ -233,13 +240,15 @@ class AdvancedAssetScraper:
         print("🔍 Starting comprehensive asset scan...")
         
         # Get all HTML files
-        html_files = list(self.output_dir.glob('*.html'))
-        html_files.extend(self.output_dir.glob('work/*.html'))
+        with phase('discovery'):
+            html_files = list(self.output_dir.glob('*.html'))
+            html_files.extend(self.output_dir.glob('work/*.html'))
         
         print(f"📄 Scanning {len(html_files)} HTML files...")
         
         # Extract all asset URLs
-        all_assets = self.extract_all_asset_urls(html_files)
+        with phase('extraction'):
+            all_assets = self.extract_all_asset_urls(html_files)
         
         print(f"🎯 Found {len(all_assets)} unique assets to check")
         
@@ -255,29 +264,31 @@ class AdvancedAssetScraper:
         downloaded_count = 0
         skipped_count = 0
         
-        for asset_type, asset_url in valid_assets:
-            # Convert to full URL
-            if asset_url.startswith('/'):
-                full_url = urljoin(self.base_url, asset_url)
-            elif asset_url.startswith('http'):
-                full_url = asset_url
-            else:
-                full_url = urljoin(self.base_url, asset_url)
-            
-            local_path = self.get_local_path(asset_url, asset_type)
-            
-            # Skip if already exists and has content
-            if local_path.exists() and local_path.stat().st_size > 0:
-                skipped_count += 1
-                continue
-            
-            # Download the asset
-            if self.download_asset(full_url, local_path):
-                downloaded_count += 1
+        with phase('download'):
+            for asset_type, asset_url in valid_assets:
+                # Convert to full URL
+                if asset_url.startswith('/'):
+                    full_url = urljoin(self.base_url, asset_url)
+                elif asset_url.startswith('http'):
+                    full_url = asset_url
+                else:
+                    full_url = urljoin(self.base_url, asset_url)
                 
-                # If it's a CSS file, download its dependencies
-                if asset_type == 'css' and local_path.exists():
-                    self.download_css_dependencies(full_url, local_path)
+                local_path = self.get_local_path(asset_url, asset_type)
+                
+                # Skip if already exists and has content
+                if local_path.exists() and local_path.stat().st_size > 0:
+                    skipped_count += 1
+                    continue
+                
+                # Download the asset
+                if self.download_asset(full_url, local_path):
+                    downloaded_count += 1
+                    
+                    # If it's a CSS file, download its dependencies
+                    if asset_type == 'css' and local_path.exists():
+                        with phase('css_walk'):
+                            self.download_css_dependencies(full_url, local_path)
         
         # Print summary
         print(f"\n📊 Download Summary:")
@@ -294,5 +305,6 @@ class AdvancedAssetScraper:
         return downloaded_count, skipped_count, len(self.failed_downloads)
 
 if __name__ == "__main__":
+    enable_profiling()
     scraper = AdvancedAssetScraper("https://lo2s.com", ".")
     scraper.scan_and_download_missing_assets()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for asset extraction, link rewriting and downloading
+Builds repeatable fixtures from the mirrored pages (plus synthetic 10x/100x
+sites), times and memory-profiles each stage, and compares against a saved
+baseline so regressions fail the run
+
+    python benchmark.py                          # run and compare to baseline
+    python benchmark.py --save-baseline          # record a new baseline
+    python benchmark.py --stages rewrite --scales 1 10 --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+BASELINE_FILE = 'benchmark_baseline.json'
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_THRESHOLD = 0.20
+
+
+def mirror_pages(source_dir):
+    """HTML pages of the mirror the benchmarks are built from"""
+    source_dir = Path(source_dir)
+    pages = [p for p in sorted(source_dir.glob('*.html')) if p.name != 'index_local.html']
+    pages += sorted(source_dir.glob('work/*.html'))
+    return pages
+
+
+def build_fixture(source_dir, target_dir, scale):
+    """Copy the mirror's pages into target_dir, multiplied scale times
+
+    Copies beyond the first get a numeric suffix (work/alsina-3.html) so the
+    synthetic site has the same shape as the real one, just larger.
+    """
+    source_dir = Path(source_dir)
+    target_dir = Path(target_dir)
+    files = []
+    for page in mirror_pages(source_dir):
+        relative = page.relative_to(source_dir)
+        for copy in range(scale):
+            name = relative.name if copy == 0 else f"{relative.stem}-{copy}{relative.suffix}"
+            target = target_dir / relative.parent / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(page, target)
+            files.append(target)
+    return files
+
+
+def measure(run, setup=None, repeat=3):
+    """Time run() repeat times, then once more under tracemalloc for peak memory"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'wall_median': statistics.median(timings),
+        'wall_min': min(timings),
+        'peak_kb': peak / 1024,
+        'repeat': repeat,
+    }
+
+
+def quiet():
+    """Silence the scrapers' per-file prints while a stage runs"""
+    return open(os.devnull, 'w')
+
+
+def bench_extract(workdir, files, args, stack):
+    from comprehensive_scraper import ComprehensiveAssetScraper
+
+    scraper = ComprehensiveAssetScraper('https://lo2s.com', workdir)
+
+    def run():
+        for html_file in files:
+            scraper.extract_all_assets_from_html(html_file)
+
+    return run, None
+
+
+def bench_rewrite(workdir, files, args, stack):
+    import fix_all_links
+
+    pristine = {path: path.read_bytes() for path in files}
+
+    def setup():
+        for path, content in pristine.items():
+            path.write_bytes(content)
+
+    def run():
+        for html_file in files:
+            fix_all_links.fix_html_file(html_file, is_in_work_folder=html_file.parent.name == 'work')
+
+    return run, setup
+
+
+HOSTS_PATTERN = r'(fonts\.googleapis\.com|fonts\.gstatic\.com|d2csodhem33bqt\.cloudfront\.net)'
+
+
+def live_page(content):
+    """Undo the local rewrite so a mirrored page looks as lo2s.com serves it"""
+    content = re.sub(r'(?<=["\s,])(?:\.\./)*' + HOSTS_PATTERN + '/', r'https://\1/', content)
+    content = re.sub(r'(?<=")(?:\.\./)*(_next/|favicon/|manifest\.json"|favicon\.ico")', r'/\1', content)
+    content = re.sub(r'href="(?:\.\./)*index\.html"', 'href="/"', content)
+    content = re.sub(r'href="(?:\.\./)*(work|about|contact|archive)\.html"', r'href="/\1"', content)
+    return re.sub(r'href="(?:\.\./)*work/([^"/]+)\.html"', r'href="/work/\1"', content)
+
+
+def multipass_rewrite(content, is_in_work_folder):
+    """The str.replace/re.sub chain fix_html_file used before link_rewriter, kept for comparison"""
+    content = content.replace('https://fonts.googleapis.com/', 'fonts.googleapis.com/')
+    content = content.replace('https://fonts.gstatic.com/', 'fonts.gstatic.com/')
+    content = content.replace('https://d2csodhem33bqt.cloudfront.net/', 'd2csodhem33bqt.cloudfront.net/')
+    prefix = '../' if is_in_work_folder else ''
+    for old in ('/_next/', '/favicon/', '/manifest.json', '/favicon.ico'):
+        content = content.replace(old, prefix + old[1:])
+    if is_in_work_folder:
+        for host in ('fonts.googleapis.com/', 'fonts.gstatic.com/', 'd2csodhem33bqt.cloudfront.net/'):
+            content = content.replace(host, prefix + host)
+    for route in ('work', 'about', 'contact', 'archive'):
+        content = re.sub(f'href="/{route}"', f'href="{prefix}{route}.html"', content)
+    content = re.sub(r'href="/"', f'href="{prefix}index.html"', content)
+    if not is_in_work_folder:
+        content = re.sub(r'href="/work/([^"]+)"', r'href="work/\1.html"', content)
+    return content
+
+
+def rewrite_pages(files):
+    """archive.html and the work/ pages as served live, with their depth"""
+    pages = [p for p in files if p.parent.name == 'work' or p.stem.split('-')[0] == 'archive']
+    return [(live_page(p.read_text(encoding='utf-8')), p.parent.name == 'work') for p in pages]
+
+
+def bench_rewrite_multipass(workdir, files, args, stack):
+    pages = rewrite_pages(files)
+
+    def run():
+        for content, in_work in pages:
+            multipass_rewrite(content, in_work)
+
+    return run, None
+
+
+def bench_rewrite_single(workdir, files, args, stack):
+    from link_rewriter import rewrite_html
+
+    pages = rewrite_pages(files)
+
+    def run():
+        for content, in_work in pages:
+            rewrite_html(content, depth=1 if in_work else 0)
+
+    return run, None
+
+
+@contextlib.contextmanager
+def mock_origin_server(source):
+    """Serve the mirror from a local mock origin and point LO2S_ORIGIN at it until the block exits"""
+    import asyncio
+
+    from mock_origin import MockOrigin
+
+    origin = MockOrigin(source)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(origin.handle_connection, '127.0.0.1', 0))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    previous = os.environ.get('LO2S_ORIGIN')
+    os.environ['LO2S_ORIGIN'] = f"http://127.0.0.1:{port}"
+    try:
+        yield os.environ['LO2S_ORIGIN']
+    finally:
+        if previous is None:
+            os.environ.pop('LO2S_ORIGIN', None)
+        else:
+            os.environ['LO2S_ORIGIN'] = previous
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        # Handlers of kept-alive connections still wait for a next request
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.close()
+
+
+def bench_download(workdir, files, args, stack):
+    stack.enter_context(mock_origin_server(args.source))
+
+    from comprehensive_scraper import ComprehensiveAssetScraper
+
+    uploads = sorted((Path(args.source) / 'd2csodhem33bqt.cloudfront.net' / 'uploads').glob('*'))
+    urls = [f"https://d2csodhem33bqt.cloudfront.net/uploads/{p.name}" for p in uploads if p.is_file()]
+    output_dir = Path(workdir) / 'downloads'
+
+    def setup():
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    def run():
+        scraper = ComprehensiveAssetScraper('https://lo2s.com', output_dir)
+        if not args.keep_delays:
+            # Politeness sleeps would dominate a local transfer benchmark
+            scraper.request_delay = 0
+        for url in urls:
+            scraper.download_asset(url, scraper.get_local_path(url))
+
+    return run, setup
+
+
+STAGES = {
+    'extract': bench_extract,
+    'rewrite': bench_rewrite,
+    'rewrite_multipass': bench_rewrite_multipass,
+    'rewrite_single': bench_rewrite_single,
+    'download': bench_download,
+}
+
+# Downloading is bound by the mirror's real asset list, not by page count
+UNSCALED_STAGES = {'download'}
+
+
+def run_benchmarks(args):
+    results = {}
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory(prefix=f"lo2s-bench-x{scale}-") as workdir:
+            files = build_fixture(args.source, workdir, scale)
+            for stage in args.stages:
+                if stage in UNSCALED_STAGES and scale != min(args.scales):
+                    continue
+                key = f"{stage}@x{scale}"
+                # Closes whatever a stage started (the mock origin) once it is measured
+                with contextlib.ExitStack() as stack:
+                    try:
+                        run, setup = STAGES[stage](workdir, files, args, stack)
+                    except ImportError as e:
+                        print(f"⏭️  {key}: skipped ({e})")
+                        continue
+
+                    stdout = sys.stdout
+                    sys.stdout = quiet()
+                    try:
+                        result = measure(run, setup, repeat=args.repeat)
+                    finally:
+                        sys.stdout.close()
+                        sys.stdout = stdout
+
+                result['files'] = len(files)
+                results[key] = result
+                print(f"⏱️  {key}: {result['wall_median'] * 1000:.1f} ms median, "
+                      f"{result['wall_min'] * 1000:.1f} ms min, {result['peak_kb']:.0f} KB peak "
+                      f"({len(files)} pages)")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions beyond threshold (a fraction, e.g. 0.2)"""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in ('wall_median', 'peak_kb'):
+            before, after = previous[metric], result[metric]
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append((key, metric, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction, rewriting and downloading")
+    parser.add_argument('--source', default='.', help="mirror directory fixtures are built from")
+    parser.add_argument('--stages', nargs='+', choices=sorted(STAGES), default=list(STAGES))
+    parser.add_argument('--scales', nargs='+', type=int, default=list(DEFAULT_SCALES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown/memory growth before failing (default 0.20 = 20%%)")
+    parser.add_argument('--keep-delays', action='store_true', help="keep the scrapers' politeness sleeps")
+    parser.add_argument('--output', help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    print("🏁 LO2S Benchmark Suite")
+    print("=" * 50)
+    results = run_benchmarks(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"\nℹ️  No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for key, metric, before, after in regressions:
+            print(f"   • {key} {metric}: {before:.4g} → {after:.4g} (+{(after / before - 1):.0%})")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.threshold:.0%} against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
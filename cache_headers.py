@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Generate the Cache-Control rules of vercel.json from the deployed files
+Each file is classified as content-hashed (its name changes whenever its
+content does, see hashed_names.py) or mutable. Every class that matches a file gets
+a "public, max-age=31536000, immutable" rule; everything else keeps Vercel's
+default of revalidating on each request
+
+Files rewritten in place (by link_rewriter.py, minify_assets.py, or any tool
+that keeps a <name>.bak source beside them) can change under the same name,
+so they are excluded from the immutable rules, and every immutable rule is
+checked against every deployed file before writing
+
+    python cache_headers.py            # regenerate the rules in vercel.json
+    python cache_headers.py --check    # only verify the current rules
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from hashed_names import HASHED_SOURCES, is_mutable, source_regex
+from link_rewriter import atomic_write
+from precache_manifest import deployed_files
+
+CONFIG_FILE = 'vercel.json'
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def build_rules(root, files):
+    """Immutable header rules for every content-hashed class that matches a deployed file"""
+    rules = []
+    for source in HASHED_SOURCES:
+        pattern = source_regex(source)
+        matched = [path for path in files if pattern.fullmatch('/' + path)]
+        if not matched:
+            continue
+        mutable = [path for path in matched if is_mutable(root, path)]
+        if len(mutable) == len(matched):
+            continue
+        if mutable:
+            # Leave out what may change, with a lookahead where the first group starts
+            prefix = source[:source.index('(')]
+            names = '|'.join(re.escape(('/' + path)[len(prefix):]) for path in sorted(mutable))
+            source = f"{prefix}((?!(?:{names})$){source[len(prefix) + 1:]}"
+        rules.append({'source': source, 'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE}]})
+    return rules
+
+
+def sets_cache_control(rule):
+    return any(header.get('key', '').lower() == 'cache-control' for header in rule.get('headers', []))
+
+
+def is_immutable_rule(rule):
+    return any(header.get('key', '').lower() == 'cache-control' and 'immutable' in header.get('value', '')
+               for header in rule.get('headers', []))
+
+
+def violations(root, files, rules):
+    """(source, path) for each mutable file an immutable rule would cover"""
+    found = []
+    for rule in rules:
+        if not is_immutable_rule(rule):
+            continue
+        pattern = source_regex(rule['source'])
+        found += [(rule['source'], path) for path in files if pattern.fullmatch('/' + path) and is_mutable(root, path)]
+    return found
+
+
+def format_json(value, indent=0):
+    """JSON in vercel.json's layout: objects of plain values on one line, everything else expanded"""
+    pad = '  ' * indent
+    if isinstance(value, dict):
+        if all(not isinstance(item, (dict, list)) for item in value.values()):
+            return '{ ' + ', '.join(f"{json.dumps(k)}: {json.dumps(v)}" for k, v in value.items()) + ' }'
+        items = [f"{pad}  {json.dumps(k)}: {format_json(v, indent + 1)}" for k, v in value.items()]
+        return '{\n' + ',\n'.join(items) + f"\n{pad}}}"
+    if isinstance(value, list):
+        if not value:
+            return '[]'
+        items = [f"{pad}  {format_json(item, indent + 1)}" for item in value]
+        return '[\n' + ',\n'.join(items) + f"\n{pad}]"
+    return json.dumps(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the Cache-Control rules of vercel.json")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--check', action='store_true', help="verify the current rules without writing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    root = Path(args.root)
+    config_path = root / CONFIG_FILE
+    config = json.loads(config_path.read_text(encoding='utf-8'))
+    files = deployed_files(root)
+
+    if args.check:
+        rules = config.get('headers', [])
+    else:
+        generated = build_rules(root, files)
+        kept = [rule for rule in config.get('headers', []) if not sets_cache_control(rule)]
+        rules = kept + generated
+        for rule in generated:
+            pattern = source_regex(rule['source'])
+            count = sum(1 for path in files if pattern.fullmatch('/' + path))
+            print(f"   🔒 {rule['source']}: {count} files")
+
+    problems = violations(root, files, rules)
+    for source, path in problems:
+        print(f"❌ {path} may change but {source} marks it immutable")
+    if problems:
+        sys.exit(1)
+
+    immutable = {path for path in files for rule in rules if is_immutable_rule(rule)
+                 and source_regex(rule['source']).fullmatch('/' + path)}
+    if not args.check:
+        config['headers'] = rules
+        updated = format_json(config) + '\n'
+        if updated != config_path.read_text(encoding='utf-8'):
+            atomic_write(config_path, updated.encode('utf-8'))
+            print(f"   ✏️  {config_path}")
+
+    print(f"\n📊 Cache header summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Immutable: {len(immutable)} of {len(files)} deployed files")
+    print(f"   Revalidated on each request: {len(files) - len(immutable)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,49 +2,120 @@
 """
 Complete website downloader for lo2s.com
 Downloads all pages and creates proper directory structure
+
+Run with --stream-rewrite to rewrite pages and stylesheets to local paths as
+they download (one write per file) and fetch the assets they reference
 """
 
+import codecs
+import hashlib
+import logging
 import os
 import re
 import requests
 import json
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
+import sys
 import time
+from collections import deque
 from bs4 import BeautifulSoup
 
+from faststart import VIDEO_SUFFIXES, Mp4Error, faststart_file
+from link_rewriter import RewriteManifest, StreamRewriter, atomic_output, file_kind, page_depth, rewrite_site, site_files
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
+# Rewriter for responses whose file name has no telling extension (e.g. fonts.googleapis.com/css2)
+CONTENT_TYPE_KINDS = {'text/html': 'html', 'text/css': 'css'}
+
 class CompleteWebsiteDownloader:
-    def __init__(self, base_url, output_dir):
+    def __init__(self, base_url, output_dir, stream_rewrite=False):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
+        self.stream_rewrite = stream_rewrite
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        configure_session(self.session)
         self.downloaded_pages = set()
+        self.asset_queue = deque()
+        self.queued_assets = set()
+        self.manifest = RewriteManifest.for_site(self.output_dir) if stream_rewrite else None
+        
+    def asset_local_path(self, url):
+        """Mirror path for an asset URL (same layout the link rewriter targets)"""
+        parsed = urlparse(url)
+        if parsed.netloc in ('', urlparse(self.base_url).netloc):
+            return self.output_dir / parsed.path.lstrip('/')
+        return self.output_dir / parsed.netloc / parsed.path.lstrip('/')
+    
+    def queue_assets(self, urls):
+        """Add asset URLs found while rewriting to the download queue"""
+        for url in sorted(urls):
+            url = urljoin(self.base_url, url)
+            if url not in self.queued_assets:
+                self.queued_assets.add(url)
+                self.asset_queue.append(url)
+    
+    def stream_to_file(self, response, local_path):
+        """Write a response to disk once, rewriting HTML/CSS links on the way through"""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+        kind = file_kind(local_path) or CONTENT_TYPE_KINDS.get(content_type)
+        if kind not in ('html', 'css'):
+            with atomic_output(local_path) as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+            return
+        
+        found = set()
+        rewriter = StreamRewriter(kind, page_depth(local_path, self.output_dir), found)
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        source_hash = hashlib.sha256()
+        rewritten_hash = hashlib.sha256()
+        with atomic_output(local_path) as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                source_hash.update(chunk)
+                data = rewriter.feed(decoder.decode(chunk)).encode('utf-8')
+                rewritten_hash.update(data)
+                f.write(data)
+            data = rewriter.feed(decoder.decode(b'', final=True)).encode('utf-8') + rewriter.close().encode('utf-8')
+            rewritten_hash.update(data)
+            f.write(data)
         
+        # Already rewritten, so update_all_links can skip it
+        self.manifest.record(local_path, source_hash.hexdigest(), rewritten_hash.hexdigest())
+        self.queue_assets(found)
+    
     def download_page(self, url, local_path):
         """Download a page from URL to local path"""
         if url in self.downloaded_pages:
             return
             
         try:
-            print(f"Downloading page: {url}")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Create directory if it doesn't exist
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(local_path, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            log.info(f"Downloading page: {url}")
+            # Closed on every path, so a failed or partly read stream gives its connection back
+            with self.session.get(url, timeout=30, stream=self.stream_rewrite) as response:
+                response.raise_for_status()
+                
+                # Create directory if it doesn't exist
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                if self.stream_rewrite:
+                    self.stream_to_file(response, local_path)
+                else:
+                    with open(local_path, 'w', encoding='utf-8') as f:
+                        f.write(response.text)
                 
             self.downloaded_pages.add(url)
-            print(f"Saved page: {local_path}")
+            log.info(f"Saved page: {local_path}")
             time.sleep(1)  # Be nice to the server
             
         except Exception as e:
-            print(f"Error downloading {url}: {e}")
+            log.warning(f"Error downloading {url}: {e}")
     
     def extract_project_urls_from_work_page(self):
         """Extract all project URLs from the work page"""
@@ -58,6 +129,8 @@ class CompleteWebsiteDownloader:
         
         # Find all href links that start with /work/
         project_urls = re.findall(r'href="(/work/[^"]+)"', content)
+        # Pages rewritten while streaming already link to work/<slug>.html
+        project_urls += [f"/work/{slug}" for slug in re.findall(r'href="work/([^"/]+)\.html"', content)]
         
         # Remove duplicates and filter out the main work page
         unique_urls = list(set(project_urls))
@@ -82,88 +155,77 @@ class CompleteWebsiteDownloader:
         ]
         
         print("Downloading main pages...")
-        for page_url, filename in main_pages:
-            full_url = urljoin(self.base_url, page_url)
-            local_path = self.output_dir / filename
-            self.download_page(full_url, local_path)
+        with phase('download'):
+            for page_url, filename in main_pages:
+                full_url = urljoin(self.base_url, page_url)
+                local_path = self.output_dir / filename
+                self.download_page(full_url, local_path)
         
         # Get all project URLs from work page
-        project_urls = self.extract_project_urls_from_work_page()
+        with phase('discovery'):
+            project_urls = self.extract_project_urls_from_work_page()
         
         print(f"\nDownloading {len(project_urls)} project pages...")
-        for project_url in project_urls:
-            full_url = urljoin(self.base_url, project_url)
-            # Create filename from URL slug
-            project_name = project_url.split('/')[-1]
-            local_path = self.output_dir / 'work' / f"{project_name}.html"
-            self.download_page(full_url, local_path)
+        with phase('download'):
+            for project_url in project_urls:
+                full_url = urljoin(self.base_url, project_url)
+                # Create filename from URL slug
+                project_name = project_url.split('/')[-1]
+                local_path = self.output_dir / 'work' / f"{project_name}.html"
+                self.download_page(full_url, local_path)
         
         print(f"\nPage download complete! Downloaded {len(self.downloaded_pages)} pages.")
     
+    def download_queued_assets(self):
+        """Download assets found while stream-rewriting; stylesheets may queue more"""
+        downloaded = failed = skipped = 0
+        print(f"\nDownloading {len(self.asset_queue)} assets referenced by the pages...")
+        while self.asset_queue:
+            url = self.asset_queue.popleft()
+            local_path = self.asset_local_path(url)
+            if local_path.exists():
+                skipped += 1
+                continue
+            try:
+                log.info(f"Downloading asset: {url}")
+                with self.session.get(url, timeout=30, stream=True) as response:
+                    response.raise_for_status()
+                    self.stream_to_file(response, local_path)
+                if local_path.suffix.lower() in VIDEO_SUFFIXES:
+                    try:
+                        faststart_file(local_path)
+                    except Mp4Error as e:
+                        log.info(f"Left {local_path} as received: {e}")
+                downloaded += 1
+                log.info(f"Saved asset: {local_path}")
+            except Exception as e:
+                failed += 1
+                log.warning(f"Error downloading {url}: {e}")
+        
+        self.manifest.save()
+        print(f"📊 Assets: ✅ {downloaded} downloaded, ⏭️ {skipped} existing, ❌ {failed} failed")
+    
     def update_all_links(self):
-        """Update all HTML files to use local paths"""
-        html_files = list(self.output_dir.glob('*.html')) + list(self.output_dir.glob('work/*.html'))
+        """Update all HTML, CSS and JSON files to use local paths"""
+        files = site_files(self.output_dir)
         
-        print(f"\nUpdating links in {len(html_files)} HTML files...")
+        print(f"\nUpdating links in {len(files)} files...")
+        manifest = RewriteManifest.for_site(self.output_dir)
+        summary = rewrite_site(self.output_dir, files, manifest)
+        for result in summary.results:
+            if result['changed']:
+                log.info(f"Updated: {result['path']}")
         
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Update external asset URLs
-                content = content.replace('https://fonts.googleapis.com/', 'fonts.googleapis.com/')
-                content = content.replace('https://fonts.gstatic.com/', 'fonts.gstatic.com/')
-                content = content.replace('https://d2csodhem33bqt.cloudfront.net/', 'd2csodhem33bqt.cloudfront.net/')
-                
-                # Update local Next.js assets
-                content = content.replace('/_next/', '_next/')
-                content = content.replace('/favicon/', 'favicon/')
-                content = content.replace('/manifest.json', 'manifest.json')
-                content = content.replace('/favicon.ico', 'favicon.ico')
-                
-                # Update internal page links
-                if html_file.name != 'index.html' and 'work/' not in str(html_file):
-                    # For non-index pages, adjust paths to go up one level
-                    content = re.sub(r'href="/([^"]*)"', r'href="../\1"', content)
-                    content = re.sub(r'src="/([^"]*)"', r'src="../\1"', content)
-                    # Fix the double ../
-                    content = content.replace('href="../work/', 'href="work/')
-                    content = content.replace('href="../about.html', 'href="about.html')
-                    content = content.replace('href="../contact.html', 'href="contact.html')
-                    content = content.replace('href="../archive.html', 'href="archive.html')
-                    content = content.replace('href="../index.html', 'href="index.html')
-                    content = content.replace('href="../"', 'href="index.html"')
-                elif 'work/' in str(html_file):
-                    # For work pages, go up two levels
-                    content = re.sub(r'href="/([^"]*)"', r'href="../../\1"', content)
-                    content = re.sub(r'src="/([^"]*)"', r'src="../../\1"', content)
-                    # Fix specific paths
-                    content = content.replace('href="../../work/', 'href="../')
-                    content = content.replace('href="../../about.html', 'href="../about.html')
-                    content = content.replace('href="../../contact.html', 'href="../contact.html')
-                    content = content.replace('href="../../archive.html', 'href="../archive.html')
-                    content = content.replace('href="../../index.html', 'href="../index.html')
-                    content = content.replace('href="../../"', 'href="../index.html"')
-                else:
-                    # For index page
-                    content = re.sub(r'href="/([^"]*)"', r'href="\1"', content)
-                    content = re.sub(r'src="/([^"]*)"', r'src="\1"', content)
-                    content = content.replace('href="work/', 'href="work.html')
-                    content = content.replace('href="about', 'href="about.html')
-                    content = content.replace('href="contact', 'href="contact.html')
-                    content = content.replace('href="archive', 'href="archive.html')
-                
-                with open(html_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
-                print(f"Updated: {html_file}")
-                
-            except Exception as e:
-                print(f"Error updating {html_file}: {e}")
+        manifest.save()
+        summary.print_summary()
 
 if __name__ == "__main__":
-    downloader = CompleteWebsiteDownloader("https://lo2s.com", ".")
+    enable_profiling()
+    downloader = CompleteWebsiteDownloader("https://lo2s.com", ".", stream_rewrite='--stream-rewrite' in sys.argv)
     downloader.download_all_pages()
-    downloader.update_all_links()
+    if downloader.stream_rewrite:
+        with phase('download'):
+            downloader.download_queued_assets()
+    with phase('rewrite'):
+        downloader.update_all_links()
     print("\nComplete website download and link updates finished!")
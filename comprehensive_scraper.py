@@ -4,6 +4,7 @@ Comprehensive asset scraper to get ALL missing assets for the LO2S website
 Focuses on CSS, JS, fonts, images, videos, and JSON files
 """
 
+import logging
 import os
 import requests
 from urllib.parse import urljoin, urlparse
@@ -13,6 +14,11 @@ import re
 import json
 from bs4 import BeautifulSoup
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 class ComprehensiveAssetScraper:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -25,15 +31,17 @@ class ComprehensiveAssetScraper:
             'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive'
         })
+        configure_session(self.session)
         self.downloaded = 0
         self.failed = 0
         self.skipped = 0
+        self.request_delay = 0.3  # Be nice to the server
         
     def download_asset(self, url, local_path, retries=2):
         """Download a single asset with retry logic"""
         for attempt in range(retries):
             try:
-                print(f"📥 Downloading: {url}")
+                log.info(f"📥 Downloading: {url}")
                 response = self.session.get(url, timeout=30, stream=True)
                 response.raise_for_status()
                 
@@ -44,13 +52,13 @@ class ComprehensiveAssetScraper:
                         if chunk:
                             f.write(chunk)
                 
-                print(f"✅ Saved: {local_path}")
+                log.info(f"✅ Saved: {local_path}")
                 self.downloaded += 1
-                time.sleep(0.3)
+                time.sleep(self.request_delay)
                 return True
                 
             except Exception as e:
-                print(f"❌ Attempt {attempt+1} failed for {url}: {e}")
+                log.warning(f"❌ Attempt {attempt+1} failed for {url}: {e}")
                 if attempt < retries - 1:
                     time.sleep(1)
                 else:
@@ -146,7 +154,7 @@ class ComprehensiveAssetScraper:
             # Extract URLs from raw content using regex
             self.extract_assets_from_text(content, assets)
             
-            print(f"📄 Found {len(assets)} assets in {html_file.name}")
+            log.info(f"📄 Found {len(assets)} assets in {html_file.name}")
             
         except Exception as e:
             print(f"❌ Error processing {html_file}: {e}")
@@ -198,17 +206,19 @@ class ComprehensiveAssetScraper:
         print("🎯 Starting comprehensive asset download...")
         
         # Get all HTML files
-        html_files = []
-        html_files.extend(self.output_dir.glob('*.html'))
-        html_files.extend(self.output_dir.glob('work/*.html'))
+        with phase('discovery'):
+            html_files = []
+            html_files.extend(self.output_dir.glob('*.html'))
+            html_files.extend(self.output_dir.glob('work/*.html'))
         
         print(f"📁 Processing {len(html_files)} HTML files...")
         
         # Extract all assets
         all_assets = set()
-        for html_file in html_files:
-            assets = self.extract_all_assets_from_html(html_file)
-            all_assets.update(assets)
+        with phase('extraction'):
+            for html_file in html_files:
+                assets = self.extract_all_assets_from_html(html_file)
+                all_assets.update(assets)
         
         print(f"🎯 Found {len(all_assets)} total unique assets")
         
@@ -241,21 +251,23 @@ class ComprehensiveAssetScraper:
     
     def download_asset_list(self, assets):
         """Download a list of assets"""
-        for asset_type, asset_url in assets:
-            full_url = self.fix_url(asset_url)
-            if not full_url:
-                continue
+        with phase('download'):
+            for asset_type, asset_url in assets:
+                full_url = self.fix_url(asset_url)
+                if not full_url:
+                    continue
+                    
+                local_path = self.get_local_path(asset_url)
                 
-            local_path = self.get_local_path(asset_url)
-            
-            # Skip if already exists and has content
-            if local_path.exists() and local_path.stat().st_size > 0:
-                self.skipped += 1
-                continue
-            
-            self.download_asset(full_url, local_path)
+                # Skip if already exists and has content
+                if local_path.exists() and local_path.stat().st_size > 0:
+                    self.skipped += 1
+                    continue
+                
+                self.download_asset(full_url, local_path)
 
 if __name__ == "__main__":
+    enable_profiling()
     print("🚀 LO2S Comprehensive Asset Scraper")
     print("=" * 50)
     
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Critical CSS inlining and unused-rule pruning for the mirrored pages
+Matches every rule of a page's stylesheets against the page's DOM and reports
+the byte savings; nothing is written unless asked. With --apply the rules used
+by the first elements of the page are inlined in <head> and the stylesheets
+are loaded without blocking render; --use-pruned also writes the pruned
+per-page stylesheet and loads it instead of the shared bundles.
+
+    python critical_css.py                       # report only
+    python critical_css.py --apply contact.html  # also inline critical CSS
+"""
+
+import argparse
+import posixpath
+import re
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from soupsieve import SelectorSyntaxError
+
+from link_rewriter import SKIP_FILES, atomic_write, local_asset_path
+
+# Elements (in document order) treated as above the fold
+DEFAULT_CRITICAL_ELEMENTS = 150
+
+# Rules inside these at-rules are matched like top-level rules
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@container', '@document')
+
+# States and pseudo-elements a static DOM cannot match; stripped before matching
+PSEUDO_PATTERN = re.compile(
+    r'::?(?:before|after|first-line|first-letter|placeholder|selection|marker|backdrop|file-selector-button'
+    r'|-webkit-[\w-]+|-moz-[\w-]+|-ms-[\w-]+)(?:\([^)]*\))?'
+    r'|:(?:hover|focus|focus-visible|focus-within|active|visited|link|any-link|target|checked|indeterminate'
+    r'|disabled|enabled|invalid|valid|required|optional|placeholder-shown|autofill|read-only|read-write'
+    r'|fullscreen|playing|paused|user-invalid)\b'
+)
+TRAILING_COMBINATOR = re.compile(r'[\s>+~]+$')
+
+# Strings are matched so the comment branch never starts inside one
+COMMENT_OR_STRING = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|/\*.*?(?:\*/|\Z)', re.DOTALL)
+
+CRITICAL_MARKER = 'data-lo2s-critical'
+ASYNC_MARKER = 'data-lo2s-async'
+CRITICAL_STYLE_PATTERN = re.compile(r'<style ' + CRITICAL_MARKER + r'="">.*?</style>', re.DOTALL)
+ASYNC_NOSCRIPT_PATTERN = re.compile(r'<noscript ' + ASYNC_MARKER + r'="">.*?</noscript>', re.DOTALL)
+ASYNC_ATTRIBUTES = f' media="print" onload="this.media=\'all\'" {ASYNC_MARKER}=""'
+
+
+class Rule:
+    """One CSS rule: prelude text and either a body (declarations) or child rules"""
+
+    def __init__(self, prelude, body=None, children=None):
+        self.prelude = prelude
+        self.body = body
+        self.children = children
+
+    def text(self):
+        if self.children is not None:
+            return f"{self.prelude}{{{''.join(child.text() for child in self.children)}}}"
+        return f"{self.prelude}{{{self.body}}}" if self.body is not None else f"{self.prelude};"
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def _find_block_end(css, i):
+    """Index of the '}' closing the block that starts after css[i-1] == '{'"""
+    depth = 1
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def strip_comments(css):
+    """css without /* comments */, in one pass that leaves strings alone"""
+    return COMMENT_OR_STRING.sub(lambda m: '' if m.group(0).startswith('/*') else m.group(0), css)
+
+
+def parse_rules(css):
+    """Split a stylesheet into rules, descending into @media and friends"""
+    return _parse_rules(strip_comments(css))
+
+
+def _parse_rules(css):
+    rules = []
+    i = 0
+    start = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == ';' and css[start:i].strip().startswith('@'):
+            rules.append(Rule(css[start:i].strip()))
+            start = i + 1
+        elif char == '{':
+            prelude = css[start:i].strip()
+            end = _find_block_end(css, i + 1)
+            body = css[i + 1:end]
+            if prelude.lower().startswith(GROUPING_AT_RULES):
+                rules.append(Rule(prelude, children=_parse_rules(body)))
+            else:
+                rules.append(Rule(prelude, body=body))
+            i = start = end + 1
+            continue
+        i += 1
+    return rules
+
+
+def split_selectors(prelude):
+    """Split a selector list on top-level commas"""
+    selectors, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:i].strip())
+            start = i + 1
+    selectors.append(prelude[start:].strip())
+    return [s for s in selectors if s]
+
+
+def static_selector(selector):
+    """The part of a selector a static DOM can match"""
+    selector = TRAILING_COMBINATOR.sub('', PSEUDO_PATTERN.sub('', selector)).strip()
+    return selector or '*'
+
+
+class PageMatcher:
+    """Answers 'is this rule used / used above the fold' for one page"""
+
+    def __init__(self, soup, critical_elements=DEFAULT_CRITICAL_ELEMENTS):
+        self.soup = soup
+        self.order = {}
+        body = soup.body or soup
+        for element in (soup.find('html'), soup.find('head'), soup.body):
+            if element is not None:
+                self.order[id(element)] = 0
+        for index, element in enumerate(body.find_all(True), start=1):
+            self.order.setdefault(id(element), index)
+        self.critical_elements = critical_elements
+        self.cache = {}
+
+    def first_match(self, selector):
+        """Document-order index of the first element matching, -1 if none, None if unsupported"""
+        if selector not in self.cache:
+            try:
+                element = self.soup.select_one(static_selector(selector))
+                self.cache[selector] = -1 if element is None else self.order.get(id(element), 0)
+            except (SelectorSyntaxError, NotImplementedError, ValueError):
+                self.cache[selector] = None
+        return self.cache[selector]
+
+    def classify(self, rule):
+        """(used, critical) for a style rule; unsupported selectors count as used unless another matches"""
+        used = unknown = False
+        for selector in split_selectors(rule.prelude):
+            index = self.first_match(selector)
+            if index is None:
+                unknown = True
+            elif index >= 0:
+                used = True
+                if index <= self.critical_elements:
+                    return True, True
+        return used or unknown, False
+
+
+def prune(rules, matcher):
+    """(used_css, critical_css) text for a list of rules"""
+    used, critical = [], []
+    for rule in rules:
+        if rule.children is not None:
+            child_used, child_critical = prune(rule.children, matcher)
+            if child_used:
+                used.append(f"{rule.prelude}{{{child_used}}}")
+            if child_critical:
+                critical.append(f"{rule.prelude}{{{child_critical}}}")
+        elif rule.body is None or rule.prelude.startswith('@'):
+            # @import, @charset, @font-face, @keyframes, @property: keep with the used rules
+            used.append(rule.text())
+        else:
+            is_used, is_critical = matcher.classify(rule)
+            if is_used:
+                used.append(rule.text())
+            if is_critical:
+                critical.append(rule.text())
+    return ''.join(used), ''.join(critical)
+
+
+def page_slug(page_rel):
+    return page_rel[:-len('.html')].replace('/', '__') if page_rel.endswith('.html') else page_rel.replace('/', '__')
+
+
+def restore_page(content):
+    """Undo an earlier --apply so the page can be processed again"""
+    content = CRITICAL_STYLE_PATTERN.sub('', content)
+    content = ASYNC_NOSCRIPT_PATTERN.sub('', content)
+    return content.replace(ASYNC_ATTRIBUTES, '')
+
+
+def async_link(tag):
+    """A stylesheet link that does not block render, with a <noscript> fallback"""
+    end = -2 if tag.endswith('/>') else -1
+    return tag[:end] + ASYNC_ATTRIBUTES + tag[end:] + f'<noscript {ASYNC_MARKER}="">{tag}</noscript>'
+
+
+def apply_to_page(content, stylesheet_links, critical, pruned_href=None):
+    """Inline critical CSS before the first stylesheet and make the stylesheet links non-blocking
+
+    With pruned_href the first link is pointed at the pruned per-page sheet
+    (which holds every rule the page uses) and the other links are dropped.
+    """
+    positions = [content.find(tag) for tag in stylesheet_links if tag in content]
+    if not positions:
+        return content
+    first = min(positions)
+    for index, tag in enumerate(stylesheet_links):
+        if pruned_href is None:
+            replacement = async_link(tag)
+        elif index == 0:
+            replacement = async_link(re.sub(r'href="[^"]*"', f'href="{pruned_href}"', tag, count=1))
+        else:
+            replacement = ''
+        content = content.replace(tag, replacement, 1)
+    return content[:first] + f'<style {CRITICAL_MARKER}="">{critical}</style>' + content[first:]
+
+
+def process_page(site_root, page_path, critical_elements, apply=False, use_pruned=False):
+    site_root = Path(site_root)
+    page_rel = Path(page_path).resolve().relative_to(site_root.resolve()).as_posix()
+    page_dir = posixpath.dirname(page_rel)
+    content = restore_page(Path(page_path).read_text(encoding='utf-8'))
+    soup = BeautifulSoup(content, 'html.parser')
+
+    stylesheets, links = [], []
+    for link in soup.find_all('link', href=True):
+        rel = link.get('rel') or []
+        path = local_asset_path(link['href'], page_dir)
+        if 'stylesheet' in rel and path and path.startswith('_next/') and (site_root / path).is_file():
+            stylesheets.append(path)
+            href = re.escape(link['href'].replace('&', '&amp;'))
+            for match in re.finditer(r'<link[^>]*href="' + href + r'"[^>]*>', content):
+                if 'stylesheet' in match.group(0):
+                    links.append(match.group(0))
+                    break
+    if not stylesheets:
+        return None
+
+    original = ''.join((site_root / path).read_text(encoding='utf-8') for path in stylesheets)
+    matcher = PageMatcher(soup, critical_elements)
+    used, critical = prune(parse_rules(original), matcher)
+
+    # Only written when a page links it, so report runs leave nothing behind in the deployed tree
+    pruned_path = None
+    if apply and use_pruned:
+        pruned_path = posixpath.join(posixpath.dirname(stylesheets[0]), f"pruned-{page_slug(page_rel)}.css")
+        atomic_write(site_root / pruned_path, used.encode('utf-8'))
+
+    if apply:
+        pruned_href = posixpath.relpath(pruned_path, page_dir or '.') if pruned_path else None
+        updated = apply_to_page(content, links, critical, pruned_href)
+        atomic_write(page_path, updated.encode('utf-8'))
+
+    return {
+        'page': page_rel,
+        'stylesheets': len(stylesheets),
+        'original': len(original.encode('utf-8')),
+        'used': len(used.encode('utf-8')),
+        'critical': len(critical.encode('utf-8')),
+        'pruned_path': pruned_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline critical CSS and prune unused rules per page")
+    parser.add_argument('pages', nargs='*', help="pages to process (default: every page of the mirror)")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--critical-elements', type=int, default=DEFAULT_CRITICAL_ELEMENTS,
+                        help="elements from the top of the page treated as above the fold")
+    parser.add_argument('--apply', action='store_true', help="inline critical CSS and load stylesheets asynchronously")
+    parser.add_argument('--use-pruned', action='store_true',
+                        help="with --apply, load the pruned per-page sheet instead of the shared bundles")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    pages = [Path(p) for p in args.pages] or [
+        p for p in sorted(root.glob('*.html')) + sorted(root.glob('work/*.html')) if p.name not in SKIP_FILES
+    ]
+
+    print(f"🎨 Pruning CSS for {len(pages)} pages...")
+    print(f"   {'page':<48} {'sheets KB':>10} {'used KB':>9} {'critical KB':>12} {'saved':>7}")
+    totals = {'original': 0, 'used': 0}
+    for page in pages:
+        try:
+            report = process_page(root, page, args.critical_elements, apply=args.apply, use_pruned=args.use_pruned)
+        except Exception as e:
+            print(f"❌ {page}: {e}")
+            continue
+        if report is None:
+            continue
+        totals['original'] += report['original']
+        totals['used'] += report['used']
+        saved = 1 - report['used'] / report['original'] if report['original'] else 0
+        print(f"   {report['page']:<48} {report['original'] / 1024:>10.1f} {report['used'] / 1024:>9.1f} "
+              f"{report['critical'] / 1024:>12.1f} {saved:>7.0%}")
+
+    if totals['original']:
+        saved = totals['original'] - totals['used']
+        print(f"\n📊 {saved / 1024:.1f} KB of unused CSS pruned ({saved / totals['original']:.0%})")
+    if args.apply:
+        print("✅ Critical CSS inlined; stylesheets now load without blocking render")
+
+
+if __name__ == "__main__":
+    main()
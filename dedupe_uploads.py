@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Find near-identical uploads with a perceptual hash and fold them together
+Each upload gets a 256-bit difference hash, kept in an index that is updated
+incrementally (only new or changed files are hashed). Uploads served at the
+same width whose hashes are close and whose thumbnails match are clustered,
+and the smallest copy still large enough for the width they are displayed at
+becomes each cluster's canonical file
+
+Width variants of one upload (x128_a.webp, x768_a.webp) are never merged with
+each other; they are different sizes of the same picture on purpose, and
+neither are re-encoded copies or their sources (see reencode_images.py)
+
+--rewrite points pages at the canonical file and deletes the duplicates
+nothing references any more; --link turns the duplicates left on disk into
+hard links of it, so git and the deploy store their bytes once
+
+    python dedupe_uploads.py                       # report clusters
+    python dedupe_uploads.py --rewrite --link      # point pages at the canonical file, fold the rest
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageStat
+
+from link_rewriter import atomic_write, site_files
+from responsive_variants import IMAGE_WIDTHS, UPLOADS_DIR, VARIANT_PATTERN, reencoded_outputs
+
+INDEX_FILE = '.phash_index.json'
+
+HASH_SIZE = 16
+THUMBNAIL_SIZE = 64
+
+# A pair is a near-duplicate when both checks pass
+MAX_HASH_DISTANCE = 16
+MAX_THUMBNAIL_DIFFERENCE = 2.0
+MAX_ASPECT_DIFFERENCE = 0.02
+
+IMAGE_SUFFIXES = ('.webp', '.jpg', '.jpeg', '.png', '.avif')
+
+# Pages offer variants up to this width, so an original is never displayed wider
+MAX_DISPLAY_WIDTH = max(IMAGE_WIDTHS)
+
+
+def grayscale(path, size):
+    """Grayscale copy of an image; transparency is flattened onto black so logos keep their shape"""
+    with Image.open(path) as image:
+        image.draft('RGB', (size * 4, size * 4))
+        if 'A' in image.getbands():
+            background = Image.new('RGBA', image.size, (0, 0, 0, 255))
+            return Image.alpha_composite(background, image.convert('RGBA')).convert('L')
+        return image.convert('L')
+
+
+def difference_hash(path, size=HASH_SIZE):
+    """size x size bits: whether each pixel is brighter than its right-hand neighbour"""
+    pixels = grayscale(path, size).resize((size + 1, size), Image.Resampling.LANCZOS).tobytes()
+    value = 0
+    for row in range(size):
+        for column in range(size):
+            offset = row * (size + 1) + column
+            value = value << 1 | (pixels[offset] > pixels[offset + 1])
+    return value
+
+
+def thumbnail_difference(path_a, path_b, size=THUMBNAIL_SIZE):
+    """Mean absolute grayscale difference (0-255) of size x size thumbnails"""
+    a, b = [grayscale(path, size).resize((size, size), Image.Resampling.BOX) for path in (path_a, path_b)]
+    return ImageStat.Stat(ImageChops.difference(a, b)).mean[0]
+
+
+def signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def hash_file(path):
+    """Index entry for one upload (safe to run in a worker process)"""
+    with Image.open(path) as image:
+        width, height = image.size
+    return Path(path).name, dict(signature(path), width=width, height=height,
+                                 hash=f"{difference_hash(path):0{HASH_SIZE * HASH_SIZE // 4}x}")
+
+
+class PerceptualIndex:
+    """Upload name -> hash, dimensions and file signature, plus the canonical file of each cluster"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.canonical = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = data.get('files', {})
+                self.canonical = data.get('canonical', {})
+            except (OSError, ValueError):
+                pass
+
+    def update(self, uploads_dir, workers=None):
+        """Hash new and changed uploads, forget deleted ones; returns the number hashed"""
+        # A re-encoded copy and its source are the same picture on purpose, not duplicates
+        outputs = reencoded_outputs(uploads_dir)
+        reencoded = set(outputs) | set(outputs.values())
+        files = sorted(p for p in Path(uploads_dir).iterdir()
+                       if p.suffix.lower() in IMAGE_SUFFIXES and p.name not in reencoded)
+        names = {p.name for p in files}
+        for name in [name for name in self.entries if name not in names]:
+            del self.entries[name]
+
+        stale = []
+        for path in files:
+            entry = self.entries.get(path.name)
+            if not entry or {key: entry[key] for key in ('size', 'mtime_ns')} != signature(path):
+                stale.append(path)
+        if len(stale) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                self.entries.update(pool.map(hash_file, stale))
+        else:
+            self.entries.update(map(hash_file, stale))
+        return len(stale)
+
+    def save(self):
+        data = {'version': 1, 'files': self.entries, 'canonical': self.canonical}
+        atomic_write(self.path, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def served_width(name):
+    """The x<width>_ prefix, or 'original' for the upload itself"""
+    match = VARIANT_PATTERN.match(name)
+    return int(match.group(1)) if match else 'original'
+
+
+def upload_name(name):
+    match = VARIANT_PATTERN.match(name)
+    return match.group(2) if match else name
+
+
+def is_near_duplicate(uploads_dir, a, b, entry_a, entry_b):
+    ratio_a = entry_a['width'] / entry_a['height']
+    ratio_b = entry_b['width'] / entry_b['height']
+    if abs(ratio_a - ratio_b) > MAX_ASPECT_DIFFERENCE * max(ratio_a, ratio_b):
+        return False
+    if bin(int(entry_a['hash'], 16) ^ int(entry_b['hash'], 16)).count('1') > MAX_HASH_DISTANCE:
+        return False
+    return thumbnail_difference(Path(uploads_dir) / a, Path(uploads_dir) / b) <= MAX_THUMBNAIL_DIFFERENCE
+
+
+def find_clusters(index, uploads_dir):
+    """Groups of two or more near-identical uploads, canonical file first"""
+    buckets = {}
+    for name in sorted(index.entries):
+        buckets.setdefault(served_width(name), []).append(name)
+
+    parent = {}
+
+    def root(name):
+        while parent.get(name, name) != name:
+            name = parent[name]
+        return name
+
+    # Buckets hold a few dozen files, so comparing every pair is cheap
+    for names in buckets.values():
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                if upload_name(a) == upload_name(b) or root(a) == root(b):
+                    continue
+                if is_near_duplicate(uploads_dir, a, b, index.entries[a], index.entries[b]):
+                    parent[root(b)] = root(a)
+
+    groups = {}
+    for name in parent:
+        groups.setdefault(root(name), set()).add(name)
+    for top in list(groups):
+        groups[top].add(top)
+
+    clusters = []
+    previous = set(index.canonical)
+    for members in groups.values():
+        entries = {name: index.entries[name] for name in members}
+        longest = {name: max(entry['width'], entry['height']) for name, entry in entries.items()}
+        width = served_width(next(iter(members)))
+        # Variants fit a width x width box; an original is shown at most MAX_DISPLAY_WIDTH wide
+        needed = min(MAX_DISPLAY_WIDTH if width == 'original' else width, max(longest.values()))
+
+        def rank(name):
+            # Large enough first, then the fewest bytes; the earlier choice wins ties (linked copies)
+            return (longest[name] < needed, entries[name]['size'], name not in previous, name)
+        clusters.append(sorted(members, key=rank))
+    return sorted(clusters)
+
+
+def rewrite_references(site_root, replacements):
+    """Point every page, data file and stylesheet at canonical uploads; returns the files changed"""
+    if not replacements:
+        return []
+    pattern = re.compile('uploads/(' + '|'.join(re.escape(name) for name in replacements) + ')')
+    changed = []
+    for path in site_files(site_root):
+        content = path.read_text(encoding='utf-8')
+        updated = pattern.sub(lambda m: 'uploads/' + replacements[m.group(1)], content)
+        if updated != content:
+            atomic_write(path, updated.encode('utf-8'))
+            changed.append(path)
+    return changed
+
+
+def unreferenced(site_root, names):
+    """Those of names no page, data file or stylesheet mentions as an upload"""
+    left = set(names)
+    for path in site_files(site_root):
+        content = path.read_text(encoding='utf-8')
+        left = {name for name in left if f"uploads/{name}" not in content}
+        if not left:
+            break
+    return left
+
+
+def link_duplicate(canonical, duplicate):
+    """Replace duplicate with a hard link to canonical; False if they already share an inode or format"""
+    # Vercel picks the Content-Type from the name, so a .webp must keep holding WebP bytes
+    if canonical.suffix.lower() != duplicate.suffix.lower() or os.path.samefile(canonical, duplicate):
+        return False
+    tmp_path = duplicate.with_name(f".{duplicate.name}.{os.getpid()}.link")
+    os.link(canonical, tmp_path)
+    os.replace(tmp_path, duplicate)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster near-identical uploads by perceptual hash")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rewrite', action='store_true',
+                        help="point references at each cluster's canonical file and delete unreferenced duplicates")
+    parser.add_argument('--link', action='store_true', help="replace remaining duplicates with hard links to the canonical file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    uploads_dir = Path(args.root) / UPLOADS_DIR
+    index = PerceptualIndex(uploads_dir / INDEX_FILE)
+    hashed = index.update(uploads_dir, workers=args.workers)
+    print(f"🔍 Indexed {len(index.entries)} uploads ({hashed} hashed, {len(index.entries) - hashed} unchanged)")
+
+    clusters = find_clusters(index, uploads_dir)
+    index.canonical = {cluster[0]: cluster[1:] for cluster in clusters}
+
+    replacements = {}
+    duplicate_bytes = 0
+    for cluster in clusters:
+        canonical = cluster[0]
+        print(f"   🖼️  {canonical}")
+        for duplicate in cluster[1:]:
+            replacements[duplicate] = canonical
+            duplicate_bytes += index.entries[duplicate]['size']
+            print(f"      ≈ {duplicate} ({index.entries[duplicate]['size'] / 1024:.1f} KB)")
+
+    changed = []
+    deleted = []
+    if args.rewrite:
+        changed = rewrite_references(args.root, replacements)
+        # An original with width variants on disk stays: responsive_variants.py resizes from it
+        sources = {upload_name(path.name) for path in uploads_dir.iterdir() if VARIANT_PATTERN.match(path.name)}
+        for name in sorted(unreferenced(args.root, replacements) - sources):
+            (uploads_dir / name).unlink()
+            deleted.append(name)
+    linked = 0
+    if args.link:
+        for duplicate, canonical in replacements.items():
+            if duplicate not in deleted and link_duplicate(uploads_dir / canonical, uploads_dir / duplicate):
+                linked += 1
+    if deleted or linked:
+        # Deleted files drop out and linked ones now carry the canonical file's signature
+        index.update(uploads_dir, workers=args.workers)
+    index.save()
+
+    print(f"\n📊 Dedupe summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Clusters: {len(clusters)}, duplicates: {len(replacements)} ({duplicate_bytes / 1024:.1f} KB)")
+    if args.rewrite:
+        print(f"   ✏️  Files with rewritten references: {len(changed)}")
+        print(f"   🗑️  Unreferenced duplicates deleted: {len(deleted)}")
+    if args.link:
+        print(f"   🔗 Hard-linked: {linked}")
+
+
+if __name__ == "__main__":
+    main()
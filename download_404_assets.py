@@ -3,10 +3,18 @@
 Download specific missing assets based on 404 errors from server logs
 """
 
+import logging
 import requests
 from pathlib import Path
 import time
 
+from phase_profiler import enable_profiling, phase
+from logo_sprites import update_sprites
+from responsive_variants import build_missing_variant
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 # Missing client logos from server logs
 missing_assets = [
     "d2csodhem33bqt.cloudfront.net/uploads/x256_Calzedonia_0854fdd7d4.webp",
@@ -50,9 +58,12 @@ def download_missing_assets():
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
     })
+    configure_session(session)
     
     downloaded = 0
+    generated = 0
     failed = 0
+    new_logos = 0
     
     for asset_path in missing_assets:
         # Convert to full URL
@@ -67,11 +78,18 @@ def download_missing_assets():
         
         # Skip if already exists
         if local_path.exists():
-            print(f"⏭️  Already exists: {asset_path}")
+            log.info(f"⏭️  Already exists: {asset_path}")
+            continue
+
+        # Width variants of an upload we already have are resized locally
+        if build_missing_variant(local_path):
+            log.info(f"🖼️  Generated: {asset_path}")
+            generated += 1
+            new_logos += local_path.name.startswith('x256_')
             continue
             
         try:
-            print(f"📥 Downloading: {url}")
+            log.info(f"📥 Downloading: {url}")
             response = session.get(url, timeout=30)
             response.raise_for_status()
             
@@ -80,17 +98,25 @@ def download_missing_assets():
             with open(local_path, 'wb') as f:
                 f.write(response.content)
             
-            print(f"✅ Saved: {local_path}")
+            log.info(f"✅ Saved: {local_path}")
             downloaded += 1
+            new_logos += local_path.name.startswith('x256_')
             time.sleep(0.5)
             
         except Exception as e:
-            print(f"❌ Failed {url}: {e}")
+            log.warning(f"❌ Failed {url}: {e}")
             failed += 1
     
     print(f"\n📊 Summary:")
     print(f"   ✅ Downloaded: {downloaded}")
+    print(f"   🖼️  Generated locally: {generated}")
     print(f"   ❌ Failed: {failed}")
 
+    if new_logos:
+        # The about page's logo atlases are stale once the logo set changes
+        update_sprites()
+
 if __name__ == "__main__":
-    download_missing_assets()
+    enable_profiling()
+    with phase('download'):
+        download_missing_assets()
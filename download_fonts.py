@@ -1,37 +1,49 @@
 #!/usr/bin/env python3
+import sys
+
 import requests
 from pathlib import Path
 
+from font_css import FONT_URL_PATTERN
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
 def download_fonts():
+    session = requests.Session()
+    # Google serves woff2 only to browsers it recognises; other clients get .ttf URLs
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    })
+    configure_session(session)
+
     # Download Google Fonts CSS
     css_url = "https://fonts.googleapis.com/css2?family=Geist+Mono:wght@100..900&family=Geist:wght@100..900&display=swap"
     css_path = Path("fonts.googleapis.com/css2.css")
     
     css_path.parent.mkdir(parents=True, exist_ok=True)
     
-    response = requests.get(css_url)
+    response = session.get(css_url)
+    response.raise_for_status()
+    # Download every font file the CSS declares (font_subset.py cuts them down afterwards)
+    font_urls = list(dict.fromkeys(FONT_URL_PATTERN.findall(response.text)))
+    if not font_urls:
+        print(f"❌ No woff2 fonts in {css_url}, leaving {css_path} as is")
+        sys.exit(1)
+
     with open(css_path, 'w') as f:
         f.write(response.text)
     print(f"✅ Downloaded: {css_path}")
     
-    # Download font files referenced in CSS
-    font_urls = [
-        "https://fonts.gstatic.com/s/geist/v3/gyByhwUxId8gMEwcGFWNOITd.woff2",
-        "https://fonts.gstatic.com/s/geist/v3/gyByhwUxId8gMEwSGFWNOITddY4.woff2", 
-        "https://fonts.gstatic.com/s/geist/v3/gyByhwUxId8gMEwYGFWNOITddY4.woff2",
-        "https://fonts.gstatic.com/s/geistmono/v3/or3nQ6H-1_WfwkMZI_qYFrcdmhHkjko.woff2",
-        "https://fonts.gstatic.com/s/geistmono/v3/or3nQ6H-1_WfwkMZI_qYFrkdmhHkjkotbA.woff2",
-        "https://fonts.gstatic.com/s/geistmono/v3/or3nQ6H-1_WfwkMZI_qYFrMdmhHkjkotbA.woff2"
-    ]
-    
     for font_url in font_urls:
         font_path = Path(font_url.replace("https://", ""))
         font_path.parent.mkdir(parents=True, exist_ok=True)
         
-        response = requests.get(font_url)
+        response = session.get(font_url)
         with open(font_path, 'wb') as f:
             f.write(response.content)
         print(f"✅ Downloaded: {font_path}")
 
 if __name__ == "__main__":
-    download_fonts()
+    enable_profiling()
+    with phase('download'):
+        download_fonts()
@@ -3,6 +3,7 @@
 Download all missing CSS, JS, and other assets from all HTML pages
 """
 
+import logging
 import os
 import re
 import requests
@@ -11,6 +12,11 @@ from pathlib import Path
 import time
 from bs4 import BeautifulSoup
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 class MissingAssetsDownloader:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -19,6 +25,7 @@ class MissingAssetsDownloader:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        configure_session(self.session)
         self.downloaded_assets = set()
         
     def download_asset(self, url, local_path):
@@ -27,7 +34,7 @@ class MissingAssetsDownloader:
             return
             
         try:
-            print(f"Downloading asset: {url}")
+            log.info(f"Downloading asset: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
@@ -38,11 +45,11 @@ class MissingAssetsDownloader:
                 f.write(response.content)
                 
             self.downloaded_assets.add(url)
-            print(f"Saved: {local_path}")
+            log.info(f"Saved: {local_path}")
             time.sleep(0.5)
             
         except Exception as e:
-            print(f"Error downloading {url}: {e}")
+            log.warning(f"Error downloading {url}: {e}")
     
     def extract_assets_from_html(self, html_file):
         """Extract all asset URLs from an HTML file"""
@@ -112,45 +119,49 @@ class MissingAssetsDownloader:
         """Download all missing assets from all HTML files"""
         
         # Get all HTML files
-        html_files = list(self.output_dir.glob('*.html')) + list(self.output_dir.glob('work/*.html'))
+        with phase('discovery'):
+            html_files = list(self.output_dir.glob('*.html')) + list(self.output_dir.glob('work/*.html'))
         
         all_assets = set()
         
         print(f"Extracting assets from {len(html_files)} HTML files...")
         
         # Extract assets from all HTML files
-        for html_file in html_files:
-            assets = self.extract_assets_from_html(html_file)
-            for asset_type, asset_url in assets:
-                all_assets.add((asset_type, asset_url))
-            print(f"Found {len(assets)} assets in {html_file}")
+        with phase('extraction'):
+            for html_file in html_files:
+                assets = self.extract_assets_from_html(html_file)
+                for asset_type, asset_url in assets:
+                    all_assets.add((asset_type, asset_url))
+                log.info(f"Found {len(assets)} assets in {html_file}")
         
         print(f"\nTotal unique assets found: {len(all_assets)}")
         
         # Download each asset
-        for asset_type, asset_url in all_assets:
-            if asset_url.startswith('data:'):
-                continue
+        with phase('download'):
+            for asset_type, asset_url in all_assets:
+                if asset_url.startswith('data:'):
+                    continue
+                    
+                # Convert to full URL
+                if asset_url.startswith('/'):
+                    full_url = urljoin(self.base_url, asset_url)
+                elif asset_url.startswith('http'):
+                    full_url = asset_url
+                else:
+                    full_url = urljoin(self.base_url, asset_url)
                 
-            # Convert to full URL
-            if asset_url.startswith('/'):
-                full_url = urljoin(self.base_url, asset_url)
-            elif asset_url.startswith('http'):
-                full_url = asset_url
-            else:
-                full_url = urljoin(self.base_url, asset_url)
-            
-            local_path = self.get_local_asset_path(asset_url)
-            
-            # Skip if already exists
-            if local_path.exists():
-                print(f"Already exists: {local_path}")
-                continue
+                local_path = self.get_local_asset_path(asset_url)
                 
-            self.download_asset(full_url, local_path)
+                # Skip if already exists
+                if local_path.exists():
+                    log.info(f"Already exists: {local_path}")
+                    continue
+                    
+                self.download_asset(full_url, local_path)
         
         print(f"\nAsset download complete! Downloaded {len(self.downloaded_assets)} new assets.")
 
 if __name__ == "__main__":
+    enable_profiling()
     downloader = MissingAssetsDownloader("https://lo2s.com", ".")
     downloader.download_all_missing_assets()
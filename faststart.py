@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Move the moov atom of mirrored MP4s in front of mdat ("faststart")
+Browsers cannot start playing an MP4 whose moov sits at the end until the
+whole file is downloaded. This inspects the top-level boxes, moves moov
+ahead of the first mdat and shifts every stco/co64 chunk offset to match
+
+Media data is copied from a memory map in chunks, so only moov (the index,
+a few hundred KB at most) is ever held in memory
+
+    python faststart.py                        # every video in the mirror
+    python faststart.py --inspect video.mp4    # print the box tree
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+
+from link_rewriter import atomic_output
+
+VIDEO_SUFFIXES = ('.mp4', '.m4v', '.mov')
+
+# Boxes on the path from moov to stco/co64; everything else is copied verbatim
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+COPY_CHUNK = 1024 * 1024
+
+# Mirror copies that are never deployed
+EXCLUDE_DIRS = {'admin', 'httrack_complete', 'httrack_shkoon', 'lo2s.com', 'jordanlago.com', 'node_modules'}
+
+
+class Mp4Error(Exception):
+    """The file is not an MP4 this tool can rewrite"""
+
+
+class Box:
+    """One box: type, absolute offset, header size and total size"""
+
+    def __init__(self, kind, offset, header_size, size):
+        self.kind = kind
+        self.offset = offset
+        self.header_size = header_size
+        self.size = size
+
+    @property
+    def end(self):
+        return self.offset + self.size
+
+    def __repr__(self):
+        return f"{self.kind.decode('latin-1')}@{self.offset}+{self.size}"
+
+
+def read_boxes(data, start=0, end=None):
+    """Boxes laid out back to back in data[start:end] (bytes or mmap)"""
+    end = len(data) if end is None else end
+    boxes = []
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        header_size = 8
+        if size == 1:
+            if offset + 16 > end:
+                raise Mp4Error(f"truncated 64-bit box header at {offset}")
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise Mp4Error(f"box {kind!r} at {offset} runs past the end of its parent")
+        boxes.append(Box(kind, offset, header_size, size))
+        offset += size
+    return boxes
+
+
+def box_header(kind, payload_size):
+    if payload_size + 8 <= 0xFFFFFFFF:
+        return struct.pack('>I4s', payload_size + 8, kind)
+    return struct.pack('>I4sQ', 1, kind, payload_size + 16)
+
+
+def rewrite_moov(moov, shift, use_co64=False):
+    """Copy of the moov bytes with every chunk offset passed through shift()
+
+    With use_co64 every stco table is widened to co64 (needed once a shifted
+    offset no longer fits in 32 bits)
+    """
+
+    def rebuild(data, box):
+        if box.kind == b'cmov':
+            raise Mp4Error("compressed moov (cmov) is not supported")
+        if box.kind in CONTAINER_BOXES:
+            children = read_boxes(data, box.offset + box.header_size, box.end)
+            payload = b''.join(rebuild(data, child) for child in children)
+            # Keep any padding after the last child
+            payload += bytes(data[children[-1].end if children else box.offset + box.header_size:box.end])
+            return box_header(box.kind, len(payload)) + payload
+        if box.kind in (b'stco', b'co64'):
+            body = box.offset + box.header_size
+            version_flags, count = struct.unpack('>4sI', data[body:body + 8])
+            width = 'I' if box.kind == b'stco' else 'Q'
+            offsets = struct.unpack(f'>{count}{width}', data[body + 8:body + 8 + count * struct.calcsize(width)])
+            offsets = [shift(offset) for offset in offsets]
+            kind = b'co64' if use_co64 or box.kind == b'co64' else b'stco'
+            if kind == b'stco' and offsets and max(offsets) > 0xFFFFFFFF:
+                raise OverflowError
+            payload = version_flags + struct.pack(f'>I{count}{"Q" if kind == b"co64" else "I"}', count, *offsets)
+            return box_header(kind, len(payload)) + payload
+        return bytes(data[box.offset:box.end])
+
+    return rebuild(moov, read_boxes(moov)[0])
+
+
+def plan(data):
+    """(boxes, moov, first_mdat) for a file, or raise Mp4Error"""
+    boxes = read_boxes(data)
+    kinds = [box.kind for box in boxes]
+    if not boxes or boxes[0].kind not in (b'ftyp', b'styp', b'free', b'wide', b'skip'):
+        raise Mp4Error("no ftyp box, not an MP4")
+    if b'moof' in kinds:
+        raise Mp4Error("fragmented MP4 (moof), already streamable")
+    if kinds.count(b'moov') != 1 or b'mdat' not in kinds:
+        raise Mp4Error("expected exactly one moov and at least one mdat")
+    moov = boxes[kinds.index(b'moov')]
+    first_mdat = boxes[kinds.index(b'mdat')]
+    return boxes, moov, first_mdat
+
+
+def faststart_file(path, dry_run=False):
+    """Rewrite one file so moov precedes mdat; returns 'moved', 'faststart' or raises Mp4Error"""
+    path = Path(path)
+    with open(path, 'rb') as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            raise Mp4Error("empty file")
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            boxes, moov, first_mdat = plan(data)
+            if moov.offset < first_mdat.offset:
+                return 'faststart'
+            if dry_run:
+                return 'moved'
+
+            original = bytes(data[moov.offset:moov.end])
+            insert_at, moov_start, moov_end = first_mdat.offset, moov.offset, moov.end
+
+            def shifted(new_size):
+                # Bytes between the insertion point and the old moov move down by the new moov's
+                # size; bytes after it (a later mdat) only by how much the moov grew or shrank
+                def shift(offset):
+                    if insert_at <= offset < moov_start:
+                        return offset + new_size
+                    if offset >= moov_end:
+                        return offset + new_size - len(original)
+                    return offset
+                return shift
+
+            # The new moov's size decides the shift, and widening stco to co64 (or a
+            # shorter box header) changes that size; its size does not depend on the
+            # offsets themselves, so this settles within a few passes
+            size, use_co64 = len(original), False
+            while True:
+                try:
+                    new_moov = rewrite_moov(original, shifted(size), use_co64)
+                except OverflowError:
+                    use_co64 = True
+                    continue
+                if len(new_moov) == size:
+                    break
+                size = len(new_moov)
+
+            with atomic_output(path) as f:
+                for box in boxes:
+                    if box.offset == insert_at:
+                        f.write(new_moov)
+                    if box.offset == moov_start:
+                        continue
+                    for chunk_start in range(box.offset, box.end, COPY_CHUNK):
+                        f.write(data[chunk_start:min(chunk_start + COPY_CHUNK, box.end)])
+    return 'moved'
+
+
+def print_tree(path):
+    """Print the box tree of a file, descending into the containers"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        def show(boxes, depth):
+            for box in boxes:
+                print(f"{'  ' * depth}{box.kind.decode('latin-1')} offset={box.offset} size={box.size}")
+                if box.kind in CONTAINER_BOXES:
+                    show(read_boxes(data, box.offset + box.header_size, box.end), depth + 1)
+        show(read_boxes(data), 0)
+
+
+def mirror_videos(root):
+    videos = []
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDE_DIRS and not d.startswith('.'))
+        videos += [Path(directory) / name for name in sorted(names) if name.lower().endswith(VIDEO_SUFFIXES)]
+    return videos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move the moov atom of MP4 files ahead of mdat")
+    parser.add_argument('files', nargs='*', help="videos to rewrite (default: every video in the mirror)")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--inspect', action='store_true', help="print the box tree of each file and exit")
+    parser.add_argument('--dry-run', action='store_true', help="report which files would change")
+    args = parser.parse_args()
+
+    files = [Path(p) for p in args.files] or mirror_videos(args.root)
+    if args.inspect:
+        for path in files:
+            print(f"📦 {path}")
+            print_tree(path)
+        return
+
+    print(f"🎬 Checking {len(files)} videos...")
+    started = time.perf_counter()
+    counts = {'moved': 0, 'faststart': 0, 'skipped': 0}
+    for path in files:
+        try:
+            status = faststart_file(path, dry_run=args.dry_run)
+        except (Mp4Error, OSError, struct.error) as e:
+            counts['skipped'] += 1
+            print(f"   ⏭️  {path}: {e}")
+            continue
+        counts[status] += 1
+        if status == 'moved':
+            print(f"   {'🔍' if args.dry_run else '✏️ '} {path}: moov moved before mdat")
+
+    print(f"\n📊 Faststart summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   {'Would move' if args.dry_run else 'Moved'}: {counts['moved']}")
+    print(f"   Already faststart: {counts['faststart']}")
+    print(f"   Skipped: {counts['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
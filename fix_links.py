@@ -4,9 +4,11 @@ Fix links in HTML to point to local assets for offline browsing
 """
 
 import re
-import os
 from pathlib import Path
 
+from link_rewriter import RewriteManifest, rewrite_site, stylesheet_files
+from phase_profiler import enable_profiling, phase
+
 def fix_html_links():
     """Update HTML file to use local asset paths"""
     
@@ -49,27 +51,22 @@ def fix_html_links():
     print("Created index_local.html with local asset links")
 
 def fix_css_links():
-    """Fix font URLs in CSS files"""
-    css_files = [
-        '_next/static/css/6e1652e5440a44c1.css',
-        '_next/static/css/01af5632c72df255.css',
-        'fonts.googleapis.com/css2.css'
-    ]
+    """Fix url() and @import references in every stylesheet of the mirror"""
+    base_dir = Path('.')
+    manifest = RewriteManifest.for_site(base_dir)
+    
+    # Unchanged stylesheets are skipped by content hash via the rewrite manifest
+    summary = rewrite_site(base_dir, stylesheet_files(base_dir), manifest)
+    manifest.save()
     
-    for css_file in css_files:
-        if os.path.exists(css_file):
-            with open(css_file, 'r', encoding='utf-8') as f:
-                css_content = f.read()
-            
-            # Fix font URLs
-            css_content = css_content.replace('https://fonts.gstatic.com/', '../fonts.gstatic.com/')
-            
-            with open(css_file, 'w', encoding='utf-8') as f:
-                f.write(css_content)
-            
-            print(f"Updated {css_file}")
+    for result in summary.results:
+        if result['changed']:
+            print(f"Updated {result['path']}")
+    print(f"Stylesheets: {summary.changed} updated, {summary.up_to_date} already local")
 
 if __name__ == "__main__":
-    fix_html_links()
-    fix_css_links()
+    enable_profiling()
+    with phase('rewrite'):
+        fix_html_links()
+        fix_css_links()
     print("Link fixing complete!")
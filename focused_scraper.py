@@ -3,6 +3,7 @@
 Focused scraper for first 10 work and archive pages only
 """
 
+import logging
 import os
 import requests
 from urllib.parse import urljoin, urlparse
@@ -11,6 +12,11 @@ import time
 import re
 from bs4 import BeautifulSoup
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 class FocusedScraper:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -19,13 +25,14 @@ class FocusedScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        configure_session(self.session)
         self.downloaded = 0
         self.failed = 0
         
     def download_file(self, url, local_path):
         """Download a single file"""
         try:
-            print(f"Downloading: {url}")
+            log.info(f"Downloading: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
@@ -34,13 +41,13 @@ class FocusedScraper:
             with open(local_path, 'wb') as f:
                 f.write(response.content)
             
-            print(f"✓ Saved: {local_path}")
+            log.info(f"✓ Saved: {local_path}")
             self.downloaded += 1
             time.sleep(0.5)
             return True
             
         except Exception as e:
-            print(f"✗ Failed {url}: {e}")
+            log.warning(f"✗ Failed {url}: {e}")
             self.failed += 1
             return False
     
@@ -111,7 +118,8 @@ class FocusedScraper:
         print("🎯 Focusing on first 10 work pages and archive...")
         
         # Get first 10 work pages
-        work_pages = self.get_first_10_work_pages()
+        with phase('discovery'):
+            work_pages = self.get_first_10_work_pages()
         
         # Add main pages
         main_pages = [
@@ -127,23 +135,25 @@ class FocusedScraper:
         
         # Extract all assets
         all_assets = set()
-        for page in all_pages:
-            assets = self.extract_assets_from_html(page)
-            all_assets.update(assets)
-            print(f"   Found {len(assets)} assets in {page.name}")
+        with phase('extraction'):
+            for page in all_pages:
+                assets = self.extract_assets_from_html(page)
+                all_assets.update(assets)
+                log.info(f"   Found {len(assets)} assets in {page.name}")
         
         print(f"\n🎯 Total unique assets found: {len(all_assets)}")
         
         # Download missing assets
-        for asset_url in all_assets:
-            local_path = self.get_local_path(asset_url)
-            
-            # Skip if already exists and has content
-            if local_path.exists() and local_path.stat().st_size > 0:
-                continue
-            
-            full_url = self.fix_url(asset_url)
-            self.download_file(full_url, local_path)
+        with phase('download'):
+            for asset_url in all_assets:
+                local_path = self.get_local_path(asset_url)
+                
+                # Skip if already exists and has content
+                if local_path.exists() and local_path.stat().st_size > 0:
+                    continue
+                
+                full_url = self.fix_url(asset_url)
+                self.download_file(full_url, local_path)
         
         print(f"\n📊 Summary:")
         print(f"   ✅ Downloaded: {self.downloaded}")
@@ -152,5 +162,6 @@ class FocusedScraper:
         return self.downloaded, self.failed
 
 if __name__ == "__main__":
+    enable_profiling()
     scraper = FocusedScraper("https://lo2s.com", ".")
     scraper.scrape_first_10_pages()
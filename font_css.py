@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Parsing helpers for @font-face stylesheets (Google Fonts CSS), shared by
+download_fonts.py, font_subset.py and inject_resource_hints.py
+"""
+
+import re
+
+FONT_FACE_PATTERN = re.compile(r'@font-face\s*{([^}]*)}')
+FONT_URL_PATTERN = re.compile(r'url\(\s*["\']?([^"\')]+\.woff2)["\']?\s*\)')
+UNICODE_RANGE_PATTERN = re.compile(r'unicode-range\s*:\s*([^;]+)')
+
+
+def parse_unicode_range(value):
+    """[(first, last)] codepoint ranges of a unicode-range value (U+41, U+0-FF, U+4??)"""
+    ranges = []
+    for part in value.split(','):
+        part = part.strip().upper().removeprefix('U+')
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+        else:
+            first, last = part.replace('?', '0'), part.replace('?', 'F')
+        ranges.append((int(first, 16), int(last.removeprefix('U+'), 16)))
+    return ranges
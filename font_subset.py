@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Subset the mirrored web fonts to the characters the site actually uses
+Every @font-face of the Google Fonts stylesheets is cut down to the glyphs of
+the characters found in the pages, _next/data JSON and stylesheets (plus
+printable ASCII, for text typed into the contact form); its unicode-range is
+narrowed to match and faces left with no used characters are dropped, so the
+browser never fetches them
+
+The stylesheet as downloaded is kept beside it as <name>.bak and is always the
+source of later runs; subsets are written beside their font as
+<stem>.subset-<digest>.woff2, so an unchanged character set reuses them
+
+    python font_subset.py
+    python font_subset.py --dry-run
+"""
+
+import argparse
+import hashlib
+import html
+import io
+import json
+import posixpath
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+from font_css import FONT_URL_PATTERN, UNICODE_RANGE_PATTERN, parse_unicode_range
+from link_rewriter import NEXT_DATA_PATTERN, SKIP_FILES, atomic_output, atomic_write, local_asset_path, stylesheet_files
+
+FONT_STYLESHEETS = 'fonts.googleapis.com/*'
+
+# A face block with the "/* latin */" comment Google puts in front of it
+FACE_BLOCK_PATTERN = re.compile(r'(?:/\*[^*]*\*/\s*)?@font-face\s*{([^}]*)}\s*')
+SUBSET_PATTERN = re.compile(r'\.subset-[0-9a-f]+\.woff2$')
+
+ALWAYS_KEPT = {chr(codepoint) for codepoint in range(0x20, 0x7F)}
+
+
+def json_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from json_strings(item)
+
+
+def used_characters(root):
+    """Every character of the pages, _next/data JSON and stylesheets, in both cases"""
+    root = Path(root)
+    pages = [p for p in sorted(root.glob('*.html')) + sorted(root.glob('work/*.html')) if p.name not in SKIP_FILES]
+    characters = set(ALWAYS_KEPT)
+    for path in pages:
+        content = path.read_text(encoding='utf-8')
+        characters.update(html.unescape(content))
+        match = NEXT_DATA_PATTERN.search(content)
+        if match:
+            try:
+                characters.update(''.join(json_strings(json.loads(match.group(2)))))
+            except ValueError:
+                pass
+    for path in sorted(root.glob('_next/data/**/*.json')):
+        try:
+            characters.update(''.join(json_strings(json.loads(path.read_text(encoding='utf-8')))))
+        except ValueError:
+            continue
+    for path in stylesheet_files(root):
+        characters.update(path.read_text(encoding='utf-8', errors='replace'))
+    # Headings are uppercased with text-transform, so each letter needs its other case
+    for character in list(characters):
+        for variant in (character.upper(), character.lower()):
+            if len(variant) == 1:
+                characters.add(variant)
+    return {ord(character) for character in characters}
+
+
+def format_unicode_range(codepoints):
+    """Compact unicode-range value for a set of codepoints"""
+    parts = []
+    ordered = sorted(codepoints)
+    start = previous = ordered[0]
+    for codepoint in ordered[1:] + [None]:
+        if codepoint is not None and codepoint == previous + 1:
+            previous = codepoint
+            continue
+        parts.append(f"U+{start:X}" if start == previous else f"U+{start:X}-{previous:X}")
+        if codepoint is not None:
+            start = previous = codepoint
+    return ', '.join(parts)
+
+
+def font_codepoints(path):
+    with TTFont(path, lazy=True) as font:
+        return set(font.getBestCmap())
+
+
+def subset_font(source, target, codepoints):
+    """Write a WOFF2 subset of source holding the glyphs of codepoints (safe to run in a worker process)"""
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.notdef_outline = True
+    with TTFont(source) as font:
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        buffer = io.BytesIO()
+        font.flavor = 'woff2'
+        font.save(buffer)
+    with atomic_output(target) as f:
+        f.write(buffer.getvalue())
+    return str(target), len(buffer.getvalue())
+
+
+def backup_path(path):
+    return path.with_name(path.name + '.bak')
+
+
+def stylesheet_source(path):
+    """The stylesheet as downloaded: the file itself while it names no subsets, else its backup"""
+    css = path.read_text(encoding='utf-8')
+    if not any(SUBSET_PATTERN.search(url) for url in FONT_URL_PATTERN.findall(css)):
+        return css
+    return backup_path(path).read_text(encoding='utf-8')
+
+
+def plan_stylesheet(root, path, css, used):
+    """(new css, [(source, target, codepoints)] subsets to build, [(font path, kept count)])"""
+    css_dir = posixpath.dirname(path.relative_to(root).as_posix())
+    jobs = []
+    faces = []
+
+    def rewrite(match):
+        block = match.group(1)
+        url = FONT_URL_PATTERN.search(block)
+        font_path = local_asset_path(url.group(1), css_dir) if url else None
+        if not font_path or not (root / font_path).is_file():
+            return match.group(0)
+        unicode_range = UNICODE_RANGE_PATTERN.search(block)
+        codepoints = font_codepoints(root / font_path) & used
+        if unicode_range:
+            codepoints = {c for c in codepoints
+                          if any(first <= c <= last for first, last in parse_unicode_range(unicode_range.group(1)))}
+        faces.append((font_path, len(codepoints)))
+        if not codepoints:
+            return ''
+
+        source = root / font_path
+        digest = hashlib.sha256(f"{font_path}:{source.stat().st_size}:{sorted(codepoints)}".encode('utf-8'))
+        target = source.with_name(f"{source.name[:-len('.woff2')]}.subset-{digest.hexdigest()[:10]}.woff2")
+        jobs.append((source, target, codepoints))
+
+        href = posixpath.relpath(target.relative_to(root).as_posix(), css_dir or '.')
+        face = match.group(0).replace(url.group(1), href)
+        new_range = f"unicode-range: {format_unicode_range(codepoints)}"
+        if unicode_range:
+            return face.replace(unicode_range.group(0), new_range)
+        return face.replace(block, block.rstrip() + f"\n  {new_range};\n")
+
+    return FACE_BLOCK_PATTERN.sub(rewrite, css), jobs, faces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subset the mirrored web fonts to the characters the site uses")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help="report what would be kept without writing files")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    root = Path(args.root)
+    used = used_characters(root)
+    print(f"🔤 {len(used)} distinct characters used across the site")
+
+    stylesheets = [p for p in sorted(root.glob(FONT_STYLESHEETS)) if p.is_file() and p.suffix in ('', '.css')]
+    plans = []
+    for path in stylesheets:
+        css = stylesheet_source(path)
+        new_css, jobs, faces = plan_stylesheet(root, path, css, used)
+        plans.append((path, css, new_css, jobs))
+        print(f"   📄 {path}")
+        for font_path, kept in faces:
+            print(f"      {font_path}: {kept} characters" if kept else f"      {font_path}: unused, dropped")
+
+    jobs = list({target: (source, target, codepoints) for _, _, _, jobs in plans
+                 for source, target, codepoints in jobs}.values())
+    pending = [job for job in jobs if not job[1].exists()]
+    if not args.dry_run:
+        if len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                list(pool.map(subset_font, *zip(*pending)))
+        else:
+            for job in pending:
+                subset_font(*job)
+
+        for path, css, new_css, _ in plans:
+            if not backup_path(path).exists() or path.read_text(encoding='utf-8') == css:
+                atomic_write(backup_path(path), css.encode('utf-8'))
+            atomic_write(path, new_css.encode('utf-8'))
+
+        # Subsets for an older character set are no longer referenced
+        targets = {job[1] for job in jobs}
+        for source in {job[0] for job in jobs}:
+            for stale in source.parent.glob(source.name[:-len('.woff2')] + '.subset-*.woff2'):
+                if stale not in targets:
+                    stale.unlink()
+
+    before = sum(source.stat().st_size for source in {job[0] for job in jobs})
+    after = sum(target.stat().st_size for _, target, _ in jobs if target.exists())
+    print(f"\n📊 Font subset summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Subsets built: {0 if args.dry_run else len(pending)} of {len(jobs)}")
+    if not args.dry_run:
+        print(f"   Fonts still used: {before / 1024:.1f} KB → {after / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+HAR record/replay transport for deterministic offline scraper runs
+Records all traffic of a requests session or Playwright browser context to a
+HAR 1.2 file and serves it back later with configurable latency and bandwidth
+"""
+
+import base64
+import io
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urldefrag
+
+# HAR stores decoded bodies, so these must not be replayed as-is
+HOP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+TEXT_MIME_PREFIXES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _header_list(headers):
+    return [{'name': name, 'value': value} for name, value in headers.items()]
+
+
+class HarArchive:
+    """In-memory HAR log with lookup by method and URL"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = []
+        self.index = {}
+        self.replay_positions = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Load an existing HAR file"""
+        archive = cls(path)
+        with open(archive.path, 'r', encoding='utf-8') as f:
+            har = json.load(f)
+        for entry in har.get('log', {}).get('entries', []):
+            archive._index_entry(entry)
+        return archive
+
+    def _key(self, method, url):
+        return method.upper(), urldefrag(url)[0]
+
+    def _index_entry(self, entry):
+        self.entries.append(entry)
+        key = self._key(entry['request']['method'], entry['request']['url'])
+        self.index.setdefault(key, []).append(entry)
+
+    def add(self, method, url, request_headers, status, reason, response_headers, body,
+            started=None, wait=0.0, receive=0.0):
+        """Append one request/response exchange; times are in seconds"""
+        mime_type = response_headers.get('content-type', response_headers.get('Content-Type', ''))
+        content = {'size': len(body), 'mimeType': mime_type}
+        if mime_type.startswith(TEXT_MIME_PREFIXES):
+            try:
+                content['text'] = body.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+        if 'text' not in content:
+            content['text'] = base64.b64encode(body).decode('ascii')
+            content['encoding'] = 'base64'
+
+        entry = {
+            'startedDateTime': started or _now_iso(),
+            'time': round((wait + receive) * 1000, 3),
+            'request': {
+                'method': method.upper(),
+                'url': url,
+                'httpVersion': 'HTTP/1.1',
+                'headers': _header_list(request_headers),
+                'queryString': [],
+                'cookies': [],
+                'headersSize': -1,
+                'bodySize': 0,
+            },
+            'response': {
+                'status': status,
+                'statusText': reason or '',
+                'httpVersion': 'HTTP/1.1',
+                'headers': _header_list(response_headers),
+                'cookies': [],
+                'content': content,
+                'redirectURL': response_headers.get('location', response_headers.get('Location', '')),
+                'headersSize': -1,
+                'bodySize': len(body),
+            },
+            'cache': {},
+            'timings': {'send': 0, 'wait': round(wait * 1000, 3), 'receive': round(receive * 1000, 3)},
+        }
+        with self.lock:
+            self._index_entry(entry)
+        return entry
+
+    def lookup(self, method, url):
+        """Return the next recorded entry for a request, repeating the last one"""
+        key = self._key(method, url)
+        with self.lock:
+            candidates = self.index.get(key)
+            if not candidates:
+                return None
+            position = self.replay_positions.get(key, 0)
+            self.replay_positions[key] = position + 1
+            return candidates[min(position, len(candidates) - 1)]
+
+    def save(self):
+        """Write the archive to disk as HAR 1.2"""
+        with self.lock:
+            har = {
+                'log': {
+                    'version': '1.2',
+                    'creator': {'name': 'lo2s-har-transport', 'version': '1.0'},
+                    'entries': list(self.entries),
+                }
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(har, f)
+        print(f"💾 Saved {len(har['log']['entries'])} HAR entries to {self.path}")
+
+
+def entry_body(entry):
+    """Decoded response body of a HAR entry"""
+    content = entry['response'].get('content', {})
+    text = content.get('text', '')
+    if content.get('encoding') == 'base64':
+        return base64.b64decode(text)
+    return text.encode('utf-8')
+
+
+def entry_headers(entry):
+    """Response headers of a HAR entry that are safe to replay"""
+    return {h['name']: h['value'] for h in entry['response']['headers']
+            if h['name'].lower() not in HOP_HEADERS}
+
+
+def transfer_delay(size, latency=0.0, bandwidth=None):
+    """Simulated time in seconds to deliver a response of the given size"""
+    delay = latency
+    if bandwidth:
+        delay += size / bandwidth
+    return delay
+
+
+class ThrottledBody(io.BytesIO):
+    """Response body that trickles out at a fixed bandwidth (bytes/second)"""
+
+    def __init__(self, data, bandwidth=None):
+        super().__init__(data)
+        self.bandwidth = bandwidth
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        if self.bandwidth and chunk:
+            time.sleep(len(chunk) / self.bandwidth)
+        return chunk
+
+
+try:
+    from requests import ConnectionError as RequestsConnectionError
+    from requests.adapters import BaseAdapter, HTTPAdapter
+    from requests.models import Response
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+except ImportError:  # Playwright-only use does not need requests
+    BaseAdapter = HTTPAdapter = object
+
+
+class HarRecordingAdapter(BaseAdapter):
+    """requests adapter that performs real requests and records them"""
+
+    def __init__(self, archive, transport=None):
+        super().__init__()
+        self.archive = archive
+        self.transport = transport or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        started = _now_iso()
+        start = time.perf_counter()
+        response = self.transport.send(request, **kwargs)
+        wait = time.perf_counter() - start
+
+        # Reading here keeps iter_content() working for the caller
+        body = response.content
+        receive = time.perf_counter() - start - wait
+
+        self.archive.add(request.method, request.url, request.headers,
+                         response.status_code, response.reason, response.headers, body,
+                         started=started, wait=wait, receive=receive)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class HarReplayAdapter(BaseAdapter):
+    """requests adapter that answers every request from a HAR archive"""
+
+    def __init__(self, archive, latency=0.0, bandwidth=None):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.archive.lookup(request.method, request.url)
+        if entry is None:
+            raise RequestsConnectionError(f"No recorded response for {request.method} {request.url}",
+                                          request=request)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        body = entry_body(entry)
+        response = Response()
+        response.status_code = entry['response']['status']
+        response.reason = entry['response'].get('statusText', '')
+        response.headers = CaseInsensitiveDict(entry_headers(entry))
+        response.headers['Content-Length'] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = ThrottledBody(body, self.bandwidth)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def mount_recorder(session, archive, transport=None):
+    """Record all HTTP(S) traffic of a requests session into archive"""
+    adapter = HarRecordingAdapter(archive, transport=transport)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+def mount_replay(session, archive, latency=0.0, bandwidth=None):
+    """Serve all HTTP(S) traffic of a requests session from archive"""
+    adapter = HarReplayAdapter(archive, latency=latency, bandwidth=bandwidth)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+async def route_recorder(context, archive, rewrite_url=None):
+    """Record all traffic of a Playwright browser context into archive
+
+    rewrite_url optionally maps each request URL to the address actually
+    fetched (e.g. a local mock origin); the original URL is what gets recorded.
+    """
+
+    async def handle(route):
+        request = route.request
+        started = _now_iso()
+        start = time.perf_counter()
+        try:
+            if rewrite_url:
+                response = await route.fetch(url=rewrite_url(request.url))
+            else:
+                response = await route.fetch()
+        except Exception:
+            await route.abort()
+            return
+        wait = time.perf_counter() - start
+        body = await response.body()
+        receive = time.perf_counter() - start - wait
+        archive.add(request.method, request.url, request.headers,
+                    response.status, response.status_text, response.headers, body,
+                    started=started, wait=wait, receive=receive)
+        await route.fulfill(response=response, body=body)
+
+    await context.route('**/*', handle)
+
+
+async def route_replay(context, archive, latency=0.0, bandwidth=None):
+    """Serve all traffic of a Playwright browser context from archive"""
+    import asyncio
+
+    async def handle(route):
+        request = route.request
+        entry = archive.lookup(request.method, request.url)
+        if entry is None:
+            await route.abort('internetdisconnected')
+            return
+        body = entry_body(entry)
+        await asyncio.sleep(transfer_delay(len(body), latency, bandwidth))
+        await route.fulfill(status=entry['response']['status'], headers=entry_headers(entry), body=body)
+
+    await context.route('**/*', handle)
+
+
+def summarize(path):
+    """Print request count, bytes and recorded time per host"""
+    from urllib.parse import urlparse
+
+    archive = HarArchive.load(path)
+    hosts = {}
+    for entry in archive.entries:
+        host = urlparse(entry['request']['url']).netloc
+        stats = hosts.setdefault(host, {'requests': 0, 'bytes': 0, 'time_ms': 0.0})
+        stats['requests'] += 1
+        stats['bytes'] += entry['response'].get('bodySize', 0)
+        stats['time_ms'] += entry.get('time', 0)
+
+    print(f"📼 {path}: {len(archive.entries)} entries")
+    for host, stats in sorted(hosts.items()):
+        print(f"   {host}: {stats['requests']} requests, "
+              f"{stats['bytes'] / 1024:.1f} KB, {stats['time_ms'] / 1000:.2f}s")
+    return hosts
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python har_transport.py <recording.har> [...]")
+        sys.exit(1)
+    for har_path in sys.argv[1:]:
+        summarize(har_path)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Which deployed files carry a content hash in their name, shared by
+cache_headers.py and precache_manifest.py
+A file is content-hashed when its name matches one of HASHED_SOURCES (Next.js
+chunks and CSS, build-id files, versioned Google fonts and their subsets,
+Strapi uploads) and the pipeline never rewrites it in place: link_rewriter.py
+and minify_assets.py leave it alone and no tool keeps a <name>.bak source
+beside it. The origin's hash covers the origin's bytes, not ours, so a chunk
+or stylesheet a re-run rewrites again would change under the same name.
+Everything else (pages, pruned per-page sheets, manifests) is mutable too
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from link_rewriter import site_files
+from minify_assets import mirror_files
+
+# Vercel sources (path-to-regexp: literal text, regex in parentheses) of names that carry a content hash
+HASHED_SOURCES = (
+    '/_next/static/chunks/(.+-[0-9a-f]{16}\\.js)',
+    '/_next/static/css/([0-9a-f]{16}\\.css)',
+    '/_next/static/([\\w-]{21})/(.*)',
+    '/_next/static/media/(.+[.-][0-9a-f]{8,}[.-].+)',
+    '/fonts.gstatic.com/s/([^/]+)/(v\\d+)/(.*)',
+    '/d2csodhem33bqt.cloudfront.net/uploads/([^/]+_[0-9a-f]{10}\\.[a-z0-9]+)',
+)
+
+
+def source_regex(source):
+    """Python regex matching the same paths as a Vercel source of literal text and (regex) groups"""
+    parts = []
+    depth = 0
+    for char in source:
+        if depth:
+            parts.append(char)
+            if char == '(' and parts[-2:-1] != ['\\']:
+                depth += 1
+            elif char == ')' and parts[-2:-1] != ['\\']:
+                depth -= 1
+        elif char == '(':
+            parts.append(char)
+            depth = 1
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts))
+
+
+HASHED_PATTERNS = [source_regex(source) for source in HASHED_SOURCES]
+
+
+@lru_cache(maxsize=None)
+def rewritten_in_place(root):
+    """Site-root-relative paths link_rewriter.py or minify_assets.py rewrite under the same name"""
+    root = Path(root)
+    return frozenset(path.relative_to(root).as_posix() for path in site_files(root) + mirror_files(root))
+
+
+def is_mutable(root, path):
+    """Whether a file may change under the same name: the pipeline rewrites it or keeps its source as <name>.bak"""
+    if path in rewritten_in_place(str(root)):
+        return True
+    path = Path(root) / path
+    return path.with_name(path.name + '.bak').exists()
+
+
+def is_content_hashed(root, path):
+    """Whether a site-root-relative path's name changes whenever its content does"""
+    return any(pattern.fullmatch('/' + path) for pattern in HASHED_PATTERNS) and not is_mutable(root, path)
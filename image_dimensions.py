@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Index the intrinsic size of every upload and add it where references lack it
+Sizes come from the file headers alone (WebP, PNG, JPEG, GIF, SVG), so no
+pixel is ever decoded; the index covers the whole uploads tree and only
+re-reads files whose size or mtime changed
+
+Every <img> of the pages without width/height gets them, and the image
+objects of __NEXT_DATA__ and _next/data JSON get their missing or null
+width/height, so the browser can reserve the space before the image loads
+
+    python image_dimensions.py                 # update the index and all pages
+    python image_dimensions.py --index-only
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import time
+from pathlib import Path
+
+from link_rewriter import INLINE_JSON_ESCAPES, NEXT_DATA_PATTERN, SKIP_FILES, atomic_write
+from responsive_variants import UPLOADS_DIR, reencoded_outputs
+
+INDEX_FILE = '.dimensions.json'
+
+IMAGE_SUFFIXES = ('.webp', '.png', '.jpg', '.jpeg', '.gif', '.svg')
+
+# Enough for any header this reads except JPEG, which is walked segment by segment
+HEADER_SIZE = 64
+SVG_HEADER_SIZE = 4096
+
+IMG_PATTERN = re.compile(r'<img\b[^>]*>')
+SRC_PATTERN = re.compile(r'\s(?:src|data-src)="([^"]*)"')
+UPLOAD_URL_PATTERN = re.compile(r'uploads/([^?#"]+\.(?:webp|png|jpe?g|gif|svg))(?:[?#].*)?$', re.IGNORECASE)
+
+SVG_TAG_PATTERN = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE | re.DOTALL)
+SVG_LENGTH_PATTERN = re.compile(r'^\s*([\d.]+)\s*(px)?\s*$')
+
+# JPEG start-of-frame markers (C4, C8 and CC share the range but are not frames)
+SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def png_size(header):
+    if header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+
+def gif_size(header):
+    return struct.unpack('<HH', header[6:10])
+
+
+def webp_size(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and header[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and header[20] == 0x2F:
+        bits = int.from_bytes(header[21:25], 'little')
+        return (bits & 0x3FFF) + 1, (bits >> 14 & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(header[24:27], 'little') + 1, int.from_bytes(header[27:30], 'little') + 1
+    return None
+
+
+def exif_orientation(segment):
+    """Orientation tag (1-8) of an APP1 Exif segment, 1 if absent"""
+    if segment[:6] != b'Exif\x00\x00':
+        return 1
+    tiff = segment[6:]
+    order = '<' if tiff[:2] == b'II' else '>'
+    try:
+        offset = struct.unpack(order + 'I', tiff[4:8])[0]
+        count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+        for entry in range(count):
+            start = offset + 2 + entry * 12
+            tag, kind, _, value = struct.unpack(order + 'HHI4s', tiff[start:start + 12])
+            if tag == 0x0112:
+                return struct.unpack(order + 'H', value[:2])[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def jpeg_size(f):
+    """Walk the JPEG segments up to the first frame header; orientations 5-8 swap the sides"""
+    f.seek(2)
+    orientation = 1
+    while True:
+        marker = f.read(2)
+        while marker[:1] == b'\xff' and marker[1:] == b'\xff':
+            marker = marker[1:] + f.read(1)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+            continue
+        if code in (0xD9, 0xDA):
+            return None
+        length = struct.unpack('>H', f.read(2))[0]
+        if code in SOF_MARKERS:
+            height, width = struct.unpack('>xHH', f.read(5))
+            return (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+        if code == 0xE1 and orientation == 1:
+            orientation = exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def svg_size(f):
+    """width/height of the root <svg> in px, else its viewBox; None for relative sizes"""
+    tag = SVG_TAG_PATTERN.search(f.read(SVG_HEADER_SIZE))
+    if not tag:
+        return None
+    attributes = dict((name.lower(), value) for name, value in
+                      re.findall(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']', tag.group(0).decode('utf-8', 'replace')))
+    width, height = [SVG_LENGTH_PATTERN.match(attributes.get(name, '')) for name in ('width', 'height')]
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = attributes.get('viewbox', '').replace(',', ' ').split()
+    if len(view_box) == 4:
+        return round(float(view_box[2])), round(float(view_box[3]))
+    return None
+
+
+def read_dimensions(path):
+    """(width, height) from the file header, or None if the format is unknown or the header broken"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if header.startswith(b'\x89PNG\r\n\x1a\n'):
+                return png_size(header)
+            if header[:6] in (b'GIF87a', b'GIF89a'):
+                return gif_size(header)
+            if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+                return webp_size(header)
+            if header.startswith(b'\xff\xd8'):
+                return jpeg_size(f)
+            if Path(path).suffix.lower() == '.svg':
+                f.seek(0)
+                return svg_size(f)
+    except (OSError, struct.error, IndexError, ValueError):
+        pass
+    return None
+
+
+class DimensionIndex:
+    """Path under the uploads tree -> [width, height, size, mtime_ns]
+
+    Re-encoded copies are not indexed; a URL of one is looked up as the upload
+    it was made from, which has the same aspect ratio.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.files = {}
+        self.outputs = reencoded_outputs(self.path.parent)
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.files = json.load(f).get('files', {})
+            except (OSError, ValueError):
+                pass
+
+    def update(self, uploads_dir):
+        """Re-read the headers of new and changed files, forget deleted ones; returns the number read"""
+        uploads_dir = Path(uploads_dir)
+        self.outputs = reencoded_outputs(uploads_dir)
+        seen = set()
+        read = 0
+        for directory, dirs, names in os.walk(uploads_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in names:
+                if not name.lower().endswith(IMAGE_SUFFIXES):
+                    continue
+                path = Path(directory) / name
+                key = path.relative_to(uploads_dir).as_posix()
+                if key in self.outputs:
+                    continue
+                seen.add(key)
+                stat = path.stat()
+                entry = self.files.get(key)
+                if entry and entry[2:] == [stat.st_size, stat.st_mtime_ns]:
+                    continue
+                size = read_dimensions(path)
+                read += 1
+                if size:
+                    self.files[key] = [size[0], size[1], stat.st_size, stat.st_mtime_ns]
+                else:
+                    self.files.pop(key, None)
+        for key in [key for key in self.files if key not in seen]:
+            del self.files[key]
+        return read
+
+    def source_name(self, name):
+        """The indexed upload a file name stands for: itself, or the source of a re-encoded copy"""
+        return self.outputs.get(name, name)
+
+    def lookup(self, url):
+        """(width, height) for a URL of an indexed upload, else None"""
+        match = UPLOAD_URL_PATTERN.search(url) if isinstance(url, str) else None
+        entry = self.files.get(self.source_name(match.group(1))) if match else None
+        return tuple(entry[:2]) if entry else None
+
+    def save(self):
+        atomic_write(self.path, json.dumps({'version': 1, 'files': self.files},
+                                           separators=(',', ':'), sort_keys=True).encode('utf-8'))
+
+
+def fill_data(data, index):
+    """Set missing or null width/height on the media objects of a Next.js payload; returns True if changed"""
+    changed = False
+
+    def walk(value):
+        nonlocal changed
+        if isinstance(value, dict):
+            is_media = 'url' in value and ('mime' in value or 'width' in value or 'height' in value)
+            if is_media and (value.get('width') is None or value.get('height') is None):
+                found = index.lookup(value['url'])
+                if found:
+                    value['width'], value['height'] = found
+                    changed = True
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return changed
+
+
+def fill_json(text, index, inline=False):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    if not fill_data(data, index):
+        return text
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    if inline:
+        for char, escaped in INLINE_JSON_ESCAPES:
+            body = body.replace(char, escaped)
+    return body
+
+
+def fill_page(content, index):
+    """width/height on every <img> lacking them, and in the page's __NEXT_DATA__"""
+
+    def fill_img(match):
+        tag = match.group(0)
+        if ' width=' in tag or ' height=' in tag:
+            return tag
+        src = SRC_PATTERN.search(tag)
+        found = index.lookup(src.group(1)) if src else None
+        if not found:
+            return tag
+        end = -2 if tag.endswith('/>') else -1
+        return f'{tag[:end].rstrip()} width="{found[0]}" height="{found[1]}"{tag[end:]}'
+
+    content = IMG_PATTERN.sub(fill_img, content)
+    match = NEXT_DATA_PATTERN.search(content)
+    if match:
+        body = fill_json(match.group(2), index, inline=True)
+        content = content[:match.start(2)] + body + content[match.end(2):]
+    return content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index upload dimensions and add them to pages and data")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--index-only', action='store_true', help="update the index without touching pages")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    root = Path(args.root)
+    uploads_dir = root / UPLOADS_DIR
+    index = DimensionIndex(uploads_dir / INDEX_FILE)
+    read = index.update(uploads_dir)
+    index.save()
+    print(f"📐 Indexed {len(index.files)} images ({read} headers read) in {time.perf_counter() - started:.2f}s")
+    if args.index_only:
+        return
+
+    pages = [p for p in sorted(root.glob('*.html')) + sorted(root.glob('work/*.html')) if p.name not in SKIP_FILES]
+    data_files = sorted(root.glob('_next/data/**/*.json'))
+    changed = 0
+    for path in pages + data_files:
+        content = path.read_text(encoding='utf-8')
+        updated = fill_json(content, index) if path.suffix == '.json' else fill_page(content, index)
+        if updated != content:
+            atomic_write(path, updated.encode('utf-8'))
+            changed += 1
+            print(f"   ✏️  {path}")
+
+    print(f"\n📊 Dimension summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Pages and data files updated: {changed} of {len(pages) + len(data_files)}")
+    print(f"   Index: {os.path.getsize(index.path) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Inject preload/prefetch hints into the mirrored pages
+Uses each page's asset references to preload its critical fonts, stylesheets
+and LCP image, and prefetches the _next/data JSON of the pages it links to,
+so the deployed copy starts fetching them before JS hydration
+
+    python inject_resource_hints.py                  # all pages
+    python inject_resource_hints.py --dry-run work/alsina.html
+"""
+
+import argparse
+import html
+import json
+import posixpath
+import re
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from font_css import FONT_FACE_PATTERN, FONT_URL_PATTERN, UNICODE_RANGE_PATTERN, parse_unicode_range
+from link_rewriter import SKIP_FILES, atomic_write, local_asset_path
+
+HINT_ATTRIBUTE = 'data-lo2s-hint'
+HINT_PATTERN = re.compile(r'<link [^>]*\b' + HINT_ATTRIBUTE + r'=""[^>]*/>')
+
+# Stylesheets a linked sheet pulls in with @import, which the browser only finds late
+IMPORT_PATTERN = re.compile(r'@import\s+(?:url\(\s*)?["\']?([^"\')\s;]+)')
+
+# Subsets worth preloading: the page text is Latin, other subsets load on demand
+CRITICAL_CODEPOINT = ord('a')
+
+DEFAULT_MAX_FONTS = 2
+DEFAULT_MAX_STYLES = 3
+DEFAULT_MAX_PREFETCH = 4
+
+# Page links and the route whose _next/data JSON the client router fetches
+PAGE_LINK_PATTERN = re.compile(r'^(?:\.\./)*(?:/)?(work/[^/?#]+?|work|about|contact|archive)(?:\.html)?$')
+
+
+class PageAssets:
+    """Asset references of one page, in document order, as site-root-relative paths"""
+
+    def __init__(self, site_root, page_path):
+        self.site_root = Path(site_root)
+        self.page_path = Path(page_path)
+        self.page_dir = posixpath.dirname(self.page_path.resolve().relative_to(self.site_root.resolve()).as_posix())
+        self.stylesheets = []
+        self.preloaded = set()
+        self.lcp_image = None
+        self.page_links = []
+        self.build_id = None
+
+    def local(self, url, base_dir=None):
+        """Mirror path for a reference, only if the file exists"""
+        path = local_asset_path(url, self.page_dir if base_dir is None else base_dir)
+        if path and (self.site_root / path).is_file():
+            return path
+        return None
+
+    def extract(self, content):
+        soup = BeautifulSoup(content, 'html.parser')
+
+        for link in soup.find_all('link', href=True):
+            rel = link.get('rel') or []
+            rel = [rel] if isinstance(rel, str) else rel
+            if link.has_attr(HINT_ATTRIBUTE):
+                continue
+            path = self.local(link['href'])
+            if not path:
+                continue
+            if 'stylesheet' in rel and path not in self.stylesheets:
+                self.stylesheets.append(path)
+            elif 'preload' in rel:
+                self.preloaded.add(path)
+
+        # The first image or video poster in the body is the LCP candidate; the
+        # hint repeats its URLs verbatim so the browser matches it to the element
+        for element in soup.body.find_all(['img', 'video']) if soup.body else []:
+            url = element.get('poster') if element.name == 'video' else element.get('src')
+            if url:
+                if self.local(url):
+                    self.lcp_image = element
+                break
+
+        for anchor in soup.find_all('a', href=True):
+            match = PAGE_LINK_PATTERN.match(anchor['href'])
+            if match and match.group(1) not in self.page_links:
+                self.page_links.append(match.group(1))
+
+        next_data = soup.find('script', id='__NEXT_DATA__')
+        if next_data and next_data.string:
+            try:
+                self.build_id = json.loads(next_data.string).get('buildId')
+            except ValueError:
+                pass
+        return self
+
+    def critical_fonts(self):
+        """Latin woff2 files declared by the page's stylesheets, in stylesheet order"""
+        fonts = []
+        for stylesheet in self.stylesheets:
+            css = (self.site_root / stylesheet).read_text(encoding='utf-8', errors='replace')
+            for block in FONT_FACE_PATTERN.findall(css):
+                unicode_range = UNICODE_RANGE_PATTERN.search(block)
+                if unicode_range and not any(first <= CRITICAL_CODEPOINT <= last
+                                             for first, last in parse_unicode_range(unicode_range.group(1))):
+                    continue
+                for url in FONT_URL_PATTERN.findall(block):
+                    path = self.local(url, posixpath.dirname(stylesheet))
+                    if path and path not in fonts:
+                        fonts.append(path)
+        return fonts
+
+    def imported_stylesheets(self):
+        """Stylesheets the linked ones @import that the page does not link itself"""
+        imported = []
+        for stylesheet in self.stylesheets:
+            css = (self.site_root / stylesheet).read_text(encoding='utf-8', errors='replace')
+            for url in IMPORT_PATTERN.findall(css):
+                path = self.local(url, posixpath.dirname(stylesheet))
+                if path and path not in self.stylesheets and path not in imported:
+                    imported.append(path)
+        return imported
+
+    def data_files(self):
+        """_next/data JSON of linked pages that exist in the mirror"""
+        if not self.build_id:
+            return []
+        files = []
+        for route in self.page_links:
+            path = f"_next/data/{self.build_id}/{route}.json"
+            if (self.site_root / path).is_file():
+                files.append(path)
+        return files
+
+
+def link_tag(**attributes):
+    parts = []
+    for name, value in attributes.items():
+        name = name.rstrip('_').replace('_', '-')
+        parts.append(f'{name}="{html.escape(value, quote=True)}"')
+    return f"<link {' '.join(parts)} {HINT_ATTRIBUTE}=\"\"/>"
+
+
+def build_hints(assets, max_fonts=DEFAULT_MAX_FONTS, max_styles=DEFAULT_MAX_STYLES,
+                max_prefetch=DEFAULT_MAX_PREFETCH):
+    """Hint tags for a page, most important first"""
+    def href(path):
+        return posixpath.relpath(path, assets.page_dir or '.')
+
+    hints = []
+    image = assets.lcp_image
+    if image is not None:
+        if image.name == 'video':
+            hints.append(link_tag(rel='preload', href=image['poster'], as_='image', fetchpriority='high'))
+        else:
+            attributes = {'rel': 'preload', 'href': image['src'], 'as_': 'image', 'fetchpriority': 'high'}
+            if image.get('srcset'):
+                attributes['imagesrcset'] = image['srcset']
+                attributes['imagesizes'] = image.get('sizes', '100vw')
+            hints.append(link_tag(**attributes))
+
+    for path in assets.critical_fonts()[:max_fonts]:
+        hints.append(link_tag(rel='preload', href=href(path), as_='font', type='font/woff2', crossorigin='anonymous'))
+
+    # Linked stylesheets are already fetched at parse time; a preload would only duplicate them
+    for path in [p for p in assets.imported_stylesheets() if p not in assets.preloaded][:max_styles]:
+        hints.append(link_tag(rel='preload', href=href(path), as_='style'))
+
+    for path in assets.data_files()[:max_prefetch]:
+        hints.append(link_tag(rel='prefetch', href=href(path), as_='fetch', crossorigin='anonymous'))
+    return hints
+
+
+def inject_hints(content, hints):
+    """Replace any earlier hints with new ones right after <meta charset>, or <head>"""
+    content = HINT_PATTERN.sub('', content)
+    if not hints:
+        return content
+    anchor = re.search(r'<meta charSet="[^"]*"[^>]*/?>', content, re.IGNORECASE) or re.search(r'<head[^>]*>', content)
+    if anchor is None:
+        return content
+    return content[:anchor.end()] + ''.join(hints) + content[anchor.end():]
+
+
+def process_page(site_root, page_path, limits, dry_run=False):
+    content = Path(page_path).read_text(encoding='utf-8')
+    assets = PageAssets(site_root, page_path).extract(content)
+    hints = build_hints(assets, **limits)
+    updated = inject_hints(content, hints)
+    if updated != content and not dry_run:
+        atomic_write(page_path, updated.encode('utf-8'))
+    return hints, updated != content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inject preload/prefetch hints into the mirrored pages")
+    parser.add_argument('pages', nargs='*', help="pages to process (default: every page of the mirror)")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--max-fonts', type=int, default=DEFAULT_MAX_FONTS)
+    parser.add_argument('--max-styles', type=int, default=DEFAULT_MAX_STYLES)
+    parser.add_argument('--max-prefetch', type=int, default=DEFAULT_MAX_PREFETCH)
+    parser.add_argument('--dry-run', action='store_true', help="print the hints without writing pages")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    pages = [Path(p) for p in args.pages] or [
+        p for p in sorted(root.glob('*.html')) + sorted(root.glob('work/*.html')) if p.name not in SKIP_FILES
+    ]
+    limits = {'max_fonts': args.max_fonts, 'max_styles': args.max_styles, 'max_prefetch': args.max_prefetch}
+
+    print(f"🔗 Injecting resource hints into {len(pages)} pages...")
+    updated = total = 0
+    for page in pages:
+        try:
+            hints, changed = process_page(root, page, limits, dry_run=args.dry_run)
+        except Exception as e:
+            print(f"❌ {page}: {e}")
+            continue
+        updated += changed
+        total += len(hints)
+        print(f"   {'✏️ ' if changed else '✅'} {page}: {len(hints)} hints")
+        if args.dry_run:
+            for hint in hints:
+                print(f"      {hint}")
+
+    print(f"\n📊 {total} hints across {len(pages)} pages, {updated} pages updated")
+
+
+if __name__ == "__main__":
+    main()
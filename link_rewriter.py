@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Single-pass link rewriter shared by fix_all_links.py and complete_downloader.py
+Scans a page once for URL-bearing attributes and maps each URL through a
+rewrite table chosen by the page's depth below the site root
+
+A rewrite manifest (.rewrite_manifest.json at the site root) records the hash
+of every page before and after rewriting, so repeated runs skip pages that are
+already rewritten and only touch newly downloaded or changed ones
+
+rewrite_site() spreads a whole mirror (pages, stylesheets, JSON) over a
+process pool and writes every file through a temp file + rename
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote
+
+MANIFEST_FILE = '.rewrite_manifest.json'
+
+# Files rewrite_site() covers, relative to the site root
+PAGE_GLOBS = ('*.html', 'work/*.html', 'manifest.json', '_next/data/**/*.json')
+SKIP_FILES = {'index_local.html'}
+
+# Every stylesheet in the mirror; Google Fonts CSS is saved without an extension
+STYLESHEET_GLOBS = ('_next/**/*.css', 'fonts.googleapis.com/*', 'd2csodhem33bqt.cloudfront.net/**/*.css')
+
+# Hosts mirrored into a same-named top-level directory
+MIRRORED_HOSTS = ('fonts.googleapis.com', 'fonts.gstatic.com', 'd2csodhem33bqt.cloudfront.net')
+
+# Root-relative paths served from the mirror root (first path segment)
+LOCAL_PREFIXES = ('_next', 'favicon', 'manifest.json', 'favicon.ico')
+
+# Next.js page routes and the file each one was saved as
+PAGE_FILES = {
+    '/': 'index.html',
+    '/work': 'work.html',
+    '/about': 'about.html',
+    '/contact': 'contact.html',
+    '/archive': 'archive.html',
+}
+
+URL_ATTRIBUTES = ('href', 'src', 'srcset', 'content', 'poster', 'data-src', 'imagesrcset')
+SRCSET_ATTRIBUTES = ('srcset', 'imagesrcset')
+
+# Quoted attribute values that could need rewriting (root-relative or absolute).
+# The pattern starts with a literal '=' so the regex engine can skip ahead with a
+# fast substring search instead of trying every position of the document.
+VALUE_PATTERN = re.compile(r'=(["\'])(/[^"\']*|https://[^"\']*)\1')
+
+# Inline Next.js page data, and the escapes Next.js applies inside it
+NEXT_DATA_MARKER = '<script id="__NEXT_DATA__"'
+NEXT_DATA_PATTERN = re.compile(r'(<script id="__NEXT_DATA__"[^>]*>)(.*?)(</script>)', re.DOTALL)
+INLINE_JSON_ESCAPES = (('&', '\\u0026'), ('<', '\\u003c'), ('>', '\\u003e'),
+                       ('\u2028', '\\u2028'), ('\u2029', '\\u2029'))
+
+# Attribute name immediately before a matched value
+NAME_PATTERN = re.compile(r'([A-Za-z][\w:-]*)\s*$')
+NAME_LOOKBEHIND = 24
+
+SRCSET_ENTRY_PATTERN = re.compile(r'([^\s,]+)(\s*[^,]*)')
+
+# url(...) references in stylesheets, quoted or not
+CSS_URL_PATTERN = re.compile(r'url\(\s*(["\']?)(/[^"\')]*|https://[^"\')]*)\1\s*\)')
+
+# @import "..." without url()
+CSS_IMPORT_PATTERN = re.compile(r'@import\s+(["\'])(/[^"\']*|https://[^"\']*)\1')
+
+# String values in JSON documents
+JSON_URL_PATTERN = re.compile(r'"(/[^"\\]*|https://[^"\\]*)"')
+
+# References as they stand after rewriting (relative paths too), for references()
+REFERENCE_ATTRIBUTE_PATTERN = re.compile(r'\b(' + '|'.join(URL_ATTRIBUTES) + r')\s*=\s*(["\'])([^"\']*)\2',
+                                         re.IGNORECASE)
+REFERENCE_CSS_PATTERN = re.compile(r'url\(\s*(["\']?)([^"\')]*)\1\s*\)|@import\s+(["\'])([^"\']*)\3')
+REFERENCE_JSON_PATTERN = re.compile(r'"([^"\\]*)"')
+
+
+class RewriteTable:
+    """URL mappings for pages at one depth below the site root"""
+
+    def __init__(self, depth):
+        self.depth = depth
+        self.prefix = '../' * depth
+        self.hosts = {host: f"{self.prefix}{host}/" for host in MIRRORED_HOSTS}
+        self.local = {segment: f"{self.prefix}{segment}" for segment in LOCAL_PREFIXES}
+        self.pages = {route: f"{self.prefix}{filename}" for route, filename in PAGE_FILES.items()}
+
+    def page_link(self, url):
+        """Local file for a navigation link, or None"""
+        if url in self.pages:
+            return self.pages[url]
+        if url.startswith('/work/'):
+            slug = url[len('/work/'):].strip('/')
+            if slug and '/' not in slug and '.' not in slug:
+                return f"{self.prefix}work/{slug}.html"
+        return None
+
+    def rewrite(self, url, is_link=False, found=None):
+        """Map one URL to its local path; URLs not in the table are returned unchanged
+
+        Asset URLs that were mapped are added to found (a set) when given.
+        """
+        if url.startswith('https://'):
+            host, slash, path = url[len('https://'):].partition('/')
+            target = self.hosts.get(host) if slash else None
+            if not target:
+                return url
+            if found is not None:
+                found.add(url)
+            return target + path
+
+        if not url.startswith('/') or url.startswith('//'):
+            return url
+
+        if is_link:
+            target = self.page_link(url)
+            if target:
+                return target
+
+        segment = url[1:].split('/', 1)[0].split('?', 1)[0]
+        if segment not in self.local:
+            return url
+        if found is not None:
+            found.add(url)
+        return self.prefix + url[1:]
+
+    def rewrite_srcset(self, value, found=None):
+        return SRCSET_ENTRY_PATTERN.sub(lambda m: self.rewrite(m.group(1), found=found) + m.group(2), value)
+
+
+@lru_cache(maxsize=None)
+def rewrite_table(depth):
+    """Shared rewrite table for a page depth (0 for root pages, 1 for work/)"""
+    return RewriteTable(depth)
+
+
+def local_asset_path(url, base_dir=''):
+    """Site-root-relative mirror path a reference points at, or None if it is not in the mirror layout
+
+    base_dir is the site-root-relative directory of the referring file ('' for
+    root pages, 'work' for project pages, '_next/static/css' for stylesheets).
+    """
+    url = url.strip().split('#', 1)[0].split('?', 1)[0]
+    if not url or url.startswith(('data:', 'blob:', 'mailto:', 'tel:', 'javascript:')):
+        return None
+    if url.startswith(('https://', 'http://', '//')):
+        absolute = 'https://' + url.split('//', 1)[1]
+        mapped = rewrite_table(0).rewrite(absolute)
+        if mapped == absolute:
+            return None
+        url, base_dir = mapped, ''
+    elif url.startswith('/'):
+        url, base_dir = url[1:], ''
+    path = posixpath.normpath(posixpath.join(base_dir, url))
+    if path == '.' or path == '..' or path.startswith('../'):
+        return None
+    return path
+
+
+def _rewrite_attributes(content, table, found):
+    def replace(match):
+        start = match.start()
+        name = NAME_PATTERN.search(content, max(start - NAME_LOOKBEHIND, 0), start)
+        attribute = name.group(1).lower() if name else ''
+        if attribute not in URL_ATTRIBUTES:
+            return match.group(0)
+        quote, value = match.groups()
+        if attribute in SRCSET_ATTRIBUTES:
+            rewritten = table.rewrite_srcset(value, found)
+        else:
+            rewritten = table.rewrite(value, is_link=attribute == 'href', found=found)
+        return f"={quote}{rewritten}{quote}"
+
+    return VALUE_PATTERN.sub(replace, content)
+
+
+def _next_data_span(content):
+    """(start, end) of the __NEXT_DATA__ payload, found like NEXT_DATA_PATTERN but with plain string search"""
+    tag = content.find(NEXT_DATA_MARKER)
+    if tag == -1:
+        return None
+    start = content.find('>', tag) + 1
+    end = content.find('</script>', start)
+    return (start, end) if start and end != -1 else None
+
+
+def rewrite_html(content, depth=0, found=None):
+    """Rewrite every URL-bearing attribute of a page in a single scan, plus its __NEXT_DATA__"""
+    table = rewrite_table(depth)
+    span = _next_data_span(content)
+    if span is None:
+        return _rewrite_attributes(content, table, found)
+    start, end = span
+    return (_rewrite_attributes(content[:start], table, found)
+            + rewrite_next_data(content[start:end], depth, found, inline=True)
+            + _rewrite_attributes(content[end:], table, found))
+
+
+def _escape_inline_json(text):
+    """Escape like Next.js does for JSON embedded in a <script> tag"""
+    for char, escaped in INLINE_JSON_ESCAPES:
+        text = text.replace(char, escaped)
+    return text
+
+
+def _rewrite_url_literals(text, table, found):
+    """Rewrite the "https://<mirrored host>/..." string values of JSON text in place
+
+    An unescaped '"https://' can only open a string, so splitting on it finds
+    every candidate without parsing. Keys are left alone; returns None when a
+    URL is written with escapes (or sits inside another string) and only a
+    parse can tell what it is.
+    """
+    if any(f"https:\\/\\/{host}" in text for host in MIRRORED_HOSTS):
+        return None
+    pieces = text.split('"https://')
+    for i in range(1, len(pieces)):
+        piece = pieces[i]
+        host, slash, rest = piece.partition('/')
+        target = table.hosts.get(host) if slash else None
+        end = rest.find('"')
+        if target is None or end == -1:
+            pieces[i] = 'https://' + piece
+            continue
+        if pieces[i - 1].endswith('\\') or '\\' in rest[:end] or rest[end + 1:end + 2].isspace():
+            return None
+        if rest[end + 1:end + 2] == ':':
+            pieces[i] = 'https://' + piece
+            continue
+        if found is not None:
+            found.add(f"https://{host}/{rest[:end]}")
+        pieces[i] = target + rest
+    return '"'.join(pieces)
+
+
+def rewrite_next_data(text, depth=0, found=None, inline=False):
+    """Map media URLs in a Next.js data payload to local paths, keeping the JSON compact
+
+    Only whole string values that are absolute URLs on a mirrored host
+    change; page routes like "/work/alsina" are left for the client router.
+    Those values are found and replaced in the text; only a payload that
+    writes one with escapes is parsed, walked and re-serialised, and returned
+    unchanged if it does not parse rather than risk corrupting it.
+    """
+    rewritten = _rewrite_url_literals(text, rewrite_table(depth), found)
+    if rewritten is not None:
+        return rewritten
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+
+    table = rewrite_table(depth)
+    changed = False
+
+    def walk(value):
+        nonlocal changed
+        if isinstance(value, str):
+            if value.startswith('https://'):
+                rewritten = table.rewrite(value, found=found)
+                if rewritten != value:
+                    changed = True
+                    return rewritten
+            return value
+        if isinstance(value, dict):
+            return {key: walk(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        return value
+
+    data = walk(data)
+    if not changed:
+        return text
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    if inline:
+        body = _escape_inline_json(body)
+    stripped = text.strip()
+    start = text.index(stripped[0]) if stripped else 0
+    return text[:start] + body + text[start + len(stripped):]
+
+
+def rewrite_css(content, depth=0, found=None):
+    """Rewrite url() and @import references of a stylesheet relative to its own directory
+
+    depth is the stylesheet's own depth below the site root, so
+    _next/static/css/x.css maps fonts.gstatic.com URLs to ../../../fonts.gstatic.com/.
+    Relative references are already resolved against the stylesheet and are kept.
+    """
+    table = rewrite_table(depth)
+
+    def replace_url(match):
+        quote, value = match.groups()
+        return f"url({quote}{table.rewrite(value, found=found)}{quote})"
+
+    def replace_import(match):
+        quote, value = match.groups()
+        return f"@import {quote}{table.rewrite(value, found=found)}{quote}"
+
+    content = CSS_URL_PATTERN.sub(replace_url, content)
+    if '@import' in content:
+        content = CSS_IMPORT_PATTERN.sub(replace_import, content)
+    return content
+
+
+def rewrite_json(content, depth=0, found=None):
+    """Rewrite URL string values of a JSON file (e.g. manifest.json icons)"""
+    table = rewrite_table(depth)
+    return JSON_URL_PATTERN.sub(lambda m: f'"{table.rewrite(m.group(1), found=found)}"', content)
+
+
+def file_kind(path):
+    """'html', 'css' or 'json' for files the rewriter understands, else None"""
+    path = Path(path)
+    if path.suffix == '.json' and '_next' in path.parts:
+        return 'next_data' if 'data' in path.parts else None
+    if path.suffix == '' and path.parent.name == 'fonts.googleapis.com':
+        return 'css'
+    return {'.html': 'html', '.htm': 'html', '.css': 'css', '.json': 'json'}.get(path.suffix.lower())
+
+
+REWRITERS = {'html': rewrite_html, 'css': rewrite_css, 'json': rewrite_json, 'next_data': rewrite_next_data}
+
+
+def rewrite_content(content, kind, depth=0, found=None):
+    rewriter = REWRITERS.get(kind)
+    return rewriter(content, depth, found) if rewriter else content
+
+
+def references(content, kind, base_dir=''):
+    """Site-root-relative mirror paths a page, stylesheet or JSON file refers to, rewritten or not
+
+    Covers URL attributes (each srcset entry), url() and @import targets, and
+    the string values of JSON and __NEXT_DATA__. base_dir is the file's own
+    directory, as for local_asset_path(); callers check which paths exist.
+    """
+    urls = []
+    if kind == 'html':
+        for attribute, _, value in REFERENCE_ATTRIBUTE_PATTERN.findall(content):
+            if attribute.lower() in SRCSET_ATTRIBUTES:
+                urls += [url for url, _ in SRCSET_ENTRY_PATTERN.findall(value)]
+            else:
+                urls.append(value.replace('&amp;', '&'))
+        span = _next_data_span(content)
+        if span:
+            urls += REFERENCE_JSON_PATTERN.findall(content, *span)
+    if kind in ('html', 'css'):
+        urls += [url or imported for _, url, _, imported in REFERENCE_CSS_PATTERN.findall(content)]
+    if kind in ('json', 'next_data'):
+        urls += REFERENCE_JSON_PATTERN.findall(content)
+    # A percent-encoded name may be mirrored as written or decoded (%5Bslug%5D, [slug])
+    urls += [unquote(url) for url in urls if '%' in url]
+    paths = (local_asset_path(url, base_dir) for url in urls)
+    return list(dict.fromkeys(path for path in paths if path))
+
+
+class StreamRewriter:
+    """Rewrites a document chunk by chunk as it downloads
+
+    Text after the last tag/rule/value boundary is held back until the next
+    chunk, so a URL split across two chunks is still rewritten as a whole.
+    """
+
+    BOUNDARIES = {'html': '>', 'css': '}', 'json': ','}
+    MAX_PENDING = 1024 * 1024
+
+    def __init__(self, kind, depth=0, found=None):
+        self.kind = kind
+        self.depth = depth
+        self.found = found
+        self.boundary = self.BOUNDARIES.get(kind)
+        self.pending = ''
+
+    def feed(self, text):
+        """Add a chunk; returns the rewritten text that is safe to write now"""
+        if self.boundary is None:
+            return text
+        self.pending += text
+        cut = self.pending.rfind(self.boundary) + 1
+        if self.kind == 'html':
+            # __NEXT_DATA__ is rewritten as a whole JSON document, so hold back
+            # from its opening tag until the closing tag has arrived
+            script = self.pending.rfind(NEXT_DATA_MARKER)
+            if script != -1 and '</script>' not in self.pending[script:]:
+                cut = min(cut, script)
+        if cut == 0:
+            if len(self.pending) < self.MAX_PENDING:
+                return ''
+            cut = len(self.pending)
+        ready, self.pending = self.pending[:cut], self.pending[cut:]
+        return rewrite_content(ready, self.kind, self.depth, self.found)
+
+    def close(self):
+        """Rewrite and return whatever is still held back"""
+        ready, self.pending = self.pending, ''
+        return rewrite_content(ready, self.kind, self.depth, self.found) if ready else ''
+
+
+def page_depth(html_file, site_root):
+    """Number of directories between the site root and a page"""
+    return len(Path(html_file).resolve().relative_to(Path(site_root).resolve()).parts) - 1
+
+
+def rewrite_depth(path, site_root):
+    """Depth URLs in a file resolve against
+
+    _next/data/<build>/work/alsina.json is fetched by the client router for
+    the /work/alsina page, so its URLs resolve against that page (depth 1),
+    not against the JSON file's own location.
+    """
+    parts = Path(path).resolve().relative_to(Path(site_root).resolve()).parts
+    if parts[:2] == ('_next', 'data') and len(parts) > 3:
+        return len(parts) - 4
+    return len(parts) - 1
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class RewriteManifest:
+    """Source hash -> rewritten hash for every page rewritten under a site root"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.rewritten_hashes = set()
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        manifest = cls(path)
+        if manifest.path.exists():
+            try:
+                with open(manifest.path, 'r', encoding='utf-8') as f:
+                    manifest.entries = json.load(f).get('files', {})
+            except (OSError, ValueError):
+                manifest.entries = {}
+        manifest.rewritten_hashes = {entry['rewritten'] for entry in manifest.entries.values()}
+        return manifest
+
+    @classmethod
+    def for_site(cls, site_root):
+        return cls.load(Path(site_root) / MANIFEST_FILE)
+
+    def key(self, file_path):
+        return Path(file_path).resolve().relative_to(self.path.parent.resolve()).as_posix()
+
+    def is_current(self, file_path, stat=None):
+        """True when the file is unchanged since it was last rewritten (no read needed)"""
+        entry = self.entries.get(self.key(file_path))
+        stat = stat or os.stat(file_path)
+        return bool(entry) and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+    def is_rewritten(self, digest):
+        """True when content with this hash is the output of an earlier rewrite"""
+        return digest in self.rewritten_hashes
+
+    def record(self, file_path, source_digest, rewritten_digest):
+        stat = os.stat(file_path)
+        self.entries[self.key(file_path)] = {
+            'source': source_digest,
+            'rewritten': rewritten_digest,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        self.rewritten_hashes.add(rewritten_digest)
+        self.dirty = True
+
+    def refresh(self, file_path, digest):
+        """Re-stat a page whose content is already a rewrite output, keeping its source hash"""
+        entry = self.entries.get(self.key(file_path))
+        source_digest = entry['source'] if entry and entry['rewritten'] == digest else digest
+        self.record(file_path, source_digest, digest)
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+@contextmanager
+def atomic_output(path, mode='wb', encoding=None):
+    """Open a temp file beside path; it replaces path only if the block succeeds"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write(path, data):
+    """Write bytes to a temp file beside path and rename it over path"""
+    with atomic_output(path) as f:
+        f.write(data)
+
+
+def _rewrite_path(path, depth, known_rewritten=()):
+    """Rewrite one file; returns a result dict (safe to run in a worker process)"""
+    started = time.perf_counter()
+    result = {'path': str(path), 'changed': False, 'skipped': False, 'error': None,
+              'source': None, 'rewritten': None, 'bytes_before': 0, 'bytes_after': 0}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+        result.update(source=digest, rewritten=digest, bytes_before=len(data), bytes_after=len(data))
+        if digest in known_rewritten:
+            result['skipped'] = True
+        else:
+            content = data.decode('utf-8')
+            updated = rewrite_content(content, file_kind(path), depth)
+            if updated != content:
+                data = updated.encode('utf-8')
+                atomic_write(path, data)
+                result.update(changed=True, rewritten=content_hash(data), bytes_after=len(data))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _record(manifest, result):
+    if manifest is None or result['error']:
+        return
+    if result['skipped']:
+        manifest.refresh(result['path'], result['source'])
+    else:
+        manifest.record(result['path'], result['source'], result['rewritten'])
+
+
+def rewrite_file(file_path, site_root=None, manifest=None, depth=None):
+    """Rewrite one saved page, stylesheet or JSON file in place; returns True if it changed
+
+    With a manifest, files whose size and mtime match the last rewrite are
+    skipped without being read, and files whose content hash is a known
+    rewrite output are skipped without being rewritten.
+    """
+    if manifest is not None and manifest.is_current(file_path):
+        return False
+    if depth is None:
+        depth = rewrite_depth(file_path, site_root)
+    known = manifest.rewritten_hashes if manifest is not None else ()
+    result = _rewrite_path(file_path, depth, known)
+    if result['error']:
+        raise RuntimeError(result['error'])
+    _record(manifest, result)
+    return result['changed']
+
+
+class RewriteSummary:
+    """Files touched, bytes changed and time per file for one rewrite run"""
+
+    def __init__(self):
+        self.results = []
+        self.unchanged = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result):
+        self.results.append(result)
+
+    def count(self, key):
+        return sum(1 for result in self.results if result[key])
+
+    @property
+    def changed(self):
+        return self.count('changed')
+
+    @property
+    def bytes_changed(self):
+        return sum(abs(r['bytes_after'] - r['bytes_before']) for r in self.results if r['changed'])
+
+    @property
+    def bytes_written(self):
+        return sum(r['bytes_after'] for r in self.results if r['changed'])
+
+    @property
+    def up_to_date(self):
+        return self.unchanged + sum(1 for r in self.results if not r['error'] and not r['changed'])
+
+    def print_summary(self, slowest=5):
+        processed = [r for r in self.results if not r['error']]
+        print(f"\n🔗 Rewrite summary ({self.elapsed:.2f}s):")
+        print(f"   ✏️  Touched: {self.changed} files, {self.bytes_written / 1024:.1f} KB written, "
+              f"{self.bytes_changed / 1024:.1f} KB size change")
+        print(f"   ⏭️  Up to date: {self.up_to_date} files")
+        if self.count('error'):
+            print(f"   ❌ Failed: {self.count('error')} files")
+            for result in self.results:
+                if result['error']:
+                    print(f"      • {result['path']}: {result['error']}")
+        if processed:
+            mean = sum(r['seconds'] for r in processed) / len(processed)
+            print(f"   ⏱️  {mean * 1000:.1f} ms per file on average, slowest:")
+            for result in sorted(processed, key=lambda r: r['seconds'], reverse=True)[:slowest]:
+                print(f"      • {result['path']}: {result['seconds'] * 1000:.1f} ms")
+
+
+def _glob_files(site_root, patterns):
+    files = []
+    for pattern in patterns:
+        files += [p for p in sorted(Path(site_root).glob(pattern))
+                  if p.is_file() and p.name not in SKIP_FILES and file_kind(p)]
+    return list(dict.fromkeys(files))
+
+
+def stylesheet_files(site_root):
+    """Every stylesheet of the mirror under site_root"""
+    return _glob_files(site_root, STYLESHEET_GLOBS)
+
+
+def page_files(site_root):
+    """Every page and page data file under site_root"""
+    return _glob_files(site_root, PAGE_GLOBS)
+
+
+def site_files(site_root):
+    """Every page, stylesheet and JSON file under site_root that holds rewritable links"""
+    return page_files(site_root) + stylesheet_files(site_root)
+
+
+def _init_worker(known_rewritten):
+    global _known_rewritten
+    _known_rewritten = known_rewritten
+
+
+def _rewrite_in_worker(path, depth):
+    return _rewrite_path(path, depth, _known_rewritten)
+
+
+_known_rewritten = frozenset()
+
+
+def rewrite_site(site_root, files=None, manifest=None, workers=None):
+    """Rewrite files under site_root across a process pool; returns a RewriteSummary
+
+    Unchanged files (per the manifest) are filtered out before any work is
+    scheduled. Each file is written atomically, so an interrupted run never
+    leaves a half-written page behind.
+    """
+    site_root = Path(site_root)
+    files = site_files(site_root) if files is None else [Path(p) for p in files]
+    summary = RewriteSummary()
+
+    pending = []
+    for path in files:
+        if manifest is not None and manifest.is_current(path):
+            summary.unchanged += 1
+        else:
+            pending.append((path, rewrite_depth(path, site_root)))
+
+    known = frozenset(manifest.rewritten_hashes) if manifest is not None else frozenset()
+    workers = workers or min(os.cpu_count() or 1, len(pending)) or 1
+    if workers == 1 or len(pending) < 2:
+        results = [_rewrite_path(path, depth, known) for path, depth in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(known,)) as pool:
+            futures = [pool.submit(_rewrite_in_worker, path, depth) for path, depth in pending]
+            results = [future.result() for future in futures]
+
+    for result in results:
+        summary.add(result)
+        _record(manifest, result)
+    summary.elapsed = time.perf_counter() - summary.started
+    return summary
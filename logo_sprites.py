@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Pack the about page's client logos into WebP sprite atlases
+The "Selected Clients" list loads one x256 logo per client; this packs them
+into atlases under _next/static/media and adds CSS to the about page that
+paints each logo from its atlas. The markup React hydrates is left alone: the
+<picture> inside each logo box is hidden, so its lazy <img> is never fetched
+
+The atlas name carries a digest of the logos that went into it, and nothing
+is rebuilt while that digest still matches; when the logo set changes the
+atlases are rebuilt and the stale ones removed (download_404_assets.py runs
+this after fetching or generating any x256 logo)
+
+    python logo_sprites.py
+    python logo_sprites.py --page about.html --columns 8
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import posixpath
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from PIL import Image
+
+from link_rewriter import atomic_output, atomic_write
+from responsive_variants import UPLOADS_DIR, VARIANT_PATTERN, WEBP_METHOD, WEBP_QUALITY
+
+SPRITE_DIR = '_next/static/media'
+SPRITE_PREFIX = 'lo2s-logos-'
+SPRITE_MANIFEST = '.sprites_manifest.json'
+DEFAULT_PAGE = 'about.html'
+
+TILE_SIZE = 256
+DEFAULT_COLUMNS = 8
+MAX_ROWS = 8
+
+STYLE_ATTRIBUTE = 'data-lo2s-sprites'
+STYLE_PATTERN = re.compile(r'<style ' + STYLE_ATTRIBUTE + r'="">.*?</style>', re.DOTALL)
+UPLOAD_PATTERN = re.compile(r'uploads/([^/?#"\s]+\.webp)')
+LOGO_CLASS_PATTERN = re.compile(r'^Clients_logo__\w+$')
+
+
+def find_logos(content):
+    """(logo box class, [(data-uid, upload name)]) for the client list of a page"""
+    soup = BeautifulSoup(content, 'html.parser')
+    logo_class = None
+    logos = []
+    for wrapper in soup.find_all(attrs={'data-uid': True}):
+        box = wrapper.find(class_=LOGO_CLASS_PATTERN)
+        image = box.find('img') if box else None
+        match = UPLOAD_PATTERN.search(image.get('src', '')) if image else None
+        if not match:
+            continue
+        logo_class = next(c for c in box['class'] if LOGO_CLASS_PATTERN.match(c))
+        name = match.group(1)
+        variant = VARIANT_PATTERN.match(name)
+        logos.append((wrapper['data-uid'], variant.group(2) if variant else name))
+    return logo_class, logos
+
+
+def logo_source(uploads_dir, name):
+    """The x256 copy of a logo, else the smallest copy at least a tile wide, else the largest"""
+    preferred = uploads_dir / f"x{TILE_SIZE}_{name}"
+    if preferred.exists():
+        return preferred
+    copies = [p for p in uploads_dir.glob(f"*{name}") if p.name == name or VARIANT_PATTERN.match(p.name)
+              and VARIANT_PATTERN.match(p.name).group(2) == name]
+    sized = []
+    for path in copies:
+        with Image.open(path) as image:
+            sized.append((max(image.size), path))
+    large = sorted(item for item in sized if item[0] >= TILE_SIZE)
+    if large:
+        return large[0][1]
+    return max(sized)[1] if sized else None
+
+
+def logo_digest(sources):
+    """Digest of the logo list and each source's size and mtime"""
+    digest = hashlib.sha256()
+    for uid, path in sources:
+        stat = path.stat()
+        digest.update(f"{uid}\0{path.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    digest.update(f"{TILE_SIZE}:{WEBP_QUALITY}".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def build_atlases(sources, output_dir, digest, columns=DEFAULT_COLUMNS):
+    """Write the atlases; returns {data-uid: (atlas name, column, row, columns, rows)}"""
+    per_atlas = columns * MAX_ROWS
+    placements = {}
+    for atlas_index in range(math.ceil(len(sources) / per_atlas)):
+        batch = sources[atlas_index * per_atlas:(atlas_index + 1) * per_atlas]
+        atlas_columns = min(columns, len(batch))
+        rows = math.ceil(len(batch) / atlas_columns)
+        atlas = Image.new('RGBA', (atlas_columns * TILE_SIZE, rows * TILE_SIZE), (0, 0, 0, 0))
+        name = f"{SPRITE_PREFIX}{digest}-{atlas_index}.webp"
+        for position, (uid, path) in enumerate(batch):
+            column, row = position % atlas_columns, position // atlas_columns
+            with Image.open(path) as image:
+                tile = image.convert('RGBA')
+            # Same fit as the page's object-fit: the logo is centered in a square box
+            tile.thumbnail((TILE_SIZE, TILE_SIZE), Image.Resampling.LANCZOS)
+            atlas.paste(tile, (column * TILE_SIZE + (TILE_SIZE - tile.width) // 2,
+                               row * TILE_SIZE + (TILE_SIZE - tile.height) // 2))
+            placements[uid] = (name, column, row, atlas_columns, rows)
+        with atomic_output(output_dir / name) as f:
+            atlas.save(f, 'WEBP', quality=WEBP_QUALITY, method=WEBP_METHOD, exact=True)
+    return placements
+
+
+def percent(index, count):
+    return f"{index * 100 / (count - 1):g}%" if count > 1 else '0'
+
+
+def css_string(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def sprite_css(logo_class, placements, href):
+    """CSS painting every logo box from its atlas; href maps an atlas name to a URL"""
+    rules = [f".{logo_class} picture{{display:none}}",
+             f".{logo_class}{{background-repeat:no-repeat}}"]
+    for uid, (name, column, row, columns, rows) in placements.items():
+        selector = f'[data-uid="{css_string(uid)}"]>.{logo_class}'
+        rules.append(f"{selector}{{background-image:url({href(name)});background-size:{columns * 100}% {rows * 100}%;"
+                     f"background-position:{percent(column, columns)} {percent(row, rows)}}}")
+    return f'<style {STYLE_ATTRIBUTE}="">{"".join(rules)}</style>'
+
+
+def inject_css(content, style):
+    content = STYLE_PATTERN.sub('', content)
+    head_end = content.find('</head>')
+    if head_end == -1:
+        return content
+    return content[:head_end] + style + content[head_end:]
+
+
+def update_sprites(root='.', page_name=DEFAULT_PAGE, columns=DEFAULT_COLUMNS, force=False):
+    """Rebuild the atlases if the logo set changed and refresh the page's CSS; returns the logos sprited"""
+    root = Path(root)
+    page = root / page_name
+    uploads_dir = root / UPLOADS_DIR
+    output_dir = root / SPRITE_DIR
+    content = page.read_text(encoding='utf-8')
+
+    logo_class, logos = find_logos(content)
+    sources = []
+    for uid, name in logos:
+        path = logo_source(uploads_dir, name)
+        if path is None:
+            print(f"   ⚠️  {uid}: no copy of {name} in the mirror, left as is")
+            continue
+        sources.append((uid, path))
+    if not sources:
+        print(f"❌ No client logos found in {page}")
+        return []
+
+    digest = logo_digest(sources)
+    manifest_path = output_dir / SPRITE_MANIFEST
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')) if manifest_path.exists() else {}
+    current = manifest.get('digest') == digest and all((output_dir / p[0]).exists() for p in manifest['placements'].values())
+    if current and not force:
+        placements = {uid: tuple(p) for uid, p in manifest['placements'].items()}
+        print(f"✅ Logo atlases up to date ({digest})")
+    else:
+        placements = build_atlases(sources, output_dir, digest, columns)
+        atlases = sorted({p[0] for p in placements.values()})
+        for stale in output_dir.glob(f"{SPRITE_PREFIX}*.webp"):
+            if stale.name not in atlases:
+                stale.unlink()
+        atomic_write(manifest_path, json.dumps({'digest': digest, 'placements': placements}, indent=2).encode('utf-8'))
+        sizes = sum((output_dir / name).stat().st_size for name in atlases)
+        print(f"🧩 Packed {len(placements)} logos into {len(atlases)} atlas(es), {sizes / 1024:.1f} KB")
+
+    page_dir = posixpath.dirname(Path(page_name).as_posix())
+    style = sprite_css(logo_class, placements, lambda name: posixpath.relpath(f"{SPRITE_DIR}/{name}", page_dir or '.'))
+    updated = inject_css(content, style)
+    if updated != content:
+        atomic_write(page, updated.encode('utf-8'))
+        print(f"   ✏️  {page}")
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the client logos into sprite atlases")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--page', default=DEFAULT_PAGE, help="page with the client list, relative to the root")
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help="logos per atlas row")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the logo set is unchanged")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    sources = update_sprites(args.root, args.page, args.columns, args.force)
+    if not sources:
+        return
+    placements = json.loads((Path(args.root) / SPRITE_DIR / SPRITE_MANIFEST).read_text(encoding='utf-8'))['placements']
+    atlases = {p[0] for p in placements.values()}
+    source_bytes = sum(path.stat().st_size for _, path in sources)
+    atlas_bytes = sum((Path(args.root) / SPRITE_DIR / name).stat().st_size for name in atlases)
+    print(f"\n📊 Sprite summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Logo requests: {len(sources)} → {len(atlases)}")
+    print(f"   Separate logos: {source_bytes / 1024:.1f} KB, atlases: {atlas_bytes / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
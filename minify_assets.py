@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Minify the mirror's HTML, inline JSON, stylesheets, scripts and data files
+Pages are minified as a stream (bounded by the largest <script>/<style>
+block, not the page), files are processed in parallel and every file is
+replaced atomically, and only when it gets smaller
+
+Safe for Next.js hydration: React's text separators and Suspense markers
+(<!-- -->, <!--$-->) and all text whitespace are kept on Next.js pages, and
+__NEXT_DATA__ is only replaced when it parses to exactly the same value
+
+    python minify_assets.py             # minify and report before/after sizes
+    python minify_assets.py --check     # report only
+"""
+
+import argparse
+import codecs
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from link_rewriter import SKIP_FILES, atomic_output
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_SIZE = 4096
+
+MINIFY_GLOBS = (
+    '*.html', 'work/*.html', 'manifest.json', '_next/data/**/*.json',
+    '_next/static/css/*.css', 'fonts.googleapis.com/*.css', '_next/static/chunks/**/*.js',
+)
+
+RAW_TEXT_OPEN = re.compile(r'<(script|style|pre|textarea)\b[^>]*>', re.IGNORECASE)
+COMMENT_PATTERN = re.compile(r'<!--(.*?)-->', re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Whitespace between two tags; it only renders when both sides are inline ("<a>x</a> <b>y</b>"),
+# not next to a block boundary or a <br>, where it falls at the start or end of a line
+BETWEEN_TAGS_PATTERN = re.compile(r'(</?([A-Za-z][\w-]*)\b[^>]*>)\s+(?=</?([A-Za-z][\w-]*))')
+BLOCK_TAGS = frozenset((
+    'html', 'head', 'body', 'title', 'meta', 'link', 'base', 'script', 'style', 'noscript', 'template',
+    'address', 'article', 'aside', 'blockquote', 'details', 'dialog', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hgroup', 'hr',
+    'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'caption', 'colgroup', 'col',
+    'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'ul', 'option', 'optgroup', 'br',
+))
+JSON_TYPES = ('application/json', 'application/ld+json')
+SOURCE_MAP_PATTERN = re.compile(r'\n//# sourceMappingURL=(\S+)\s*$')
+
+# Escapes that keep a JSON document inert inside <script>; & and > do not need escaping there
+SCRIPT_JSON_ESCAPES = (('<', '\\u003c'), ('\u2028', '\\u2028'), ('\u2029', '\\u2029'))
+
+
+class Unchanged(Exception):
+    """Raised inside atomic_output to keep the original file"""
+
+
+def minify_css(css):
+    """Drop comments and collapse whitespace, leaving strings and selector spacing intact"""
+    out = []
+    i = 0
+    length = len(css)
+    while i < length:
+        char = css[i]
+        if char in '"\'':
+            end = i + 1
+            while end < length and css[end] != char:
+                end += 2 if css[end] == '\\' else 1
+            out.append(css[i:end + 1])
+            i = end + 1
+        elif css[i:i + 4].lower() == 'url(' and css[i + 4:].lstrip()[:1] not in ('"', "'"):
+            # An unquoted url() is one token: its contents are copied as they are
+            end = css.find(')', i + 4)
+            end = length if end == -1 else end + 1
+            out.append(css[i:end])
+            i = end
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if css.startswith('/*!', i):
+                out.append(css[i:end])
+            i = end
+        elif char.isspace():
+            while i < length and css[i].isspace():
+                i += 1
+            previous = out[-1][-1:] if out else ''
+            following = css[i:i + 1]
+            # Spaces around { } ; , and after : never matter; elsewhere (selectors, calc) keep one
+            if previous and following and previous not in '{};,:' and following not in '{};,':
+                out.append(' ')
+        else:
+            if char == '}' and out and out[-1] == ';':
+                # The last declaration needs no semicolon; only ever a lone ; token, never part of a string or url()
+                out.pop()
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def minify_json_text(text, inline=False):
+    """Compact JSON that parses to the same value, or None if it does not parse"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    compact = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    if inline:
+        for char, escaped in SCRIPT_JSON_ESCAPES:
+            compact = compact.replace(char, escaped)
+    if json.loads(compact) != data:
+        return None
+    return compact
+
+
+def between_tags(match):
+    """Drop whitespace next to a block-level tag, keep one space between inline ones"""
+    tag, before, after = match.groups()
+    if before.lower() in BLOCK_TAGS or after.lower() in BLOCK_TAGS:
+        return tag
+    return tag + ' '
+
+
+class HtmlMinifier:
+    """Streaming HTML minifier; feed() chunks, then close()"""
+
+    def __init__(self):
+        self.pending = ''
+        self.react = None
+
+    def minify_markup(self, markup):
+        if self.react:
+            # React hydrates against these comments and the exact text nodes
+            return markup
+        markup = COMMENT_PATTERN.sub(lambda m: m.group(0) if m.group(1).startswith('[if') else '', markup)
+        markup = BETWEEN_TAGS_PATTERN.sub(between_tags, markup)
+        return WHITESPACE_PATTERN.sub(' ', markup)
+
+    def minify_raw(self, tag, open_tag, body, close_tag):
+        name = tag.lower()
+        lowered = open_tag.lower()
+        if name == 'script' and any(kind in lowered for kind in JSON_TYPES):
+            compact = minify_json_text(body, inline=True)
+            if compact is not None and len(compact) < len(body):
+                body = compact
+        elif name == 'script' and 'src=' not in lowered:
+            body = body.strip()
+        elif name == 'style':
+            body = minify_css(body)
+        return open_tag + body + close_tag
+
+    def safe_cut(self, text):
+        """Start of the last tag that is outside comments and not preceded by whitespace"""
+        comment = text.rfind('<!--')
+        end = len(text)
+        if comment != -1 and text.find('-->', comment) == -1:
+            end = comment + 1
+        floor = text.rfind('-->', 0, end)
+        cut = text.rfind('<', 0, end)
+        # Never split a whitespace run, so chunk boundaries do not change the output
+        while cut > floor and text[cut - 1].isspace():
+            cut = text.rfind('<', 0, cut)
+        return cut if cut > floor else 0
+
+    def feed(self, text, final=False):
+        self.pending += text
+        if self.react is None:
+            if len(self.pending) < SNIFF_SIZE and not final:
+                return ''
+            head = self.pending[:SNIFF_SIZE]
+            self.react = '__next' in head or 'data-next-head' in head or '/_next/' in head
+        out = []
+        while True:
+            match = RAW_TEXT_OPEN.search(self.pending)
+            if match is None:
+                cut = len(self.pending) if final else self.safe_cut(self.pending)
+                break
+            tag = match.group(1)
+            close = re.compile(r'</' + tag + r'\s*>', re.IGNORECASE).search(self.pending, match.end())
+            if close is None:
+                cut = len(self.pending) if final else match.start()
+                break
+            out.append(self.minify_markup(self.pending[:match.start()]))
+            out.append(self.minify_raw(tag, match.group(0), self.pending[match.end():close.start()], close.group(0)))
+            self.pending = self.pending[close.end():]
+        out.append(self.minify_markup(self.pending[:cut]))
+        self.pending = self.pending[cut:]
+        return ''.join(out)
+
+    def close(self):
+        return self.feed('', final=True)
+
+
+def file_type(path):
+    path = Path(path)
+    if path.suffix == '.html':
+        return 'html'
+    return {'.json': 'json', '.css': 'css', '.js': 'js'}.get(path.suffix)
+
+
+def minify_file(path, check=False):
+    """Minify one file in place; returns (path, type, bytes_before, bytes_after, seconds, error)"""
+    started = time.perf_counter()
+    kind = file_type(path)
+    before = os.path.getsize(path)
+    after = before
+    error = None
+    try:
+        if kind == 'html':
+            minifier = HtmlMinifier()
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            written = 0
+            try:
+                with open(path, 'rb') as source, (open(os.devnull, 'wb') if check else atomic_output(path)) as f:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        text = minifier.feed(decoder.decode(chunk, final=not chunk)) if chunk else minifier.close()
+                        data = text.encode('utf-8')
+                        written += len(data)
+                        f.write(data)
+                        if not chunk:
+                            break
+                    if written >= before:
+                        raise Unchanged()
+                after = written
+            except Unchanged:
+                pass
+        else:
+            text = Path(path).read_text(encoding='utf-8')
+            if kind == 'json':
+                result = minify_json_text(text)
+                result = text if result is None else result
+            elif kind == 'css':
+                result = minify_css(text)
+            else:
+                # Chunks are minified by Next.js already; only drop links to source maps we do not mirror
+                match = SOURCE_MAP_PATTERN.search(text)
+                missing = match and not (Path(path).parent / match.group(1)).exists()
+                result = text[:match.start()] + '\n' if missing else text
+            data = result.encode('utf-8')
+            if len(data) < before:
+                after = len(data)
+                if not check:
+                    with atomic_output(path) as f:
+                        f.write(data)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return str(path), kind, before, after, time.perf_counter() - started, error
+
+
+def mirror_files(root):
+    files = []
+    for pattern in MINIFY_GLOBS:
+        files += [p for p in sorted(Path(root).glob(pattern)) if p.is_file() and p.name not in SKIP_FILES]
+    return list(dict.fromkeys(files))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify the mirror's HTML, JSON, CSS and JS")
+    parser.add_argument('files', nargs='*', help="files to minify (default: the whole mirror)")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--check', action='store_true', help="report savings without writing files")
+    args = parser.parse_args()
+
+    files = [Path(p) for p in args.files] or mirror_files(args.root)
+    print(f"🗜️  Minifying {len(files)} files{' (check only)' if args.check else ''}...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(minify_file, files, [args.check] * len(files)))
+
+    totals = {}
+    print(f"   {'file':<56} {'before KB':>10} {'after KB':>9} {'saved':>7}")
+    for path, kind, before, after, seconds, error in sorted(results, key=lambda r: r[2] - r[3], reverse=True):
+        if error:
+            print(f"❌ {path}: {error}")
+            continue
+        kind_totals = totals.setdefault(kind, [0, 0, 0])
+        kind_totals[0] += 1
+        kind_totals[1] += before
+        kind_totals[2] += after
+        if before != after:
+            print(f"   {path:<56} {before / 1024:>10.1f} {after / 1024:>9.1f} {1 - after / before:>7.1%}")
+
+    print(f"\n📊 Minification summary ({time.perf_counter() - started:.2f}s):")
+    for kind, (count, before, after) in sorted(totals.items()):
+        saved = 1 - after / before if before else 0
+        print(f"   {kind:<5} {count:>4} files  {before / 1024:>9.1f} KB → {after / 1024:>9.1f} KB  ({saved:.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Local mock origin serving the mirror as lo2s.com, CloudFront and Google Fonts
+Used to load-test the download paths on one machine with tunable latency,
+throughput caps, 429/5xx injection, Range requests and ETags
+
+Hosts are selected by the Host header or by a leading path segment, so
+http://127.0.0.1:8765/d2csodhem33bqt.cloudfront.net/uploads/x.webp and a
+request with "Host: d2csodhem33bqt.cloudfront.net" for /uploads/x.webp both
+serve the same file. Point the scrapers at it with LO2S_ORIGIN.
+"""
+
+import argparse
+import asyncio
+import email.utils
+import mimetypes
+import random
+import time
+from pathlib import Path
+from urllib.parse import unquote, urlparse, urlsplit
+
+# Host name -> directory of the mirror that stands in for it
+HOST_DIRS = {
+    'lo2s.com': '.',
+    'www.lo2s.com': '.',
+    'd2csodhem33bqt.cloudfront.net': 'd2csodhem33bqt.cloudfront.net',
+    'fonts.googleapis.com': 'fonts.googleapis.com',
+    'fonts.gstatic.com': 'fonts.gstatic.com',
+}
+
+# Next.js page routes of lo2s.com that map to a different file in the mirror
+PAGE_ROUTES = {
+    '/': 'index.html',
+    '/work': 'work.html',
+    '/about': 'about.html',
+    '/contact': 'contact.html',
+    '/archive': 'archive.html',
+}
+
+CHUNK_SIZE = 64 * 1024
+
+# Precompressed siblings written by precompress.py, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+STATUS_TEXT = {
+    200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 404: 'Not Found',
+    405: 'Method Not Allowed', 416: 'Range Not Satisfiable', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable',
+}
+
+
+def redirect_url(url, origin, hosts=HOST_DIRS):
+    """Map an absolute URL on one of the mirrored hosts to the mock origin"""
+    parsed = urlsplit(url)
+    if parsed.netloc not in hosts:
+        return url
+    target = f"{origin.rstrip('/')}/{parsed.netloc}{parsed.path or '/'}"
+    if parsed.query:
+        target += f"?{parsed.query}"
+    return target
+
+
+class MockOrigin:
+    """asyncio HTTP/1.1 server answering from the mirror tree"""
+
+    def __init__(self, root='.', latency=0.0, bandwidth=None, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, seed=None):
+        self.root = Path(root).resolve()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'bytes': 0, 'not_found': 0, 'throttled': 0, 'errors': 0, 'partial': 0,
+                      'precompressed': 0}
+
+    def resolve(self, host, path):
+        """Find the mirror file for a host and URL path, or None"""
+        segments = path.lstrip('/').split('/', 1)
+        if segments[0] in HOST_DIRS:
+            host = segments[0]
+            path = '/' + (segments[1] if len(segments) > 1 else '')
+
+        host = (host or 'lo2s.com').split(':')[0]
+        base = self.root / HOST_DIRS.get(host, '.')
+        path = unquote(path)
+
+        candidates = []
+        route = path.rstrip('/') or '/'
+        if base == self.root and route in PAGE_ROUTES:
+            candidates.append(PAGE_ROUTES[route])
+        relative = path.lstrip('/')
+        if relative:
+            candidates += [relative, f"{relative}.html", f"{relative}.css", f"{relative}/index.html"]
+
+        for candidate in candidates:
+            local_path = (base / candidate).resolve()
+            if local_path.is_file() and local_path.is_relative_to(self.root):
+                return local_path
+        return None
+
+    def etag(self, stat, encoding=None):
+        suffix = f"-{encoding}" if encoding else ''
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+    def precompressed(self, local_path, accept_encoding):
+        """(encoding, sibling path) of a current precompressed copy the client accepts, or (None, None)"""
+        accepted = {part.split(';')[0].strip() for part in accept_encoding.lower().split(',')}
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            sibling = local_path.with_name(local_path.name + suffix)
+            try:
+                if sibling.stat().st_mtime_ns == local_path.stat().st_mtime_ns:
+                    return encoding, sibling
+            except FileNotFoundError:
+                continue
+        return None, None
+
+    def content_type(self, local_path):
+        if local_path.suffix == '' and local_path.parent.name == 'fonts.googleapis.com':
+            return 'text/css; charset=utf-8'
+        mime_type = mimetypes.guess_type(local_path.name)[0] or 'application/octet-stream'
+        if mime_type.startswith('text/') or mime_type in ('application/json', 'application/javascript'):
+            mime_type += '; charset=utf-8'
+        return mime_type
+
+    def parse_range(self, header, size):
+        """Return (start, end) inclusive for a single bytes range, or None if unsatisfiable"""
+        unit, _, spec = header.partition('=')
+        if unit.strip() != 'bytes' or ',' in spec:
+            return None
+        first, _, last = spec.strip().partition('-')
+        try:
+            if first == '':
+                length = int(last)
+                if length <= 0:
+                    return None
+                return max(size - length, 0), size - 1
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start >= size or end < start:
+            return None
+        return start, min(end, size - 1)
+
+    async def send_head(self, writer, status, headers):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+    async def send_error(self, writer, status, extra_headers=None):
+        body = f"{status} {STATUS_TEXT.get(status, '')}\n".encode()
+        headers = {'Content-Type': 'text/plain', 'Content-Length': len(body)}
+        headers.update(extra_headers or {})
+        await self.send_head(writer, status, headers)
+        writer.write(body)
+        await writer.drain()
+
+    async def send_file(self, writer, local_path, start, length):
+        """Stream part of a file, sleeping to respect the bandwidth cap"""
+        with open(local_path, 'rb') as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                remaining -= len(chunk)
+                self.stats['bytes'] += len(chunk)
+                if self.bandwidth:
+                    await asyncio.sleep(len(chunk) / self.bandwidth)
+
+    async def handle_request(self, writer, method, target, headers):
+        self.stats['requests'] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method not in ('GET', 'HEAD'):
+            await self.send_error(writer, 405, {'Allow': 'GET, HEAD'})
+            return
+
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            self.stats['throttled'] += 1
+            await self.send_error(writer, 429, {'Retry-After': self.retry_after})
+            return
+        if roll < self.throttle_rate + self.error_rate:
+            self.stats['errors'] += 1
+            await self.send_error(writer, self.random.choice((500, 502, 503)))
+            return
+
+        local_path = self.resolve(headers.get('host'), urlparse(target).path)
+        if local_path is None:
+            self.stats['not_found'] += 1
+            await self.send_error(writer, 404)
+            return
+
+        content_type = self.content_type(local_path)
+        encoding, sibling = None, None
+        if 'range' not in headers:
+            encoding, sibling = self.precompressed(local_path, headers.get('accept-encoding', ''))
+        stat = local_path.stat()
+        etag = self.etag(stat, encoding)
+        response_headers = {
+            'Content-Type': content_type,
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(stat.st_mtime, usegmt=True),
+            'Accept-Ranges': 'bytes',
+        }
+        if encoding:
+            response_headers['Content-Encoding'] = encoding
+            response_headers['Vary'] = 'Accept-Encoding'
+            local_path, stat = sibling, sibling.stat()
+            self.stats['precompressed'] += 1
+
+        if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            await self.send_head(writer, 304, {'ETag': etag, 'Content-Length': 0})
+            return
+
+        status, start, length = 200, 0, stat.st_size
+        range_header = headers.get('range')
+        if range_header and headers.get('if-range', etag) == etag:
+            byte_range = self.parse_range(range_header, stat.st_size)
+            if byte_range is None:
+                await self.send_error(writer, 416, {'Content-Range': f"bytes */{stat.st_size}"})
+                return
+            start, end = byte_range
+            status, length = 206, end - start + 1
+            response_headers['Content-Range'] = f"bytes {start}-{end}/{stat.st_size}"
+            self.stats['partial'] += 1
+
+        response_headers['Content-Length'] = length
+        await self.send_head(writer, status, response_headers)
+        if method == 'GET':
+            await self.send_file(writer, local_path, start, length)
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one keep-alive connection until the client closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, _version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                await self.handle_request(writer, method.upper(), target, headers)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🌐 Mock origin serving {self.root} on http://{host}:{port}")
+        print(f"   Set LO2S_ORIGIN=http://{host}:{port} to point the scrapers at it")
+        started = time.perf_counter()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            elapsed = time.perf_counter() - started
+            print(f"\n📊 Mock origin summary ({elapsed:.1f}s):")
+            for name, value in self.stats.items():
+                print(f"   {name}: {value}")
+
+
+try:
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    HTTPAdapter = object
+
+
+class OriginRedirectAdapter(HTTPAdapter):
+    """requests adapter that sends traffic for the mirrored hosts to a mock origin"""
+
+    def __init__(self, origin, hosts=HOST_DIRS, **kwargs):
+        super().__init__(**kwargs)
+        self.origin = origin
+        self.hosts = hosts
+
+    def send(self, request, **kwargs):
+        redirected = request.copy()
+        redirected.url = redirect_url(request.url, self.origin, self.hosts)
+        response = super().send(redirected, **kwargs)
+        response.request = request
+        response.url = request.url
+        return response
+
+
+async def route_origin(context, origin, hosts=HOST_DIRS):
+    """Send a Playwright context's traffic for the mirrored hosts to a mock origin"""
+
+    async def handle(route):
+        url = route.request.url
+        target = redirect_url(url, origin, hosts)
+        if target == url:
+            await route.continue_()
+            return
+        try:
+            response = await route.fetch(url=target)
+        except Exception:
+            await route.abort()
+            return
+        await route.fulfill(response=response)
+
+    await context.route('**/*', handle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mirror as a local stand-in for lo2s.com and its CDNs")
+    parser.add_argument('--root', default='.', help="mirror directory (default: current directory)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added before every response")
+    parser.add_argument('--bandwidth', type=float, default=None, help="per-connection cap in bytes/second")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 5xx")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument('--seed', type=int, default=None, help="seed for reproducible failure injection")
+    args = parser.parse_args()
+
+    origin = MockOrigin(args.root, latency=args.latency, bandwidth=args.bandwidth,
+                        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                        retry_after=args.retry_after, seed=args.seed)
+    try:
+        asyncio.run(origin.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Phase profiler shared by all scraper entry points
+Run any scraper with --profile (optionally --profile-dir=DIR) to get per-phase
+wall time, CPU time and allocations for page discovery, extraction, download,
+CSS dependency walk and link rewrite, plus cProfile dumps and a folded stack
+file for flamegraph.pl / speedscope
+"""
+
+import atexit
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+PHASES = ('discovery', 'extraction', 'download', 'css_walk', 'rewrite')
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 10
+
+
+class PhaseStats:
+    """Exclusive time and allocations accumulated for one phase"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.allocated = 0
+        self.peak = 0
+        self.profile = cProfile.Profile()
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'wall_seconds': round(self.wall, 6),
+            'cpu_seconds': round(self.cpu, 6),
+            'net_allocated_kb': round(self.allocated / 1024, 1),
+            'peak_traced_kb': round(self.peak / 1024, 1),
+        }
+
+
+class _Frame:
+    """One active phase on the stack; only the innermost one accumulates"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.resume()
+
+    def resume(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.mem_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.stats.profile.enable()
+
+    def pause(self):
+        self.stats.profile.disable()
+        current, peak = tracemalloc.get_traced_memory()
+        self.stats.wall += time.perf_counter() - self.wall_start
+        self.stats.cpu += time.process_time() - self.cpu_start
+        self.stats.allocated += current - self.mem_start
+        self.stats.peak = max(self.stats.peak, peak)
+
+
+class PhaseProfiler:
+    """Collects phase statistics and stack samples for one process"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output_dir = Path('profile')
+        self.phases = {}
+        self.stack = []
+        self.samples = Counter()
+        self.sampler = None
+        self.started = None
+
+    def enable(self, output_dir='profile'):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.output_dir = Path(output_dir)
+        self.started = time.perf_counter()
+        tracemalloc.start()
+        self.sampler = threading.Thread(target=self._sample, args=(threading.main_thread().ident,), daemon=True)
+        self.sampler.start()
+        atexit.register(self.write_report)
+        print(f"🔬 Profiling enabled, writing results to {self.output_dir}/")
+
+    @contextmanager
+    def _phase(self, name):
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+        stats.calls += 1
+        if self.stack:
+            self.stack[-1].pause()
+        frame = _Frame(stats)
+        self.stack.append(frame)
+        try:
+            yield
+        finally:
+            frame.pause()
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1].resume()
+
+    def phase(self, name):
+        """Context manager attributing the enclosed work to a phase"""
+        if not self.enabled or threading.current_thread() is not threading.main_thread():
+            return nullcontext()
+        return self._phase(name)
+
+    def _sample(self, thread_id):
+        """Sample the main thread's stack into folded 'phase;file:func;... count' form"""
+        while self.enabled:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                    frame = frame.f_back
+                phase = self.stack[-1].stats.name if self.stack else 'other'
+                self.samples[';'.join([phase] + names[::-1])] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def summary(self):
+        return {
+            'total_wall_seconds': round(time.perf_counter() - self.started, 6),
+            'phases': {name: stats.to_dict() for name, stats in self.phases.items()},
+        }
+
+    def write_report(self):
+        self.enabled = False
+        while self.stack:
+            self.stack.pop().pause()
+        if self.sampler:
+            self.sampler.join(timeout=1)
+        tracemalloc.stop()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        with open(self.output_dir / 'phases.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        with open(self.output_dir / 'stacks.folded', 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        report = io.StringIO()
+        for name, stats in self.phases.items():
+            stats.profile.dump_stats(self.output_dir / f"{name}.pstats")
+            report.write(f"\n=== {name} ===\n")
+            pstats.Stats(stats.profile, stream=report).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        with open(self.output_dir / 'functions.txt', 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+
+        print(f"\n🔬 Phase profile ({summary['total_wall_seconds']:.2f}s total):")
+        print(f"   {'phase':<12} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'net KB':>10} {'peak KB':>10}")
+        for name, stats in summary['phases'].items():
+            print(f"   {name:<12} {stats['calls']:>6} {stats['wall_seconds']:>9.3f} {stats['cpu_seconds']:>9.3f} "
+                  f"{stats['net_allocated_kb']:>10.1f} {stats['peak_traced_kb']:>10.1f}")
+        print(f"   Details: {self.output_dir}/phases.json, functions.txt, *.pstats, stacks.folded")
+
+
+profiler = PhaseProfiler()
+
+
+def phase(name):
+    """Attribute the enclosed work to a phase when profiling is enabled"""
+    return profiler.phase(name)
+
+
+def enable_profiling(argv=None):
+    """Turn profiling on if --profile is on the command line; removes the flags"""
+    argv = sys.argv if argv is None else argv
+    output_dir = None
+    for arg in list(argv[1:]):
+        if arg == '--profile':
+            output_dir = output_dir or 'profile'
+            argv.remove(arg)
+        elif arg.startswith('--profile-dir='):
+            output_dir = arg.split('=', 1)[1]
+            argv.remove(arg)
+    if output_dir:
+        profiler.enable(output_dir)
+    return profiler.enabled
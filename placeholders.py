@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Generate low-quality image placeholders (LQIP) for the uploads and inject them
+Every upload gets a ~16 px WebP as an inline data: URI, made from its smallest
+copy per the image_dimensions.py index and redone only when that copy changes
+
+Pages get a <style> block that paints each <img>'s placeholder as its
+background until the image loads (no change to React-rendered attributes);
+the image objects in __NEXT_DATA__ and _next/data JSON gain a "placeholder"
+field. Missing width/height are image_dimensions.py's job
+
+    python placeholders.py                 # update the index and all pages
+    python placeholders.py --index-only
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from image_dimensions import IMG_PATTERN, UPLOAD_URL_PATTERN, DimensionIndex
+from image_dimensions import INDEX_FILE as DIMENSIONS_FILE
+from link_rewriter import INLINE_JSON_ESCAPES, NEXT_DATA_PATTERN, SKIP_FILES, atomic_write
+from responsive_variants import UPLOADS_DIR, VARIANT_PATTERN
+
+INDEX_FILE = '.placeholders.json'
+INDEX_VERSION = 2
+
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 30
+
+STYLE_ATTRIBUTE = 'data-lo2s-lqip'
+STYLE_PATTERN = re.compile(r'<style ' + STYLE_ATTRIBUTE + r'="">.*?</style>', re.DOTALL)
+SRC_PATTERN = re.compile(r'\ssrc="([^"]*)"')
+
+# Formats Pillow can make a placeholder from
+IMAGE_SUFFIXES = ('.webp', '.jpg', '.jpeg', '.png')
+
+
+def upload_name(name):
+    match = VARIANT_PATTERN.match(name)
+    return match.group(2) if match else name
+
+
+def make_placeholder(path):
+    """data: URI of a tiny WebP of the image, or None for images with transparency"""
+    with Image.open(path) as image:
+        if 'A' in image.getbands() or image.info.get('transparency') is not None:
+            # A placeholder would show through a logo's transparent areas for good
+            return None
+        image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        image = image.convert('RGB')
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def placeholder_job(name, path):
+    return name, make_placeholder(path)
+
+
+class PlaceholderIndex:
+    """Upload name -> placeholder data: URI, with the copy it was made from; sizes come from a DimensionIndex"""
+
+    def __init__(self, path, dimensions):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.placeholders = {}
+        self.sources = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.placeholders = data.get('placeholders', {})
+                    self.sources = data.get('sources', {})
+            except (OSError, ValueError):
+                pass
+
+    def update(self, uploads_dir, workers=None):
+        """Update the dimension index, then redo placeholders whose source copy changed; returns that count"""
+        uploads_dir = Path(uploads_dir)
+        self.dimensions.update(uploads_dir)
+        copies = {}
+        for name, entry in self.dimensions.files.items():
+            if '/' not in name and name.lower().endswith(IMAGE_SUFFIXES):
+                copies.setdefault(upload_name(name), []).append((entry[0] * entry[1], name, entry))
+
+        jobs = []
+        for upload in [upload for upload in self.sources if upload not in copies]:
+            del self.sources[upload]
+            self.placeholders.pop(upload, None)
+        for upload, candidates in sorted(copies.items()):
+            # The smallest copy that is still bigger than the placeholder decodes fastest
+            candidates.sort()
+            _, name, entry = next((c for c in candidates if max(c[2][:2]) >= PLACEHOLDER_SIZE), candidates[-1])
+            source = [name, entry[2], entry[3]]
+            if self.sources.get(upload) == source:
+                continue
+            self.sources[upload] = source
+            self.placeholders.pop(upload, None)
+            jobs.append((upload, uploads_dir / name))
+        if len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(placeholder_job, *zip(*jobs)))
+        else:
+            results = [placeholder_job(*job) for job in jobs]
+        for upload, placeholder in results:
+            if placeholder:
+                self.placeholders[upload] = placeholder
+        return len(jobs)
+
+    def lookup(self, url):
+        """(file name, placeholder) for a URL of a mirrored file whose upload has a placeholder, else None"""
+        match = UPLOAD_URL_PATTERN.search(url) if isinstance(url, str) else None
+        source = self.dimensions.source_name(match.group(1)) if match else None
+        if source not in self.dimensions.files:
+            return None
+        placeholder = self.placeholders.get(upload_name(source))
+        return (match.group(1), placeholder) if placeholder else None
+
+    def save(self):
+        self.dimensions.save()
+        data = {'version': INDEX_VERSION, 'placeholders': self.placeholders, 'sources': self.sources}
+        atomic_write(self.path, json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+
+
+def add_to_data(data, index):
+    """Add placeholders to the image objects of a Next.js payload; returns True if changed"""
+    changed = False
+
+    def walk(value):
+        nonlocal changed
+        if isinstance(value, dict):
+            found = index.lookup(value.get('url'))
+            if found:
+                name, placeholder = found
+                if not VARIANT_PATTERN.match(name) and value.get('placeholder') != placeholder:
+                    value['placeholder'] = placeholder
+                    changed = True
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return changed
+
+
+def inject_json(text, index, inline=False):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    if not add_to_data(data, index):
+        return text
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    if inline:
+        for char, escaped in INLINE_JSON_ESCAPES:
+            body = body.replace(char, escaped)
+    return body
+
+
+def inject_page(content, index):
+    """Placeholder <style> and __NEXT_DATA__ placeholders for one page"""
+    content = STYLE_PATTERN.sub('', content)
+    rules = {}
+    for tag in IMG_PATTERN.findall(content):
+        # The rule selects on src, so data-src (lazy images not yet swapped in) cannot match it
+        src = SRC_PATTERN.search(tag)
+        found = index.lookup(src.group(1)) if src else None
+        if found:
+            name, placeholder = found
+            rules[name] = f'img[src$="/{name}"]{{background:url({placeholder}) 50%/cover no-repeat}}'
+
+    match = NEXT_DATA_PATTERN.search(content)
+    if match:
+        body = inject_json(match.group(2), index, inline=True)
+        content = content[:match.start(2)] + body + content[match.end(2):]
+
+    head_end = content.find('</head>')
+    if rules and head_end != -1:
+        style = f'<style {STYLE_ATTRIBUTE}="">{"".join(rules[name] for name in sorted(rules))}</style>'
+        content = content[:head_end] + style + content[head_end:]
+    return content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and inject low-quality image placeholders")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--index-only', action='store_true', help="update the index without touching pages")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    root = Path(args.root)
+    uploads_dir = root / UPLOADS_DIR
+    index = PlaceholderIndex(uploads_dir / INDEX_FILE, DimensionIndex(uploads_dir / DIMENSIONS_FILE))
+    updated = index.update(uploads_dir, workers=args.workers)
+    index.save()
+    print(f"🌫️  {len(index.placeholders)} placeholders for {len(index.sources)} uploads ({updated} updated)")
+    if args.index_only:
+        return
+
+    pages = [p for p in sorted(root.glob('*.html')) + sorted(root.glob('work/*.html')) if p.name not in SKIP_FILES]
+    data_files = sorted(root.glob('_next/data/**/*.json'))
+    changed = 0
+    for path in pages + data_files:
+        content = path.read_text(encoding='utf-8')
+        updated = inject_json(content, index) if path.suffix == '.json' else inject_page(content, index)
+        if updated != content:
+            atomic_write(path, updated.encode('utf-8'))
+            changed += 1
+            print(f"   ✏️  {path}")
+
+    print(f"\n📊 Placeholder summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Pages and data files updated: {changed} of {len(pages) + len(data_files)}")
+    print(f"   Index: {os.path.getsize(index.path) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
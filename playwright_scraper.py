@@ -4,6 +4,7 @@ Playwright-based scraper for JavaScript-heavy websites
 Handles dynamic content loading and modern web apps
 """
 
+import logging
 import asyncio
 import os
 import re
@@ -13,6 +14,11 @@ from pathlib import Path
 import time
 import json
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_browser_context, configure_session
+
+log = logging.getLogger(__name__)
+
 class PlaywrightScraper:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -21,6 +27,7 @@ class PlaywrightScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        configure_session(self.session)
         self.downloaded_assets = set()
         self.failed_downloads = []
         
@@ -31,7 +38,7 @@ class PlaywrightScraper:
             
         for attempt in range(retries):
             try:
-                print(f"Downloading ({attempt+1}/{retries}): {url}")
+                log.info(f"Downloading ({attempt+1}/{retries}): {url}")
                 response = self.session.get(url, timeout=60, stream=True)
                 response.raise_for_status()
                 
@@ -43,12 +50,12 @@ class PlaywrightScraper:
                             f.write(chunk)
                 
                 self.downloaded_assets.add(url)
-                print(f"✓ Saved: {local_path}")
+                log.info(f"✓ Saved: {local_path}")
                 time.sleep(0.3)
                 return True
                 
             except Exception as e:
-                print(f"✗ Attempt {attempt+1} failed for {url}: {e}")
+                log.warning(f"✗ Attempt {attempt+1} failed for {url}: {e}")
                 if attempt < retries - 1:
                     time.sleep(2 ** attempt)
                 else:
@@ -74,6 +81,7 @@ class PlaywrightScraper:
             context = await browser.new_context(
                 user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             )
+            await configure_browser_context(context)
             
             # Track network requests
             network_requests = []
@@ -86,43 +94,47 @@ class PlaywrightScraper:
             page = await context.new_page()
             page.on("request", handle_request)
             
-            # Get list of pages to visit
-            pages_to_visit = [
-                self.base_url,
-                f"{self.base_url}/work",
-                f"{self.base_url}/about", 
-                f"{self.base_url}/contact",
-                f"{self.base_url}/archive"
-            ]
-            
-            # Add project pages
-            try:
-                with open(self.output_dir / 'work.html', 'r') as f:
-                    work_content = f.read()
-                project_urls = re.findall(r'href="(/work/[^"]+)"', work_content)
-                for project_url in project_urls:
-                    pages_to_visit.append(f"{self.base_url}{project_url}")
-            except:
-                pass
+            with phase('discovery'):
+                # Get list of pages to visit
+                pages_to_visit = [
+                    self.base_url,
+                    f"{self.base_url}/work",
+                    f"{self.base_url}/about", 
+                    f"{self.base_url}/contact",
+                    f"{self.base_url}/archive"
+                ]
+                
+                # Add project pages
+                try:
+                    with open(self.output_dir / 'work.html', 'r') as f:
+                        work_content = f.read()
+                    project_urls = re.findall(r'href="(/work/[^"]+)"', work_content)
+                    for project_url in project_urls:
+                        pages_to_visit.append(f"{self.base_url}{project_url}")
+                except:
+                    pass
             
             # Visit each page and let JavaScript load
             for page_url in pages_to_visit:
                 try:
-                    print(f"🔍 Visiting: {page_url}")
-                    await page.goto(page_url, wait_until='networkidle', timeout=30000)
-                    
-                    # Wait a bit more for lazy loading
-                    await page.wait_for_timeout(3000)
-                    
-                    # Scroll to trigger lazy loading
-                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await page.wait_for_timeout(2000)
-                    
-                    # Get page content after JS execution
-                    content = await page.content()
+                    # Page loads (navigation, lazy-load waits) are network time, not link discovery
+                    with phase('download'):
+                        print(f"🔍 Visiting: {page_url}")
+                        await page.goto(page_url, wait_until='networkidle', timeout=30000)
+                        
+                        # Wait a bit more for lazy loading
+                        await page.wait_for_timeout(3000)
+                        
+                        # Scroll to trigger lazy loading
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        await page.wait_for_timeout(2000)
+                        
+                        # Get page content after JS execution
+                        content = await page.content()
                     
                     # Extract additional assets from rendered content
-                    await self.extract_assets_from_rendered_content(content, network_requests)
+                    with phase('extraction'):
+                        await self.extract_assets_from_rendered_content(content, network_requests)
                     
                 except Exception as e:
                     print(f"❌ Error visiting {page_url}: {e}")
@@ -160,29 +172,30 @@ class PlaywrightScraper:
         downloaded = 0
         skipped = 0
         
-        for url in asset_urls:
-            # Convert to full URL
-            if url.startswith('/'):
-                full_url = urljoin(self.base_url, url)
-            else:
-                full_url = url
-            
-            # Skip if not from our domains
-            parsed = urlparse(full_url)
-            if parsed.netloc not in ['lo2s.com', 'fonts.googleapis.com', 'fonts.gstatic.com', 'd2csodhem33bqt.cloudfront.net']:
-                continue
-            
-            # Get local path
-            local_path = self.get_local_path(url)
-            
-            # Skip if already exists
-            if local_path.exists() and local_path.stat().st_size > 0:
-                skipped += 1
-                continue
-            
-            # Download
-            if self.download_asset(full_url, local_path):
-                downloaded += 1
+        with phase('download'):
+            for url in asset_urls:
+                # Convert to full URL
+                if url.startswith('/'):
+                    full_url = urljoin(self.base_url, url)
+                else:
+                    full_url = url
+                
+                # Skip if not from our domains
+                parsed = urlparse(full_url)
+                if parsed.netloc not in ['lo2s.com', 'fonts.googleapis.com', 'fonts.gstatic.com', 'd2csodhem33bqt.cloudfront.net']:
+                    continue
+                
+                # Get local path
+                local_path = self.get_local_path(url)
+                
+                # Skip if already exists
+                if local_path.exists() and local_path.stat().st_size > 0:
+                    skipped += 1
+                    continue
+                
+                # Download
+                if self.download_asset(full_url, local_path):
+                    downloaded += 1
         
         return downloaded, skipped, len(self.failed_downloads)
     
@@ -223,4 +236,5 @@ def main():
     return asyncio.run(scraper.run())
 
 if __name__ == "__main__":
+    enable_profiling()
     main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Generate a Workbox precache manifest for the deployed mirror
+Walks every file Vercel deploys (.vercelignore is honoured), keeps the pages
+and whatever they reference, directly or through the stylesheets they load
+(link_rewriter.references), filters those by the include patterns and size
+limits, hashes them in parallel and writes [{"url", "revision"}] entries as
+workbox-precaching expects them. Fonts no stylesheet uses any more and
+stylesheets no page links are never precached
+
+Files whose name already carries a content hash (the same classes
+cache_headers.py marks immutable, see hashed_names.py) get a null revision,
+as Workbox's dontCacheBustURLsMatching would;
+pages are listed under their clean URL (/about, /work/<slug>) since
+vercel.json redirects the .html form
+
+    python precache_manifest.py
+    python precache_manifest.py --max-image-kb 16 --exclude 'archive.html'
+    python precache_manifest.py --sw-src sw-template.js --sw-dest sw.js
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import posixpath
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from hashed_names import is_content_hashed
+from link_rewriter import SKIP_FILES, atomic_write, file_kind, page_files, references
+
+MANIFEST_FILE = 'precache-manifest.json'
+IGNORE_FILE = '.vercelignore'
+
+# Core pages, scripts, styles and fonts, plus uploads (which the image size limit trims);
+# only files referenced from a page are considered at all
+DEFAULT_INCLUDE = (
+    '*.html',
+    '_next/static/*',
+    'fonts.googleapis.com/*',
+    'fonts.gstatic.com/*.woff2',
+    'd2csodhem33bqt.cloudfront.net/uploads/*',
+    'favicon/*',
+    'favicon.ico',
+    'manifest.json',
+)
+DEFAULT_EXCLUDE = ('*.mp4', '*.m4v', '*.webm', '*.map', '*/.*', '.*', MANIFEST_FILE)
+
+IMAGE_SUFFIXES = ('.webp', '.avif', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico')
+DEFAULT_MAX_IMAGE_KB = 32
+DEFAULT_MAX_KB = 1024
+
+# The client router loads each route's chunks and CSS from the _next/ paths this lists
+BUILD_MANIFEST = '_buildManifest.js'
+BUILD_MANIFEST_PATTERN = re.compile(r'"(static/[^"]+)"')
+
+# workbox-build's injectManifest placeholder
+INJECTION_POINT = 'self.__WB_MANIFEST'
+
+
+def ignore_patterns(root):
+    """(directory names, file patterns) from the deploy ignore file"""
+    directories, patterns = set(), []
+    path = Path(root) / IGNORE_FILE
+    if path.exists():
+        for line in path.read_text(encoding='utf-8').splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.endswith('/'):
+                directories.add(line.rstrip('/'))
+            else:
+                patterns.append(line)
+    return directories, patterns
+
+
+def deployed_files(root):
+    """Site-root-relative paths of every file the deploy uploads"""
+    root = Path(root)
+    ignored_dirs, ignored_patterns = ignore_patterns(root)
+    files = []
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in ignored_dirs and not d.startswith('.'))
+        for name in sorted(names):
+            if name in SKIP_FILES or any(fnmatch.fnmatch(name, pattern) for pattern in ignored_patterns):
+                continue
+            files.append((Path(directory) / name).relative_to(root).as_posix())
+    return files
+
+
+def referenced_files(root, files):
+    """Deployed pages and data files plus every deployed file they reach, in files order
+
+    Pages reach what they reference, stylesheets what they import and load,
+    and the build manifest the chunks of every route.
+    """
+    root = Path(root)
+    deployed = set(files)
+    reached = {path.relative_to(root).as_posix() for path in page_files(root)} & deployed
+    pending = sorted(reached)
+    while pending:
+        path = pending.pop()
+        kind = file_kind(path)
+        if kind:
+            content = (root / path).read_text(encoding='utf-8', errors='replace')
+            found = references(content, kind, posixpath.dirname(path))
+        elif posixpath.basename(path) == BUILD_MANIFEST:
+            content = (root / path).read_text(encoding='utf-8', errors='replace')
+            found = ['_next/' + reference for reference in BUILD_MANIFEST_PATTERN.findall(content)]
+        else:
+            continue
+        for reference in found:
+            if reference in deployed and reference not in reached:
+                reached.add(reference)
+                pending.append(reference)
+    return [path for path in files if path in reached]
+
+
+def select_files(root, files, include, exclude, max_kb, max_image_kb):
+    """Files matching an include pattern and no exclude pattern, within the size limits"""
+    selected = []
+    for path in files:
+        if not any(fnmatch.fnmatch(path, pattern) for pattern in include):
+            continue
+        if any(fnmatch.fnmatch(path, pattern) for pattern in exclude):
+            continue
+        size = (Path(root) / path).stat().st_size
+        limit = max_image_kb if path.lower().endswith(IMAGE_SUFFIXES) else max_kb
+        if size <= limit * 1024:
+            selected.append(path)
+    return selected
+
+
+def file_revision(path):
+    """MD5 of a file, the revision format Workbox uses (safe to run in a worker process)"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def precache_url(path):
+    """URL the deployed site serves a file at (cleanUrls drops .html, index.html is /)"""
+    if path == 'index.html':
+        return '/'
+    if path.endswith('.html'):
+        return '/' + path[:-len('.html')]
+    return '/' + path
+
+
+def build_manifest(root, paths, workers=None):
+    """Workbox precache entries for paths, in path order"""
+    root = Path(root)
+    # Content-hashed names are their own revision; everything else gets an MD5
+    hashed = [path for path in paths if not is_content_hashed(root, path)]
+    if len(hashed) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            revisions = dict(zip(hashed, pool.map(file_revision, [root / path for path in hashed], chunksize=16)))
+    else:
+        revisions = {path: file_revision(root / path) for path in hashed}
+    return [{'url': precache_url(path), 'revision': revisions.get(path)} for path in paths]
+
+
+def inject_manifest(source, destination, entries):
+    """Write destination as source with the injection point replaced by the entries"""
+    content = Path(source).read_text(encoding='utf-8')
+    if content.count(INJECTION_POINT) != 1:
+        raise ValueError(f"{source} must contain {INJECTION_POINT} exactly once")
+    atomic_write(destination, content.replace(INJECTION_POINT, json.dumps(entries)).encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Workbox precache manifest for the mirror")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--include', action='append', help="glob of files to precache (repeatable, replaces the defaults)")
+    parser.add_argument('--exclude', action='append', default=[], help="glob of files to leave out (repeatable)")
+    parser.add_argument('--max-kb', type=int, default=DEFAULT_MAX_KB, help="largest non-image file to precache")
+    parser.add_argument('--max-image-kb', type=int, default=DEFAULT_MAX_IMAGE_KB, help="largest image to precache")
+    parser.add_argument('--output', default=MANIFEST_FILE, help="manifest path, relative to the root")
+    parser.add_argument('--sw-src', help="service worker containing self.__WB_MANIFEST to inject the entries into")
+    parser.add_argument('--sw-dest', help="where to write the injected service worker (default: --sw-src)")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    root = Path(args.root)
+    files = deployed_files(root)
+    referenced = referenced_files(root, files)
+    paths = select_files(root, referenced, args.include or DEFAULT_INCLUDE, DEFAULT_EXCLUDE + tuple(args.exclude),
+                         args.max_kb, args.max_image_kb)
+    entries = build_manifest(root, paths, workers=args.workers)
+    atomic_write(root / args.output, json.dumps(entries, indent=2).encode('utf-8'))
+    if args.sw_src:
+        inject_manifest(args.sw_src, args.sw_dest or args.sw_src, entries)
+        print(f"💉 Injected {len(entries)} entries into {args.sw_dest or args.sw_src}")
+
+    total = sum((root / path).stat().st_size for path in paths)
+    versioned = sum(entry['revision'] is None for entry in entries)
+    print(f"📦 Precache manifest: {root / args.output}")
+    print(f"\n📊 Precache summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Entries: {len(entries)} of {len(files)} deployed files ({total / 1024:.1f} KB)")
+    print(f"   Referenced from a page: {len(referenced)}")
+    print(f"   Hashed: {len(entries) - versioned}, versioned by name: {versioned}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Write precompressed .br and .gz siblings for the mirror's text assets
+Every compressible file (HTML, CSS, JS, JSON, SVG, web manifest) gets a
+maximum-level Brotli and gzip copy next to it, so a static server can send
+them as-is instead of compressing on every request
+
+Siblings carry the source's mtime and are skipped while it matches; a sibling
+that is not smaller than its source is removed, as is one whose source is gone.
+Encodings that did not pay off are recorded in .precompress_manifest.json with
+the source's size and mtime, so they are not retried until the source changes
+
+    python precompress.py              # compress the whole mirror
+    python precompress.py --force      # recompress everything
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from link_rewriter import atomic_output, atomic_write
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_FILE = '.precompress_manifest.json'
+
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.mjs', '.json', '.svg', '.webmanifest', '.xml', '.txt', '.map'}
+
+# Mirror copies and tooling output that are never deployed
+EXCLUDE_DIRS = {
+    'admin', 'httrack_complete', 'httrack_shkoon', 'lo2s.com', 'jordanlago.com',
+    'node_modules', '__pycache__', 'profile',
+}
+
+# Below this size the framing overhead eats the savings
+MIN_SIZE = 256
+
+
+def is_compressible(path):
+    path = Path(path)
+    if path.suffix in COMPRESSIBLE_SUFFIXES:
+        return True
+    # Google Fonts CSS is saved without an extension
+    return path.suffix == '' and path.parent.name == 'fonts.googleapis.com'
+
+
+def compressors():
+    """(suffix, function) for every available encoding"""
+    encodings = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encodings.insert(0, ('.br', lambda data: brotli.compress(data, mode=brotli.MODE_TEXT, quality=11, lgwin=24)))
+    return encodings
+
+
+def sibling_path(path, suffix):
+    return path.with_name(path.name + suffix)
+
+
+def is_current(sibling, stat):
+    try:
+        return sibling.stat().st_mtime_ns == stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def load_manifest(root):
+    """Root-relative path -> {size, mtime_ns, suffixes} of encodings that were not smaller"""
+    try:
+        with open(Path(root) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def not_smaller_entry(stat, sizes):
+    """Manifest entry for a file whose listed encodings did not pay off, or None"""
+    suffixes = sorted(suffix for suffix, size in sizes.items() if size is None)
+    if not suffixes:
+        return None
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'suffixes': suffixes}
+
+
+def compress_file(path, force=False, not_smaller=None):
+    """Compress one file; returns (path, bytes, {suffix: bytes or None}, skipped, error)
+
+    not_smaller is the file's manifest entry; its encodings are skipped while
+    the source's size and mtime still match it.
+    """
+    path = Path(path)
+    sizes = {}
+    skipped = 0
+    try:
+        stat = path.stat()
+        recorded = (not_smaller['size'], not_smaller['mtime_ns']) if not_smaller else None
+        if force or recorded != (stat.st_size, stat.st_mtime_ns):
+            not_smaller = {'suffixes': []}
+        data = None
+        for suffix, compress in compressors():
+            sibling = sibling_path(path, suffix)
+            if not force and is_current(sibling, stat):
+                sizes[suffix] = sibling.stat().st_size
+                skipped += 1
+                continue
+            if suffix in not_smaller['suffixes']:
+                sizes[suffix] = None
+                skipped += 1
+                continue
+            if data is None:
+                data = path.read_bytes()
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                sibling.unlink(missing_ok=True)
+                sizes[suffix] = None
+                continue
+            with atomic_output(sibling) as f:
+                f.write(compressed)
+            os.utime(sibling, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            sizes[suffix] = len(compressed)
+        return str(path), stat.st_size, sizes, skipped, None
+    except Exception as e:
+        return str(path), 0, sizes, skipped, f"{type(e).__name__}: {e}"
+
+
+def walk(root):
+    """Compressible files and orphaned siblings under root"""
+    files, orphans = [], []
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDE_DIRS and not d.startswith('.'))
+        for name in sorted(names):
+            path = Path(directory) / name
+            if name.startswith('.'):
+                continue
+            source_suffix = next((s for s in ('.br', '.gz') if name.endswith(s)), None)
+            if source_suffix:
+                source = path.with_name(name[:-len(source_suffix)])
+                if is_compressible(source) and not source.exists():
+                    orphans.append(path)
+            elif is_compressible(path) and path.stat().st_size >= MIN_SIZE:
+                files.append(path)
+    return files, orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write precompressed .br/.gz siblings for the mirror")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="recompress files whose siblings are current")
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("⚠️  brotli is not installed (pip install brotli), writing .gz siblings only")
+
+    started = time.perf_counter()
+    root = Path(args.root)
+    files, orphans = walk(root)
+    for orphan in orphans:
+        orphan.unlink()
+    print(f"🗜️  Precompressing {len(files)} files...")
+
+    previous = load_manifest(root)
+    keys = [path.relative_to(root).as_posix() for path in files]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(compress_file, files, [args.force] * len(files),
+                                [previous.get(key) for key in keys], chunksize=8))
+
+    original = skipped = dropped = 0
+    totals = {suffix: 0 for suffix, _ in compressors()}
+    manifest = {}
+    for key, (path, size, sizes, file_skipped, error) in zip(keys, results):
+        if error:
+            print(f"❌ {path}: {error}")
+            continue
+        entry = not_smaller_entry(Path(path).stat(), sizes)
+        if entry:
+            manifest[key] = entry
+        original += size
+        skipped += file_skipped
+        for suffix in totals:
+            if sizes.get(suffix) is None:
+                dropped += 1
+                totals[suffix] += size
+            else:
+                totals[suffix] += sizes[suffix]
+
+    if manifest != previous:
+        data = {'version': 1, 'files': manifest}
+        atomic_write(root / MANIFEST_FILE, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
+
+    print(f"\n📊 Precompression summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Original: {original / 1024:.1f} KB in {len(files)} files")
+    for suffix, total in totals.items():
+        saved = 1 - total / original if original else 0
+        print(f"   {suffix}: {total / 1024:.1f} KB served ({saved:.1%} smaller)")
+    print(f"   Up to date: {skipped}, not smaller (dropped): {dropped}, orphans removed: {len(orphans)}")
+
+
+if __name__ == "__main__":
+    main()
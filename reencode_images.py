@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Re-encode the mirrored uploads at the lowest quality that still looks the same
+For every upload this searches the lowest WebP quality whose SSIM against the
+source stays above a threshold, then lowers it further if the result is over
+the byte budget for the image's display width
+
+A smaller result is written beside the upload under a new content-hashed name
+(<stem>_<digest>.webp) and every page, stylesheet and JSON file is pointed at
+it; the upload itself is never changed and is always the source of later
+runs. Other formats (--formats webp,avif) are only reported, since pages
+could not reference them without new markup
+
+    python reencode_images.py --dry-run           # report only
+    python reencode_images.py --ssim 0.985
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageMath
+
+from link_rewriter import atomic_output, atomic_write, site_files
+from responsive_variants import IMAGE_WIDTHS, REENCODE_MANIFEST, UPLOADS_DIR, VARIANT_PATTERN
+
+MANIFEST_FILE = REENCODE_MANIFEST
+
+# Largest file each variant width may weigh, in bytes; originals use the budget of their size
+BYTE_BUDGETS = {
+    128: 8 * 1024,
+    256: 24 * 1024,
+    640: 60 * 1024,
+    768: 80 * 1024,
+    1080: 140 * 1024,
+    1920: 300 * 1024,
+    2880: 500 * 1024,
+    3072: 560 * 1024,
+}
+
+# Originals wider than the largest variant are never displayed larger than it
+MAX_DIMENSION = max(IMAGE_WIDTHS)
+
+DEFAULT_SSIM = 0.98
+MIN_QUALITY = 30
+MAX_QUALITY = 90
+SSIM_BLOCK = 8
+
+FORMATS = {
+    'webp': ('WEBP', '.webp', {'method': 6}),
+    'avif': ('AVIF', '.avif', {'speed': 6}),
+}
+# The format uploads already are, the only one written
+WRITTEN_FORMAT = 'webp'
+
+UPLOAD_REFERENCE_PATTERN = re.compile(r'(uploads/)([^/?#"\'\s),\\&;]+)')
+
+
+def ssim(reference, candidate, block=SSIM_BLOCK, band='L'):
+    """Mean SSIM of the luma (or another band) over non-overlapping block x block windows"""
+    x = (reference.convert('L') if band == 'L' else reference.getchannel(band)).convert('F')
+    y = (candidate.convert('L') if band == 'L' else candidate.getchannel(band)).convert('F')
+
+    def product(a, b):
+        return ImageMath.lambda_eval(lambda e: e['a'] * e['b'], a=a, b=b)
+
+    mx, my, mxx, myy, mxy = [image.reduce(block) for image in (x, y, product(x, x), product(y, y), product(x, y))]
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    index = ImageMath.lambda_eval(
+        lambda e: ((e['mx'] * e['my'] * 2 + c1) * ((e['mxy'] - e['mx'] * e['my']) * 2 + c2))
+        / ((e['mx'] * e['mx'] + e['my'] * e['my'] + c1)
+           * (e['mxx'] - e['mx'] * e['mx'] + e['myy'] - e['my'] * e['my'] + c2)),
+        mx=mx, my=my, mxx=mxx, myy=myy, mxy=mxy,
+    )
+    # ImageStat bins float images into 256 buckets; a box resize averages exactly
+    return index.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+
+
+def byte_budget(path, size):
+    """Budget for the width the file is served at (its x<width>_ prefix, else its size)"""
+    match = VARIANT_PATTERN.match(Path(path).name)
+    width = int(match.group(1)) if match else max(size)
+    for budget_width in sorted(BYTE_BUDGETS):
+        if width <= budget_width:
+            return BYTE_BUDGETS[budget_width]
+    return BYTE_BUDGETS[max(BYTE_BUDGETS)]
+
+
+class QualitySearch:
+    """Encodes one image in one format, caching each quality tried"""
+
+    def __init__(self, image, format_name):
+        self.image = image
+        self.format, self.suffix, self.options = FORMATS[format_name]
+        self.results = {}
+
+    def encode(self, quality):
+        if quality not in self.results:
+            buffer = io.BytesIO()
+            self.image.save(buffer, self.format, quality=quality, **self.options)
+            data = buffer.getvalue()
+            with Image.open(io.BytesIO(data)) as decoded:
+                score = ssim(self.image, decoded)
+                if 'A' in self.image.getbands():
+                    # Logos are mostly transparency; its edges must survive too
+                    score = min(score, ssim(self.image, decoded.convert('RGBA'), band='A'))
+            self.results[quality] = (data, score)
+        return self.results[quality]
+
+    def lowest(self, accept, low=MIN_QUALITY, high=MAX_QUALITY):
+        """Lowest quality in [low, high] that accept() passes, assuming it is monotonic; None if none does"""
+        found = None
+        while low <= high:
+            middle = (low + high) // 2
+            if accept(*self.encode(middle)):
+                found, high = middle, middle - 1
+            else:
+                low = middle + 1
+        return found
+
+    def search(self, threshold, budget):
+        """(quality, data, ssim, within_budget) for the smallest acceptable encoding"""
+        quality = self.lowest(lambda data, score: score >= threshold)
+        if quality is None:
+            quality = MAX_QUALITY
+        data, score = self.encode(quality)
+        if len(data) > budget:
+            # Over budget: the highest quality that fits, or the floor if none does
+            over = self.lowest(lambda data, score: len(data) > budget, high=quality)
+            quality = max(over - 1, MIN_QUALITY)
+            data, score = self.encode(quality)
+        return quality, data, score, len(data) <= budget
+
+
+def output_name(path, data):
+    """<stem>_<digest>.webp: a new content-hashed name, so no deployed file changes under its name"""
+    return f"{path.stem}_{hashlib.sha256(data).hexdigest()[:10]}{path.suffix}"
+
+
+def source_signature(source):
+    stat = os.stat(source)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def reencode_file(path, formats, threshold, dry_run=False):
+    """Re-encode one upload; returns a report dict (safe to run in a worker process)"""
+    path = Path(path)
+    started = time.perf_counter()
+    report = {'path': str(path), 'before': path.stat().st_size, 'results': {}, 'error': None, 'output': None}
+    try:
+        with Image.open(path) as image:
+            image.load()
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        if max(image.size) > MAX_DIMENSION:
+            image.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.Resampling.LANCZOS)
+        budget = byte_budget(path, image.size)
+        report['budget'] = budget
+
+        for format_name in formats:
+            quality, data, score, within_budget = QualitySearch(image, format_name).search(threshold, budget)
+            report['results'][format_name] = {'quality': quality, 'ssim': round(score, 4), 'bytes': len(data),
+                                              'within_budget': within_budget}
+            if dry_run or format_name != WRITTEN_FORMAT or len(data) >= report['before']:
+                continue
+            target = path.with_name(output_name(path, data))
+            if not target.exists():
+                with atomic_output(target) as f:
+                    f.write(data)
+            report['output'] = target.name
+    except Exception as e:
+        report['error'] = f"{type(e).__name__}: {e}"
+    report['source'] = source_signature(path)
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+
+def rewrite_references(root, renames):
+    """Point every upload URL of the pages, stylesheets and JSON at its renamed file; returns the files changed"""
+    changed = []
+    for path in site_files(root):
+        content = path.read_text(encoding='utf-8')
+        updated = UPLOAD_REFERENCE_PATTERN.sub(
+            lambda match: match.group(1) + renames.get(match.group(2), match.group(2)), content)
+        if updated != content:
+            atomic_write(path, updated.encode('utf-8'))
+            changed.append(path)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-encode uploads at the lowest quality meeting an SSIM threshold")
+    parser.add_argument('files', nargs='*', help="uploads to re-encode (default: every upload)")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--ssim', type=float, default=DEFAULT_SSIM, help="minimum SSIM against the source")
+    parser.add_argument('--formats', default=WRITTEN_FORMAT,
+                        help="comma-separated formats to compare (only WebP is written)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="re-encode files already done with these settings")
+    parser.add_argument('--dry-run', action='store_true', help="report sizes without writing files")
+    args = parser.parse_args()
+
+    uploads_dir = Path(args.root) / UPLOADS_DIR
+    formats = [name for name in args.formats.split(',') if name in FORMATS]
+    settings = {'ssim': args.ssim, 'formats': formats}
+    manifest_path = uploads_dir / MANIFEST_FILE
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8')).get('files', {}) if manifest_path.exists() else {}
+
+    # Re-encoded copies are outputs, never sources
+    outputs = {entry.get('output') for entry in manifest.values()}
+    files = [Path(p) for p in args.files] or [p for p in sorted(uploads_dir.glob('*.webp')) if p.name not in outputs]
+    pending = []
+    for path in files:
+        entry = manifest.get(path.name)
+        if not args.force and entry and entry['settings'] == settings and entry['source'] == source_signature(path):
+            continue
+        pending.append(path)
+
+    print(f"🎚️  Re-encoding {len(pending)} of {len(files)} uploads (SSIM ≥ {args.ssim}, {', '.join(formats)})...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        reports = list(pool.map(reencode_file, pending, [formats] * len(pending),
+                                [args.ssim] * len(pending), [args.dry_run] * len(pending)))
+
+    before_total = 0
+    after_totals = {name: 0 for name in formats}
+    over_budget = 0
+    renames = {}
+    stale = set()
+    print(f"   {'file':<60} {'before KB':>10} " + ' '.join(f"{name + ' KB (q)':>15}" for name in formats))
+    for report in sorted(reports, key=lambda r: r['before'], reverse=True):
+        if report['error']:
+            print(f"❌ {report['path']}: {report['error']}")
+            continue
+        before_total += report['before']
+        columns = []
+        for name in formats:
+            result = report['results'][name]
+            after_totals[name] += min(result['bytes'], report['before'])
+            flag = '' if result['within_budget'] else '!'
+            columns.append(f"{result['bytes'] / 1024:>9.1f} ({result['quality']}){flag}".rjust(15))
+            over_budget += not result['within_budget']
+        print(f"   {Path(report['path']).name[:60]:<60} {report['before'] / 1024:>10.1f} {' '.join(columns)}")
+        if not args.dry_run:
+            name = Path(report['path']).name
+            previous = manifest.get(name, {}).get('output')
+            current = report['output'] or name
+            renames[name] = current
+            if previous and previous != current:
+                # Pages still pointing at an earlier re-encode move to the new one
+                renames[previous] = current
+                stale.add(uploads_dir / previous)
+            manifest[name] = {'settings': settings, 'source': report['source'], 'output': report['output'],
+                              'results': report['results']}
+
+    if reports and not args.dry_run:
+        for path in rewrite_references(args.root, {old: new for old, new in renames.items() if old != new}):
+            print(f"   ✏️  {path}")
+        for path in stale:
+            path.unlink(missing_ok=True)
+        atomic_write(manifest_path, json.dumps({'version': 2, 'files': manifest}, indent=2, sort_keys=True).encode('utf-8'))
+
+    print(f"\n📊 Re-encoding summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   Before: {before_total / 1024:.1f} KB")
+    for name, total in after_totals.items():
+        saved = 1 - total / before_total if before_total else 0
+        print(f"   {name}: {total / 1024:.1f} KB ({saved:.1%} smaller)")
+    print(f"   Over budget at minimum quality (!): {over_budget}")
+
+
+if __name__ == "__main__":
+    main()
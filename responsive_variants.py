@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Build missing responsive variants of the mirrored CloudFront uploads locally
+The admin's generate-site route expects an x<width>_<name> copy of every
+upload for each of IMAGE_WIDTHS; instead of fetching each one, this resizes the
+largest copy in the mirror (the original upload, else the widest variant)
+
+Variants fit inside a width x width box like the CDN's, are never upscaled and
+are recorded in a manifest, so they are rebuilt only when their source changes;
+variants downloaded from CloudFront are never overwritten
+
+    python responsive_variants.py              # build every missing variant
+    python responsive_variants.py --dry-run
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from link_rewriter import atomic_output, atomic_write
+
+UPLOADS_DIR = 'd2csodhem33bqt.cloudfront.net/uploads'
+MANIFEST_FILE = '.variants_manifest.json'
+# Written by reencode_images.py; its outputs are copies of an upload, not uploads
+REENCODE_MANIFEST = '.reencode_manifest.json'
+
+# Same list as IMAGE_WIDTHS in admin/app/api/generate-site/route.ts
+IMAGE_WIDTHS = (128, 256, 640, 768, 1080, 1920, 2880, 3072)
+
+VARIANT_PATTERN = re.compile(r'^x(\d+)_(.+)$')
+
+WEBP_QUALITY = 80
+WEBP_METHOD = 6
+
+
+class VariantManifest:
+    """Generated variant -> the source file and source size/mtime it was built from"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('variants', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def signature(source):
+        stat = os.stat(source)
+        return {'source': Path(source).name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def is_generated(self, output):
+        return Path(output).name in self.entries
+
+    def is_current(self, output, source):
+        entry = self.entries.get(Path(output).name)
+        return entry == self.signature(source) and Path(output).exists()
+
+    def record(self, output, source):
+        self.entries[Path(output).name] = self.signature(source)
+
+    def save(self):
+        data = json.dumps({'version': 1, 'variants': self.entries}, indent=2, sort_keys=True)
+        atomic_write(self.path, data.encode('utf-8'))
+
+
+def reencoded_outputs(uploads_dir):
+    """Re-encoded copy -> the upload it was made from, per reencode_images.py's manifest"""
+    try:
+        with open(Path(uploads_dir) / REENCODE_MANIFEST, 'r', encoding='utf-8') as f:
+            files = json.load(f).get('files', {})
+    except (OSError, ValueError):
+        return {}
+    return {entry['output']: name for name, entry in files.items() if entry.get('output')}
+
+
+def group_uploads(uploads_dir):
+    """Upload name -> {width or None for the original: path}; re-encoded copies are left out"""
+    groups = {}
+    outputs = reencoded_outputs(uploads_dir)
+    for path in sorted(Path(uploads_dir).glob('*.webp')):
+        if path.name in outputs:
+            continue
+        match = VARIANT_PATTERN.match(path.name)
+        width, name = (int(match.group(1)), match.group(2)) if match else (None, path.name)
+        groups.setdefault(name, {})[width] = path
+    return groups
+
+
+def best_source(copies):
+    """The original upload if mirrored, else the copy with the most pixels, with its size"""
+    sized = []
+    for width, path in copies.items():
+        try:
+            with Image.open(path) as image:
+                sized.append((width is None, image.width * image.height, path, image.size))
+        except OSError:
+            continue
+    if not sized:
+        return None, None
+    _, _, path, size = max(sized)
+    return path, size
+
+
+def plan_variants(uploads_dir, manifest, widths=IMAGE_WIDTHS, force=False):
+    """(source, output, width) for every variant that is missing or stale"""
+    jobs = []
+    for name, copies in group_uploads(uploads_dir).items():
+        source, size = best_source(copies)
+        if source is None:
+            continue
+        for width in widths:
+            if width > max(size):
+                continue
+            output = Path(uploads_dir) / f"x{width}_{name}"
+            if output == source:
+                continue
+            if output.exists():
+                # Only variants this script built are ever replaced
+                if not manifest.is_generated(output):
+                    continue
+                if not force and manifest.is_current(output, source):
+                    continue
+            jobs.append((source, output, width))
+    return jobs
+
+
+def build_variant(source, output, width):
+    """Resize source to fit width x width and save it as WebP; returns (output, bytes, seconds, error)"""
+    started = time.perf_counter()
+    try:
+        with Image.open(source) as image:
+            lossless = bool(image.info.get('lossless'))
+            image.load()
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            image.thumbnail((width, width), Image.Resampling.LANCZOS)
+            with atomic_output(output) as f:
+                image.save(f, 'WEBP', quality=WEBP_QUALITY, method=WEBP_METHOD, lossless=lossless)
+        return str(output), os.path.getsize(output), time.perf_counter() - started, None
+    except Exception as e:
+        return str(output), 0, time.perf_counter() - started, f"{type(e).__name__}: {e}"
+
+
+def build_missing_variant(path, site_root='.'):
+    """Build one x<width>_ upload variant from the mirror if possible; True when the file now exists"""
+    path = Path(path)
+    match = VARIANT_PATTERN.match(path.name)
+    if path.exists() or not match or int(match.group(1)) not in IMAGE_WIDTHS:
+        return path.exists()
+    uploads_dir = Path(site_root) / UPLOADS_DIR
+    manifest = VariantManifest(uploads_dir / MANIFEST_FILE)
+    width = int(match.group(1))
+    jobs = [job for job in plan_variants(uploads_dir, manifest, widths=(width,)) if job[1].name == path.name]
+    if not jobs:
+        return False
+    source, output, width = jobs[0]
+    _, _, _, error = build_variant(source, output, width)
+    if error:
+        return False
+    manifest.record(output, source)
+    manifest.save()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build missing responsive variants of the mirrored uploads")
+    parser.add_argument('--root', default='.', help="mirror directory")
+    parser.add_argument('--widths', default=','.join(map(str, IMAGE_WIDTHS)), help="comma-separated widths")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="rebuild generated variants even if current")
+    parser.add_argument('--dry-run', action='store_true', help="list the variants that would be built")
+    args = parser.parse_args()
+
+    uploads_dir = Path(args.root) / UPLOADS_DIR
+    widths = tuple(int(w) for w in args.widths.split(','))
+    manifest = VariantManifest(uploads_dir / MANIFEST_FILE)
+    started = time.perf_counter()
+    jobs = plan_variants(uploads_dir, manifest, widths, force=args.force)
+
+    print(f"🖼️  {len(jobs)} variants to build in {uploads_dir}")
+    if args.dry_run:
+        for source, output, width in jobs:
+            print(f"   {output.name} ← {source.name}")
+        return
+
+    sources = {str(output): source for source, output, _ in jobs}
+    built = failed = total_bytes = 0
+    per_width = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for output, size, seconds, error in pool.map(build_variant, *zip(*jobs)) if jobs else []:
+            if error:
+                print(f"❌ {output}: {error}")
+                failed += 1
+                continue
+            manifest.record(output, sources[output])
+            built += 1
+            total_bytes += size
+            width = int(VARIANT_PATTERN.match(Path(output).name).group(1))
+            per_width[width] = per_width.get(width, 0) + 1
+    if built:
+        manifest.save()
+
+    print(f"\n📊 Variant summary ({time.perf_counter() - started:.2f}s):")
+    print(f"   ✅ Built: {built} ({total_bytes / 1024:.1f} KB)")
+    print(f"   ❌ Failed: {failed}")
+    for width in sorted(per_width):
+        print(f"   x{width}: {per_width[width]}")
+
+
+if __name__ == "__main__":
+    main()
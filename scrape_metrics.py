@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Per-request metrics and throughput instrumentation for the scrapers
+Records DNS/connect/TLS/TTFB/transfer time, bytes and status for every
+request, aggregates histograms per host and asset type, and exports a JSON
+report and a Prometheus textfile
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf implied)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+
+ASSET_TYPES = {
+    '.css': 'css',
+    '.js': 'js',
+    '.json': 'json',
+    '.html': 'html',
+    '.woff': 'font', '.woff2': 'font', '.ttf': 'font', '.otf': 'font', '.eot': 'font',
+    '.webp': 'image', '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.gif': 'image',
+    '.svg': 'image', '.ico': 'image', '.avif': 'image',
+    '.mp4': 'video', '.webm': 'video', '.mov': 'video',
+}
+
+PROGRESS_INTERVAL = 0.5
+
+
+def asset_type(url):
+    """Classify a URL into css/js/font/image/video/json/html/other"""
+    parsed = urlparse(url)
+    suffix = Path(parsed.path).suffix.lower()
+    if suffix in ASSET_TYPES:
+        return ASSET_TYPES[suffix]
+    if parsed.netloc == 'fonts.googleapis.com':
+        return 'css'
+    if not suffix:
+        return 'html'
+    return 'other'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def cumulative(self):
+        """(upper bound label, cumulative count) pairs including +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class GroupStats:
+    """Aggregates for one (host, asset type) pair"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.statuses = {}
+        self.phase_sums = dict.fromkeys(PHASES, 0.0)
+        self.duration = Histogram()
+        self.ttfb = Histogram()
+        self.durations = []
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            'phase_seconds': {phase: round(value, 6) for phase, value in self.phase_sums.items()},
+            'duration_p50': round(percentile(self.durations, 0.50), 6),
+            'duration_p90': round(percentile(self.durations, 0.90), 6),
+            'duration_p99': round(percentile(self.durations, 0.99), 6),
+            'duration_histogram': [[str(bound), count] for bound, count in self.duration.cumulative()],
+            'ttfb_histogram': [[str(bound), count] for bound, count in self.ttfb.cumulative()],
+        }
+
+
+class ScrapeMetrics:
+    """Thread-safe collector shared by every session in the process"""
+
+    def __init__(self, live=False, keep_requests=True):
+        self.live = live
+        self.keep_requests = keep_requests
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.clock_start = time.perf_counter()
+        self.groups = {}
+        self.requests = []
+        self.total_requests = 0
+        self.total_bytes = 0
+        self.total_errors = 0
+        self._last_progress = 0.0
+
+    def record(self, url, status=None, nbytes=0, error=None, **phases):
+        """Record one finished request; phases are seconds keyed by PHASES"""
+        host = urlparse(url).netloc
+        kind = asset_type(url)
+        timings = {phase: max(phases.get(phase) or 0.0, 0.0) for phase in PHASES}
+        total = sum(timings.values())
+        failed = error is not None or status is None or status >= 400
+
+        with self.lock:
+            group = self.groups.get((host, kind))
+            if group is None:
+                group = self.groups[(host, kind)] = GroupStats()
+            group.requests += 1
+            group.bytes += nbytes
+            group.errors += failed
+            group.statuses[status or error] = group.statuses.get(status or error, 0) + 1
+            for phase, value in timings.items():
+                group.phase_sums[phase] += value
+            group.duration.observe(total)
+            group.ttfb.observe(timings['ttfb'])
+            group.durations.append(total)
+
+            self.total_requests += 1
+            self.total_bytes += nbytes
+            self.total_errors += failed
+            if self.keep_requests:
+                self.requests.append({
+                    'url': url, 'host': host, 'asset_type': kind, 'status': status, 'error': error,
+                    'bytes': nbytes, 'total': round(total, 6),
+                    **{phase: round(value, 6) for phase, value in timings.items()},
+                })
+        if self.live:
+            self.print_progress()
+
+    def elapsed(self):
+        return time.perf_counter() - self.clock_start
+
+    def throughput(self):
+        """Bytes per second since the collector was created"""
+        elapsed = self.elapsed()
+        return self.total_bytes / elapsed if elapsed > 0 else 0.0
+
+    def print_progress(self, force=False):
+        """Overwrite a single status line on stderr, at most every PROGRESS_INTERVAL"""
+        now = time.perf_counter()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        sys.stderr.write(f"\r📈 {self.total_requests} requests | {self.total_bytes / 1048576:.1f} MB | "
+                         f"{self.throughput() / 1048576:.2f} MB/s | {self.total_errors} failed ")
+        sys.stderr.flush()
+
+    def report(self):
+        """Aggregated metrics as a JSON-serialisable dict"""
+        with self.lock:
+            return {
+                'started': self.started,
+                'elapsed_seconds': round(self.elapsed(), 3),
+                'requests': self.total_requests,
+                'errors': self.total_errors,
+                'bytes': self.total_bytes,
+                'throughput_bytes_per_second': round(self.throughput(), 1),
+                'groups': [
+                    {'host': host, 'asset_type': kind, **group.to_dict()}
+                    for (host, kind), group in sorted(self.groups.items())
+                ],
+                'requests_log': list(self.requests) if self.keep_requests else [],
+            }
+
+    def write_json(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP lo2s_request_duration_seconds Total time per scraper request.',
+            '# TYPE lo2s_request_duration_seconds histogram',
+        ]
+        with self.lock:
+            groups = sorted(self.groups.items())
+            for (host, kind), group in groups:
+                labels = f'host="{host}",asset_type="{kind}"'
+                for bound, count in group.duration.cumulative():
+                    lines.append(f'lo2s_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'lo2s_request_duration_seconds_sum{{{labels}}} {group.duration.sum:.6f}')
+                lines.append(f'lo2s_request_duration_seconds_count{{{labels}}} {group.duration.count}')
+
+            lines += ['# HELP lo2s_request_phase_seconds_total Time spent per request phase.',
+                      '# TYPE lo2s_request_phase_seconds_total counter']
+            for (host, kind), group in groups:
+                for phase, value in group.phase_sums.items():
+                    lines.append(f'lo2s_request_phase_seconds_total{{host="{host}",asset_type="{kind}",'
+                                 f'phase="{phase}"}} {value:.6f}')
+
+            lines += ['# HELP lo2s_response_bytes_total Response body bytes received.',
+                      '# TYPE lo2s_response_bytes_total counter']
+            for (host, kind), group in groups:
+                lines.append(f'lo2s_response_bytes_total{{host="{host}",asset_type="{kind}"}} {group.bytes}')
+
+            lines += ['# HELP lo2s_requests_total Requests by response status.',
+                      '# TYPE lo2s_requests_total counter']
+            for (host, kind), group in groups:
+                for status, count in sorted(group.statuses.items(), key=str):
+                    lines.append(f'lo2s_requests_total{{host="{host}",asset_type="{kind}",'
+                                 f'status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write a node_exporter textfile atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        tmp_path.replace(path)
+
+    def print_summary(self):
+        if self.live:
+            self.print_progress(force=True)
+            sys.stderr.write('\n')
+        print(f"📈 {self.total_requests} requests, {self.total_bytes / 1048576:.1f} MB in "
+              f"{self.elapsed():.1f}s ({self.throughput() / 1048576:.2f} MB/s), {self.total_errors} failed")
+
+
+# --- Connection phase timing -------------------------------------------------
+
+_connect_timings = threading.local()
+
+
+def reset_connect_timings():
+    _connect_timings.value = dict.fromkeys(('dns', 'connect', 'tls'), 0.0)
+
+
+def pop_connect_timings():
+    timings = getattr(_connect_timings, 'value', None) or dict.fromkeys(('dns', 'connect', 'tls'), 0.0)
+    reset_connect_timings()
+    return timings
+
+
+class TimedConnectionMixin:
+    """Splits connection setup of a urllib3 connection into DNS, TCP and TLS time"""
+
+    def _new_conn(self):
+        timings = getattr(_connect_timings, 'value', None)
+        if timings is None:
+            reset_connect_timings()
+            timings = _connect_timings.value
+
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = [info[4][0] for info in
+                         socket.getaddrinfo(host.strip('[]'), self.port, allowed_gai_family(), socket.SOCK_STREAM)]
+        except OSError:
+            # Let urllib3 raise its own NameResolutionError for the failure
+            addresses = []
+        resolved = time.perf_counter()
+        timings['dns'] += resolved - start
+
+        try:
+            if not addresses:
+                return super()._new_conn()
+            # Try every record in resolver order, as create_connection would (IPv6 -> IPv4, several A records)
+            for position, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if position == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+            timings['connect'] += time.perf_counter() - resolved
+
+
+class TimedTLSMixin(TimedConnectionMixin):
+    """Also attributes the TLS handshake of an HTTPS connection"""
+
+    def connect(self):
+        timings = getattr(_connect_timings, 'value', None)
+        before = sum(timings.values()) if timings else 0.0
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            timings = _connect_timings.value
+            socket_setup = sum(timings.values()) - before
+            timings['tls'] += max(time.perf_counter() - start - socket_setup, 0.0)
+
+
+try:
+    from requests.adapters import BaseAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+    from urllib3.util.connection import allowed_gai_family
+
+    class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+        pass
+
+    class TimedHTTPSConnection(TimedTLSMixin, HTTPSConnection):
+        pass
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TimedHTTPConnection
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+except ImportError:  # Playwright-only use does not need requests
+    BaseAdapter = object
+
+
+def instrument_connections(adapter):
+    """Make a requests HTTPAdapter open connections that report phase timings"""
+    adapter.poolmanager.pool_classes_by_scheme = {
+        'http': TimedHTTPConnectionPool,
+        'https': TimedHTTPSConnectionPool,
+    }
+    return adapter
+
+
+class _BodyMeter:
+    """Shared state between a metered body and its finalizer"""
+
+    def __init__(self, on_done):
+        self.on_done = on_done
+        self.nbytes = 0
+        self.last_read = None
+        self.done = False
+
+    def add(self, nbytes):
+        self.nbytes += nbytes
+        self.last_read = time.perf_counter()
+
+    def finish(self):
+        if not self.done:
+            self.done = True
+            self.on_done(self.nbytes, self.last_read)
+
+
+class MeteredBody:
+    """Wraps response.raw to time the body transfer and count its bytes"""
+
+    def __init__(self, raw, on_done):
+        self._raw = raw
+        self._meter = _BodyMeter(on_done)
+        # Responses the caller never reads (e.g. raise_for_status) still get recorded
+        weakref.finalize(self, self._meter.finish)
+
+    @property
+    def stream(self):
+        raw_stream = self._raw.stream  # AttributeError keeps hasattr() honest
+
+        def stream(amt=2 ** 16, decode_content=None):
+            for chunk in raw_stream(amt, decode_content=decode_content):
+                self._meter.add(len(chunk))
+                yield chunk
+            self._meter.finish()
+
+        return stream
+
+    def read(self, *args, **kwargs):
+        data = self._raw.read(*args, **kwargs)
+        self._meter.add(len(data))
+        if not data:
+            self._meter.finish()
+        return data
+
+    def close(self):
+        self._meter.finish()
+        self._raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class MetricsAdapter(BaseAdapter):
+    """requests adapter that records metrics for every request it forwards"""
+
+    def __init__(self, metrics, transport):
+        super().__init__()
+        self.metrics = metrics
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        reset_connect_timings()
+        start = time.perf_counter()
+        try:
+            response = self.transport.send(request, **kwargs)
+        except Exception as e:
+            connect = pop_connect_timings()
+            self.metrics.record(request.url, error=type(e).__name__, **connect,
+                                ttfb=time.perf_counter() - start - sum(connect.values()))
+            raise
+
+        headers_received = time.perf_counter()
+        connect = pop_connect_timings()
+        ttfb = headers_received - start - sum(connect.values())
+
+        # done() must not reference the response: the body's finalizer holds it, and a
+        # reference back would keep every unread response (and its connection) alive
+        metrics, url, status = self.metrics, request.url, response.status_code
+
+        def done(nbytes, last_read=None):
+            transfer = (last_read or headers_received) - headers_received
+            metrics.record(url, status=status, nbytes=nbytes, ttfb=ttfb, transfer=transfer, **connect)
+
+        if getattr(response, '_content_consumed', False):
+            done(len(response.content or b''))
+        else:
+            response.raw = MeteredBody(response.raw, done)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+def observe_browser_context(context, metrics):
+    """Record metrics for every finished request of a Playwright context"""
+
+    async def on_finished(request):
+        timing = request.timing
+        try:
+            sizes = await request.sizes()
+            response = await request.response()
+        except Exception:
+            return
+
+        def span(begin, end):
+            if timing.get(begin, -1) < 0 or timing.get(end, -1) < 0:
+                return 0.0
+            return (timing[end] - timing[begin]) / 1000
+
+        tls_start = timing.get('secureConnectionStart', -1)
+        metrics.record(
+            request.url,
+            status=response.status if response else None,
+            nbytes=sizes.get('responseBodySize', 0),
+            dns=span('domainLookupStart', 'domainLookupEnd'),
+            connect=span('connectStart', 'secureConnectionStart' if tls_start >= 0 else 'connectEnd'),
+            tls=span('secureConnectionStart', 'connectEnd') if tls_start >= 0 else 0.0,
+            ttfb=span('requestStart', 'responseStart'),
+            transfer=span('responseStart', 'responseEnd'),
+        )
+
+    async def on_failed(request):
+        metrics.record(request.url, error=request.failure or 'failed')
+
+    context.on('requestfinished', on_finished)
+    context.on('requestfailed', on_failed)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python scrape_metrics.py <metrics.json>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    print(f"📈 {saved['requests']} requests, {saved['bytes'] / 1048576:.1f} MB, "
+          f"{saved['errors']} failed in {saved['elapsed_seconds']}s")
+    for group in saved['groups']:
+        print(f"   {group['host']:<32} {group['asset_type']:<6} {group['requests']:>5} req "
+              f"{group['bytes'] / 1024:>10.1f} KB  p50 {group['duration_p50'] * 1000:.0f} ms  "
+              f"p90 {group['duration_p90'] * 1000:.0f} ms  errors {group['errors']}")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Shared transport configuration for all scrapers
+Reads LO2S_* environment variables and attaches record/replay, mock-origin
+redirection and metrics to the requests sessions and Playwright browser
+contexts the scrapers create
+
+    LO2S_HAR_RECORD=run.har      record all traffic to run.har
+    LO2S_HAR_REPLAY=run.har      serve all traffic from run.har (no network)
+    LO2S_REPLAY_LATENCY=0.05     seconds added to every replayed response
+    LO2S_REPLAY_BANDWIDTH=1e6    replay throughput cap in bytes/second
+    LO2S_ORIGIN=http://127.0.0.1:8765
+                                 send lo2s.com/CloudFront/Google Fonts traffic
+                                 to a local mock_origin.py instead
+    LO2S_METRICS_JSON=m.json     write the per-request metrics report on exit
+    LO2S_METRICS_PROM=m.prom     write a Prometheus textfile on exit
+    LO2S_PROGRESS=0              disable the live throughput line
+    LO2S_VERBOSE=1               log every download instead of staying quiet
+"""
+
+import atexit
+import logging
+import os
+import sys
+
+from requests.adapters import HTTPAdapter
+
+from har_transport import HarArchive, HarRecordingAdapter, HarReplayAdapter, route_recorder, route_replay
+from mock_origin import OriginRedirectAdapter, redirect_url, route_origin
+from scrape_metrics import MetricsAdapter, ScrapeMetrics, instrument_connections, observe_browser_context
+
+_har_state = None
+_metrics = None
+
+
+def _float_env(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def har_settings():
+    """Return (mode, archive, latency, bandwidth) shared by the whole process"""
+    global _har_state
+    if _har_state is not None:
+        return _har_state
+
+    record_path = os.environ.get('LO2S_HAR_RECORD')
+    replay_path = os.environ.get('LO2S_HAR_REPLAY')
+    latency = _float_env('LO2S_REPLAY_LATENCY') or 0.0
+    bandwidth = _float_env('LO2S_REPLAY_BANDWIDTH')
+
+    if replay_path:
+        print(f"📼 Replaying traffic from {replay_path}")
+        _har_state = ('replay', HarArchive.load(replay_path), latency, bandwidth)
+    elif record_path:
+        print(f"🔴 Recording traffic to {record_path}")
+        archive = HarArchive(record_path)
+        atexit.register(archive.save)
+        _har_state = ('record', archive, latency, bandwidth)
+    else:
+        _har_state = (None, None, latency, bandwidth)
+    return _har_state
+
+
+def origin_override():
+    """Base URL of a mock origin standing in for the real hosts, or None"""
+    return os.environ.get('LO2S_ORIGIN') or None
+
+
+def configure_logging():
+    """Per-file progress is logged at INFO, so it is hidden unless LO2S_VERBOSE is set"""
+    level = logging.INFO if os.environ.get('LO2S_VERBOSE') else logging.WARNING
+    logging.basicConfig(level=level, format='%(message)s')
+
+
+def _export_metrics():
+    _metrics.print_summary()
+    json_path = os.environ.get('LO2S_METRICS_JSON')
+    prom_path = os.environ.get('LO2S_METRICS_PROM')
+    if json_path:
+        _metrics.write_json(json_path)
+        print(f"📊 Metrics report written to {json_path}")
+    if prom_path:
+        _metrics.write_prometheus(prom_path)
+        print(f"📊 Prometheus textfile written to {prom_path}")
+
+
+def get_metrics():
+    """The process-wide metrics collector, exported at exit"""
+    global _metrics
+    if _metrics is None:
+        live = os.environ.get('LO2S_PROGRESS', '1') != '0' and sys.stderr.isatty()
+        _metrics = ScrapeMetrics(live=live, keep_requests=bool(os.environ.get('LO2S_METRICS_JSON')))
+        atexit.register(_export_metrics)
+    return _metrics
+
+
+def configure_session(session):
+    """Apply the environment's transport settings to a requests session"""
+    configure_logging()
+    mode, archive, latency, bandwidth = har_settings()
+    if mode == 'replay':
+        adapter = HarReplayAdapter(archive, latency=latency, bandwidth=bandwidth)
+    else:
+        origin = origin_override()
+        adapter = instrument_connections(OriginRedirectAdapter(origin) if origin else HTTPAdapter())
+        if mode == 'record':
+            adapter = HarRecordingAdapter(archive, transport=adapter)
+
+    adapter = MetricsAdapter(get_metrics(), adapter)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+async def configure_browser_context(context):
+    """Apply the environment's transport settings to a Playwright context"""
+    mode, archive, latency, bandwidth = har_settings()
+    origin = origin_override()
+    if mode == 'replay':
+        await route_replay(context, archive, latency=latency, bandwidth=bandwidth)
+    elif mode == 'record':
+        rewrite = (lambda url: redirect_url(url, origin)) if origin else None
+        await route_recorder(context, archive, rewrite_url=rewrite)
+    elif origin:
+        await route_origin(context, origin)
+    observe_browser_context(context, get_metrics())
+    return context
@@ -3,6 +3,7 @@
 Simple, focused scraper to get the specific missing assets
 """
 
+import logging
 import os
 import requests
 from urllib.parse import urljoin, urlparse
@@ -10,6 +11,11 @@ from pathlib import Path
 import time
 import re
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 class SimpleMissingAssetsScraper:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -18,13 +24,14 @@ class SimpleMissingAssetsScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        configure_session(self.session)
         self.downloaded = 0
         self.failed = 0
         
     def download_file(self, url, local_path):
         """Download a single file"""
         try:
-            print(f"Downloading: {url}")
+            log.info(f"Downloading: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
@@ -33,13 +40,13 @@ class SimpleMissingAssetsScraper:
             with open(local_path, 'wb') as f:
                 f.write(response.content)
             
-            print(f"✓ Saved: {local_path}")
+            log.info(f"✓ Saved: {local_path}")
             self.downloaded += 1
             time.sleep(0.5)
             return True
             
         except Exception as e:
-            print(f"✗ Failed {url}: {e}")
+            log.warning(f"✗ Failed {url}: {e}")
             self.failed += 1
             return False
     
@@ -109,7 +116,8 @@ class SimpleMissingAssetsScraper:
         ]
         
         print("🔍 Looking for missing CSS files...")
-        found_missing = self.find_missing_css_files()
+        with phase('discovery'):
+            found_missing = self.find_missing_css_files()
         
         # Add any found missing CSS files
         missing_assets.extend(found_missing)
@@ -119,14 +127,15 @@ class SimpleMissingAssetsScraper:
         
         print(f"📦 Found {len(missing_assets)} missing assets to download")
         
-        for asset_url in missing_assets:
-            full_url = self.fix_url(asset_url)
-            local_path = self.get_local_path(asset_url)
-            
-            if not local_path.exists():
-                self.download_file(full_url, local_path)
-            else:
-                print(f"⏭️  Already exists: {local_path}")
+        with phase('download'):
+            for asset_url in missing_assets:
+                full_url = self.fix_url(asset_url)
+                local_path = self.get_local_path(asset_url)
+                
+                if not local_path.exists():
+                    self.download_file(full_url, local_path)
+                else:
+                    log.info(f"⏭️  Already exists: {local_path}")
         
         print(f"\n📊 Summary:")
         print(f"   ✅ Downloaded: {self.downloaded}")
@@ -135,5 +144,6 @@ class SimpleMissingAssetsScraper:
         return self.downloaded, self.failed
 
 if __name__ == "__main__":
+    enable_profiling()
     scraper = SimpleMissingAssetsScraper("https://lo2s.com", ".")
     scraper.download_specific_missing_assets()
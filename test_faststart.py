@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Synthetic MP4 layouts for faststart.py
+
+    python -m pytest test_faststart.py
+"""
+
+import struct
+
+from faststart import faststart_file, plan, read_boxes
+
+
+def box(kind, payload, large=False):
+    if large:
+        return struct.pack('>I4sQ', 1, kind, len(payload) + 16) + payload
+    return struct.pack('>I4s', len(payload) + 8, kind) + payload
+
+
+def moov(offsets, large=False):
+    stco = box(b'stco', struct.pack(f'>4sI{len(offsets)}I', b'\0' * 4, len(offsets), *offsets))
+    return box(b'moov', box(b'trak', box(b'mdia', box(b'minf', box(b'stbl', stco)))), large=large)
+
+
+def chunk_offsets(data):
+    """stco/co64 entries of the file's moov"""
+    _, moov_box, _ = plan(data)
+    boxes = [moov_box]
+    while boxes:
+        current = boxes.pop()
+        if current.kind in (b'stco', b'co64'):
+            body = current.offset + current.header_size
+            count = struct.unpack('>I', data[body + 4:body + 8])[0]
+            width = 'I' if current.kind == b'stco' else 'Q'
+            return list(struct.unpack(f'>{count}{width}', data[body + 8:body + 8 + count * struct.calcsize(width)]))
+        boxes += read_boxes(data, current.offset + current.header_size, current.end)
+    return []
+
+
+def write_video(path, large_moov):
+    """ftyp, mdat, moov, mdat with one chunk per mdat, each chunk tagged by its own bytes"""
+    ftyp = box(b'ftyp', b'isom\0\0\2\0isom')
+    first = box(b'mdat', b'CHUNK-ONE')
+    second = box(b'mdat', b'CHUNK-TWO')
+    # moov's size does not depend on the offset values, so lay it out once to place them
+    moov_size = len(moov([0, 0], large=large_moov))
+    offsets = [len(ftyp) + 8, len(ftyp) + len(first) + moov_size + 8]
+    path.write_bytes(ftyp + first + moov(offsets, large=large_moov) + second)
+
+
+def check_chunks(path):
+    data = path.read_bytes()
+    _, moov_box, first_mdat = plan(data)
+    assert moov_box.offset < first_mdat.offset
+    assert [data[offset:offset + 9] for offset in chunk_offsets(data)] == [b'CHUNK-ONE', b'CHUNK-TWO']
+
+
+def test_mdat_after_moov_keeps_its_offsets(tmp_path):
+    path = tmp_path / 'video.mp4'
+    write_video(path, large_moov=False)
+    assert faststart_file(path) == 'moved'
+    check_chunks(path)
+
+
+def test_moov_size_change_shifts_later_mdat(tmp_path):
+    """A 64-bit moov header is rewritten as 32-bit, so the mdat after it moves up by 8 bytes"""
+    path = tmp_path / 'video.mp4'
+    write_video(path, large_moov=True)
+    assert faststart_file(path) == 'moved'
+    check_chunks(path)
+    assert faststart_file(path) == 'faststart'
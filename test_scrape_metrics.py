@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Regression tests for scrape_metrics.py against the local mock origin
+
+    python -m pytest test_scrape_metrics.py
+"""
+
+import gc
+import socket
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from benchmark import mock_origin_server
+from scrape_metrics import MetricsAdapter, ScrapeMetrics, instrument_connections, pop_connect_timings
+
+
+def test_unread_stream_is_released():
+    """A dropped, unread stream=True response is collected and its metrics recorded then"""
+    metrics = ScrapeMetrics(keep_requests=True)
+    with mock_origin_server('.') as origin, requests.Session() as session:
+        session.mount('http://', MetricsAdapter(metrics, HTTPAdapter()))
+        response = session.get(f"{origin}/about.html", stream=True)
+        dropped = weakref.ref(response)
+        del response
+        gc.collect()
+        assert dropped() is None
+        assert metrics.total_requests == 1
+
+
+def test_connect_falls_back_to_later_addresses(monkeypatch):
+    """A refused first DNS record moves on to the next instead of failing the request"""
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host != 'mirror.test':
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        # Nothing listens on 127.0.0.2; the mock origin is on 127.0.0.1
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port))
+                for address in ('127.0.0.2', '127.0.0.1')]
+
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    with mock_origin_server('.') as origin, requests.Session() as session:
+        session.mount('http://', instrument_connections(HTTPAdapter()))
+        port = origin.rsplit(':', 1)[1]
+        pop_connect_timings()
+        response = session.get(f"http://mirror.test:{port}/about.html")
+        assert response.status_code == 200
+        assert pop_connect_timings()['dns'] > 0
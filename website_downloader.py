@@ -4,6 +4,7 @@ Complete website downloader for lo2s.com
 Downloads all assets including CSS, JS, fonts, images, videos, and other resources
 """
 
+import logging
 import os
 import re
 import requests
@@ -13,6 +14,11 @@ from pathlib import Path
 import time
 from bs4 import BeautifulSoup
 
+from phase_profiler import enable_profiling, phase
+from scraper_session import configure_session
+
+log = logging.getLogger(__name__)
+
 class WebsiteDownloader:
     def __init__(self, base_url, output_dir):
         self.base_url = base_url
@@ -21,6 +27,7 @@ class WebsiteDownloader:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        configure_session(self.session)
         self.downloaded_urls = set()
         
     def download_file(self, url, local_path):
@@ -29,7 +36,7 @@ class WebsiteDownloader:
             return
             
         try:
-            print(f"Downloading: {url}")
+            log.info(f"Downloading: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
@@ -40,11 +47,11 @@ class WebsiteDownloader:
                 f.write(response.content)
                 
             self.downloaded_urls.add(url)
-            print(f"Saved: {local_path}")
+            log.info(f"Saved: {local_path}")
             time.sleep(0.5)  # Be nice to the server
             
         except Exception as e:
-            print(f"Error downloading {url}: {e}")
+            log.warning(f"Error downloading {url}: {e}")
     
     def extract_urls_from_html(self, html_content):
         """Extract all asset URLs from HTML content"""
@@ -149,37 +156,41 @@ class WebsiteDownloader:
             html_content = f.read()
         
         # Extract all URLs
-        urls = self.extract_urls_from_html(html_content)
+        with phase('extraction'):
+            urls = self.extract_urls_from_html(html_content)
         
         print(f"Found {len(urls)} assets to download")
         
         # Download each asset
-        for asset_type, url in urls:
-            if url.startswith('data:'):
-                continue
+        with phase('download'):
+            for asset_type, url in urls:
+                if url.startswith('data:'):
+                    continue
+                    
+                # Convert relative URLs to absolute
+                if url.startswith('/'):
+                    full_url = urljoin(self.base_url, url)
+                elif url.startswith('http'):
+                    full_url = url
+                else:
+                    full_url = urljoin(self.base_url, url)
                 
-            # Convert relative URLs to absolute
-            if url.startswith('/'):
-                full_url = urljoin(self.base_url, url)
-            elif url.startswith('http'):
-                full_url = url
-            else:
-                full_url = urljoin(self.base_url, url)
-            
-            local_path = self.get_local_path(url, asset_type)
-            self.download_file(full_url, local_path)
-            
-            # If it's a CSS file, download its assets too
-            if asset_type == 'css' and local_path.exists():
-                try:
-                    with open(local_path, 'r', encoding='utf-8') as f:
-                        css_content = f.read()
-                    self.download_css_assets(full_url, css_content)
-                except:
-                    pass
+                local_path = self.get_local_path(url, asset_type)
+                self.download_file(full_url, local_path)
+                
+                # If it's a CSS file, download its assets too
+                if asset_type == 'css' and local_path.exists():
+                    try:
+                        with open(local_path, 'r', encoding='utf-8') as f:
+                            css_content = f.read()
+                        with phase('css_walk'):
+                            self.download_css_assets(full_url, css_content)
+                    except:
+                        pass
         
         print(f"\nDownload complete! {len(self.downloaded_urls)} files downloaded.")
 
 if __name__ == "__main__":
+    enable_profiling()
     downloader = WebsiteDownloader("https://lo2s.com", ".")
     downloader.download_all_assets()